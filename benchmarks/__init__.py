@@ -0,0 +1,7 @@
+"""
+Benchmarks for the DOCX/DOC to Markdown converter.
+
+``benchmarks.corpus`` builds synthetic DOCX files with the standard library
+only, and ``benchmarks.run`` times each conversion phase on them and emits
+the results as JSON that can be compared against a stored baseline.
+"""
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Synthetic DOCX corpus generator
+
+Builds valid WordprocessingML packages with a chosen number of paragraphs,
+tables and images using only the standard library. The paragraphs cycle
+through the constructs the converter has to handle: built-in heading
+styles, bold headings, label paragraphs, list items, hyperlinks whose runs
+are nested inside smart tags and content controls, and runs carrying many
+formatting properties.
+
+    python -m benchmarks.corpus out/ --preset medium
+    python -m benchmarks.corpus out/ --paragraphs 5000 --tables 100 --images 40
+"""
+
+import os
+import random
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Dict, List
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+IMAGE_REL = REL_NS + '/image'
+HYPERLINK_REL = REL_NS + '/hyperlink'
+
+DOCUMENT_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<w:document xmlns:w="{W_NS}" xmlns:r="{REL_NS}" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture"><w:body>'
+)
+DOCUMENT_FOOTER = '<w:sectPr/></w:body></w:document>'
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Default Extension="png" ContentType="image/png"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>'
+)
+
+# Corpus presets: paragraphs, tables, images per document
+PRESETS = {
+    'small': {'paragraphs': 200, 'tables': 5, 'images': 5},
+    'medium': {'paragraphs': 2000, 'tables': 40, 'images': 25},
+    'large': {'paragraphs': 20000, 'tables': 300, 'images': 120},
+}
+
+WORDS = ('system', 'report', 'quarterly', 'analysis', 'customer', 'network', 'release',
+         'service', 'design', 'review', 'budget', 'metric', 'process', 'summary', 'policy')
+
+def make_png(width: int, height: int, seed: int) -> bytes:
+    """Return an RGB PNG of the given size filled with a seeded noise pattern"""
+    rng = random.Random(seed)
+    row_bytes = width * 3
+    raw = b''.join(b'\x00' + bytes(rng.getrandbits(8) for _ in range(row_bytes)) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def _run(text: str, bold: bool = False, italic: bool = False, underline: bool = False, deep: bool = False) -> str:
+    """A run; ``deep`` adds the font, size, colour and language properties Word writes"""
+    props = []
+    if deep:
+        props.append('<w:rStyle w:val="Emphasis"/><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:cs="Arial"/>')
+    if bold:
+        props.append('<w:b/><w:bCs/>')
+    if italic:
+        props.append('<w:i/><w:iCs/>')
+    if deep:
+        props.append('<w:color w:val="1F4E79"/><w:sz w:val="22"/><w:szCs w:val="22"/><w:highlight w:val="yellow"/>')
+    if underline:
+        props.append('<w:u w:val="single"/>')
+    if deep:
+        props.append('<w:vertAlign w:val="baseline"/><w:lang w:val="en-US" w:eastAsia="en-US"/>')
+    rpr = f"<w:rPr>{''.join(props)}</w:rPr>" if props else ''
+    return f'<w:r>{rpr}<w:t xml:space="preserve">{text}</w:t></w:r>'
+
+def _paragraph(inner: str, style: str = None, numbered: bool = False) -> str:
+    ppr = ''
+    if style or numbered:
+        ppr = '<w:pPr>'
+        if style:
+            ppr += f'<w:pStyle w:val="{style}"/>'
+        if numbered:
+            ppr += '<w:numPr><w:ilvl w:val="0"/><w:numId w:val="1"/></w:numPr>'
+        ppr += '</w:pPr>'
+    return f'<w:p>{ppr}{inner}</w:p>'
+
+def _drawing(rel_id: str, index: int) -> str:
+    return (
+        '<w:r><w:drawing><wp:inline><wp:extent cx="952500" cy="952500"/>'
+        f'<wp:docPr id="{index}" name="Picture {index}"/>'
+        '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<pic:pic><pic:blipFill><a:blip r:embed="{rel_id}"/></pic:blipFill></pic:pic>'
+        '</a:graphicData></a:graphic></wp:inline></w:drawing></w:r>'
+    )
+
+def _body_paragraph(index: int, rng: random.Random, link_count: int) -> str:
+    """One body paragraph; the kind cycles so every corpus mixes the same constructs"""
+    kind = index % 8
+    if kind == 0:
+        return _paragraph(_run(f'Section {index} {_sentence(rng, 3)}'), style=f'Heading{1 + (index // 8) % 3}')
+    if kind == 1:
+        return _paragraph(_run(f'Overview {index}', bold=True))
+    if kind == 2:
+        return _paragraph(_run('Status:', bold=True) + _run(' ' + _sentence(rng, 12)))
+    if kind == 3:
+        return _paragraph(_run(_sentence(rng, 8)), numbered=True)
+    if kind == 4:
+        # Hyperlink runs nested in a smart tag, and a hyperlink inside a content control
+        link = f'rIdLink{index % link_count + 1}'
+        return _paragraph(
+            _run(_sentence(rng, 10) + ' ')
+            + f'<w:hyperlink r:id="{link}"><w:smartTag w:element="place">'
+            + _run('linked ', bold=True, deep=True) + _run('text', italic=True, deep=True)
+            + '</w:smartTag></w:hyperlink>'
+            + '<w:sdt><w:sdtContent>'
+            + f'<w:hyperlink r:id="{link}">{_run("reference", underline=True, deep=True)}</w:hyperlink>'
+            + '</w:sdtContent></w:sdt>'
+            + _run(' ' + _sentence(rng, 6))
+        )
+    if kind == 5:
+        # Many short runs with heavy formatting, as produced by tracked edits
+        runs = ''.join(
+            _run(rng.choice(WORDS) + ' ', bold=(k % 3 == 0), italic=(k % 4 == 0), underline=(k % 5 == 0), deep=True)
+            for k in range(12)
+        )
+        return _paragraph(runs)
+    if kind == 6:
+        return _paragraph('')
+    return _paragraph(_run(_sentence(rng, 40)))
+
+def _table(index: int, rng: random.Random) -> str:
+    """A table; alternates the three layouts the converter formats differently"""
+    layout = index % 3
+    rows = []
+    if layout == 0:
+        columns = 4
+        rows.append('<w:tr>' + ''.join(
+            f'<w:tc>{_paragraph(_run(f"Column {c + 1}", bold=True))}</w:tc>' for c in range(columns)) + '</w:tr>')
+        for r in range(8):
+            rows.append('<w:tr>' + ''.join(
+                f'<w:tc>{_paragraph(_run(_sentence(rng, 3)))}</w:tc>' for _ in range(columns)) + '</w:tr>')
+    elif layout == 1:
+        columns = 2
+        for r in range(6):
+            rows.append(
+                f'<w:tr><w:tc>{_paragraph(_run(f"Key {r}"))}</w:tc>'
+                f'<w:tc>{_paragraph(_run(_sentence(rng, 6)))}{_paragraph(_run(_sentence(rng, 4)))}</w:tc></w:tr>'
+            )
+    else:
+        columns = 3
+        rows.append('<w:tr>' + ''.join(
+            f'<w:tc>{_paragraph(_run(header))}</w:tc>' for header in ('Category', 'Component', 'Description')) + '</w:tr>')
+        for r in range(6):
+            rows.append(
+                f'<w:tr><w:tc>{_paragraph(_run(f"Group {r // 2}"))}</w:tc>'
+                f'<w:tc>{_paragraph(_run(f"Item {r}"))}</w:tc>'
+                f'<w:tc>{_paragraph(_run(_sentence(rng, 5)))}{_paragraph(_run("- " + _sentence(rng, 3)))}</w:tc></w:tr>'
+            )
+    grid = ''.join('<w:gridCol w:w="2000"/>' for _ in range(columns))
+    return f'<w:tbl><w:tblGrid>{grid}</w:tblGrid>{"".join(rows)}</w:tbl>'
+
+def build_docx(path, paragraphs: int = 200, tables: int = 5, images: int = 5,
+               image_size: int = 64, links: int = 8, seed: int = 1) -> Dict:
+    """Write a synthetic DOCX to ``path`` and return a description of its contents.
+
+    Tables and images are spread evenly through the paragraphs. Every image
+    is a distinct PNG of ``image_size`` x ``image_size`` pixels.
+    """
+    rng = random.Random(seed)
+    links = max(1, links)
+    relationships = [
+        f'<Relationship Id="rIdLink{k}" Type="{HYPERLINK_REL}" Target="https://example.com/doc/{k}" TargetMode="External"/>'
+        for k in range(1, links + 1)
+    ]
+    relationships += [
+        f'<Relationship Id="rIdImage{k}" Type="{IMAGE_REL}" Target="media/image{k}.png"/>'
+        for k in range(1, images + 1)
+    ]
+
+    table_every = paragraphs // tables if tables else 0
+    image_every = paragraphs // images if images else 0
+    body: List[str] = []
+    tables_written = images_written = 0
+    for index in range(paragraphs):
+        body.append(_body_paragraph(index, rng, links))
+        if table_every and index % table_every == table_every - 1 and tables_written < tables:
+            body.append(_table(tables_written, rng))
+            tables_written += 1
+        if image_every and index % image_every == image_every - 1 and images_written < images:
+            images_written += 1
+            body.append(_paragraph(_run('Figure ' + str(images_written) + ' ') + _drawing(f'rIdImage{images_written}', images_written)))
+    # Short documents may not reach every slot; append whatever is left
+    while tables_written < tables:
+        body.append(_table(tables_written, rng))
+        tables_written += 1
+    while images_written < images:
+        images_written += 1
+        body.append(_paragraph(_drawing(f'rIdImage{images_written}', images_written)))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(str(path), 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', CONTENT_TYPES)
+        package.writestr('_rels/.rels', PACKAGE_RELS)
+        package.writestr('word/document.xml', DOCUMENT_HEADER + ''.join(body) + DOCUMENT_FOOTER)
+        package.writestr(
+            'word/_rels/document.xml.rels',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join(relationships) + '</Relationships>'
+        )
+        for k in range(1, images + 1):
+            # Images are already compressed, so Word stores most of them as-is
+            package.writestr(f'word/media/image{k}.png', make_png(image_size, image_size, seed * 1000 + k),
+                             compress_type=zipfile.ZIP_STORED)
+
+    return {
+        'path': str(path),
+        'paragraphs': paragraphs,
+        'tables': tables,
+        'images': images,
+        'bytes': os.path.getsize(str(path)),
+    }
+
+def build_corpus(output_dir, presets=('small', 'medium', 'large'), seed: int = 1) -> List[Dict]:
+    """Build one document per preset under ``output_dir`` and describe them"""
+    documents = []
+    for name in presets:
+        documents.append(dict(build_docx(Path(output_dir) / f'{name}.docx', seed=seed, **PRESETS[name]), preset=name))
+    return documents
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate synthetic DOCX files for benchmarking')
+    parser.add_argument('output_dir', help='Folder to write the generated documents to')
+    parser.add_argument('--preset', choices=sorted(PRESETS), action='append',
+                        help='Corpus preset to build (repeatable; default: all presets)')
+    parser.add_argument('--paragraphs', type=int, help='Build one custom document with this many paragraphs')
+    parser.add_argument('--tables', type=int, default=10, help='Tables in the custom document')
+    parser.add_argument('--images', type=int, default=10, help='Images in the custom document')
+    parser.add_argument('--image-size', type=int, default=64, help='Image width and height in pixels')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for reproducible text')
+    args = parser.parse_args()
+
+    if args.paragraphs:
+        documents = [build_docx(Path(args.output_dir) / f'custom_{args.paragraphs}.docx', args.paragraphs,
+                                args.tables, args.images, args.image_size, seed=args.seed)]
+    else:
+        documents = build_corpus(args.output_dir, args.preset or sorted(PRESETS, key=lambda n: PRESETS[n]['paragraphs']),
+                                 seed=args.seed)
+    for document in documents:
+        print(f"📄 {document['path']}: {document['paragraphs']} paragraphs, {document['tables']} tables, "
+              f"{document['images']} images, {document['bytes'] / 1024:.0f} KB")
+
+if __name__ == "__main__":
+    main()
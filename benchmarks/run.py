@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Conversion benchmark
+
+Times each phase of a DOCX conversion (setup, sensitivity check, image
+extraction, text extraction, table of contents) as well as a complete
+``DocxToMarkdownConverter.convert`` call, and reports throughput in pages/sec
+and MB/sec together with the peak RSS of the converting process. Each
+document is benchmarked in a fresh process so the RSS figures do not leak
+from one document into the next.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --preset large --baseline results.json --tolerance 0.15
+    python -m benchmarks.run --corpus path/to/docs --repeat 5
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Allow running from a checkout without installing anything
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from docx_to_markdown_converter import DocxToMarkdownConverter, MarkdownWriter, __version__
+from benchmarks.corpus import PRESETS, build_docx
+
+# Word count of a typical printed page, used to express throughput in pages/sec
+WORDS_PER_PAGE = 500
+
+PHASES = ('setup', 'sensitivity', 'images', 'text', 'toc')
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it cannot be read"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _time_phases(input_file: str, output_folder: str, options: Dict) -> Dict[str, float]:
+    """Run the steps of DocxToMarkdownConverter.render one at a time and time each of them"""
+    timings = {}
+    start = time.perf_counter()
+    converter = DocxToMarkdownConverter(input_file, output_folder, **options)
+    timings['setup'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converter._check_sensitivity_labels()
+    timings['sensitivity'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converter.extract_images_docx()
+    timings['images'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converter.write_text_docx(MarkdownWriter())
+    converter._finish_image_writes()
+    timings['text'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converter.create_table_of_contents()
+    timings['toc'] = time.perf_counter() - start
+
+    converter.close()
+    return timings
+
+def benchmark_document(input_file: str, repeat: int = 3, options: Dict = None) -> Dict:
+    """Benchmark one document and return the median timings of ``repeat`` runs"""
+    logging.getLogger().setLevel(logging.WARNING)
+    options = options or {}
+    work_dir = tempfile.mkdtemp(prefix='docx2md-bench-')
+    try:
+        phase_runs = {phase: [] for phase in PHASES}
+        convert_runs = []
+        markdown = ''
+        for attempt in range(repeat):
+            for phase, seconds in _time_phases(input_file, os.path.join(work_dir, f'phases{attempt}'), options).items():
+                phase_runs[phase].append(seconds)
+
+            start = time.perf_counter()
+            markdown = DocxToMarkdownConverter(input_file, os.path.join(work_dir, f'convert{attempt}'), **options).convert()
+            convert_runs.append(time.perf_counter() - start)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    convert_seconds = statistics.median(convert_runs)
+    size = os.path.getsize(input_file)
+    pages = len(markdown.split()) / WORDS_PER_PAGE
+    return {
+        'path': input_file,
+        'bytes': size,
+        'pages': round(pages, 1),
+        'phases': {phase: statistics.median(runs) for phase, runs in phase_runs.items()},
+        'convert_seconds': convert_seconds,
+        'pages_per_sec': pages / convert_seconds if convert_seconds else None,
+        'mb_per_sec': size / (1024 * 1024) / convert_seconds if convert_seconds else None,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+def _isolated(input_file: str, repeat: int, options: Dict) -> Dict:
+    """Benchmark a document in a freshly spawned process so peak RSS is per document"""
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(benchmark_document, (input_file, repeat, options))
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a line per document metric that is more than ``tolerance`` slower than the baseline"""
+    regressions = []
+    previous = {document['name']: document for document in baseline.get('documents', [])}
+    for document in results['documents']:
+        before = previous.get(document['name'])
+        if before is None:
+            continue
+        metrics = [('convert', document['convert_seconds'], before['convert_seconds'])]
+        metrics += [(phase, seconds, before['phases'].get(phase)) for phase, seconds in document['phases'].items()]
+        for metric, now, then in metrics:
+            # Sub-millisecond phases are dominated by noise
+            if then and now > then * (1 + tolerance) and now - then > 0.001:
+                regressions.append(f"{document['name']} {metric}: {then * 1000:.1f} ms -> {now * 1000:.1f} ms "
+                                   f"(+{(now / then - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark DOCX to Markdown conversion phase by phase')
+    parser.add_argument('--preset', choices=sorted(PRESETS), action='append',
+                        help='Synthetic corpus preset to benchmark (repeatable; default: small and medium)')
+    parser.add_argument('--corpus', help='Benchmark the .docx files in this folder instead of a synthetic corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per document; the median is reported (default: 3)')
+    parser.add_argument('--image-mode', choices=('eager', 'lazy', 'links'), default='eager', help='Image mode to benchmark')
+    parser.add_argument('--output', '-o', help='Write the JSON results to this file instead of stdout')
+    parser.add_argument('--baseline', help='Compare against a previous JSON result and exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown against the baseline (default: 0.2 = 20%%)')
+    args = parser.parse_args()
+
+    options = {'image_mode': args.image_mode}
+    corpus_dir = None
+    if args.corpus:
+        documents = [{'name': path.stem, 'path': str(path)} for path in sorted(Path(args.corpus).glob('*.docx'))]
+        if not documents:
+            print(f"❌ Error: No .docx files found in '{args.corpus}'.", file=sys.stderr)
+            sys.exit(1)
+    else:
+        corpus_dir = tempfile.mkdtemp(prefix='docx2md-corpus-')
+        documents = []
+        for name in args.preset or ['small', 'medium']:
+            description = build_docx(Path(corpus_dir) / f'{name}.docx', **PRESETS[name])
+            documents.append(dict(description, name=name))
+
+    results = {
+        'converter_version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeat': args.repeat,
+        'options': options,
+        'documents': [],
+    }
+    try:
+        for document in documents:
+            print(f"⏱️  Benchmarking {document['name']}...", file=sys.stderr)
+            measured = _isolated(document['path'], args.repeat, options)
+            results['documents'].append(dict(document, **measured))
+    finally:
+        if corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    for document in results['documents']:
+        rss = f"{document['peak_rss_mb']:.0f} MB" if document['peak_rss_mb'] is not None else 'n/a'
+        print(f"📊 {document['name']}: {document['convert_seconds'] * 1000:.0f} ms, "
+              f"{document['pages_per_sec']:.0f} pages/sec, {document['mb_per_sec']:.1f} MB/sec, peak RSS {rss}",
+              file=sys.stderr)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) against {args.baseline}:", file=sys.stderr)
+            for line in regressions:
+                print(f"   {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ No regressions against {args.baseline}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
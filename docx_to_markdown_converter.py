@@ -6,7 +6,11 @@ This converter can handle both .docx (ZIP-based) and .doc (OLE-based) files.
 It creates individual directories per document as requested.
 """
 
+import abc
+import asyncio
+import io
 import os
+import posixpath
 import sys
 import zipfile
 import re
@@ -15,11 +19,81 @@ from typing import Dict, List, Tuple
 import xml.etree.ElementTree as ET
 import logging
 import struct
+import mmap
+import bisect
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import tracemalloc
+from contextlib import closing, contextmanager
+from itertools import chain, islice
+from functools import partial
+import json
+import hashlib
+import shutil
+import signal
+import tarfile
+import tempfile
+
+__version__ = "0.1.4"
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# WordprocessingML namespaces used when walking document parts
+NAMESPACES = {
+    'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
+    'wp': 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing',
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'pic': 'http://schemas.openxmlformats.org/drawingml/2006/picture',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+}
+
+# Precomputed Clark-notation tags, so hot paths compare tags and use direct
+# child lookups instead of expanding namespace prefixes in ElementPath queries
+W_BODY = '{%s}body' % NAMESPACES['w']
+W_P = '{%s}p' % NAMESPACES['w']
+W_TBL = '{%s}tbl' % NAMESPACES['w']
+W_R = '{%s}r' % NAMESPACES['w']
+W_T = '{%s}t' % NAMESPACES['w']
+W_RPR = '{%s}rPr' % NAMESPACES['w']
+W_B = '{%s}b' % NAMESPACES['w']
+W_I = '{%s}i' % NAMESPACES['w']
+W_U = '{%s}u' % NAMESPACES['w']
+W_PPR = '{%s}pPr' % NAMESPACES['w']
+W_PSTYLE = '{%s}pStyle' % NAMESPACES['w']
+W_NUMPR = '{%s}numPr' % NAMESPACES['w']
+W_HYPERLINK = '{%s}hyperlink' % NAMESPACES['w']
+W_DRAWING = '{%s}drawing' % NAMESPACES['w']
+W_VAL = '{%s}val' % NAMESPACES['w']
+W_TR = '{%s}tr' % NAMESPACES['w']
+W_TC = '{%s}tc' % NAMESPACES['w']
+W_TRPR = '{%s}trPr' % NAMESPACES['w']
+W_TCPR = '{%s}tcPr' % NAMESPACES['w']
+W_TBLGRID = '{%s}tblGrid' % NAMESPACES['w']
+W_GRIDCOL = '{%s}gridCol' % NAMESPACES['w']
+W_GRIDSPAN = '{%s}gridSpan' % NAMESPACES['w']
+W_GRIDBEFORE = '{%s}gridBefore' % NAMESPACES['w']
+W_GRIDAFTER = '{%s}gridAfter' % NAMESPACES['w']
+W_VMERGE = '{%s}vMerge' % NAMESPACES['w']
+W_SDT = '{%s}sdt' % NAMESPACES['w']
+W_SDTCONTENT = '{%s}sdtContent' % NAMESPACES['w']
+W_CUSTOMXML = '{%s}customXml' % NAMESPACES['w']
+A_BLIP = '{%s}blip' % NAMESPACES['a']
+R_ID = '{%s}id' % NAMESPACES['r']
+R_EMBED = '{%s}embed' % NAMESPACES['r']
+
+# Content controls and custom XML may wrap table rows and cells without adding a level
+TABLE_CONTENT_WRAPPERS = (W_SDT, W_SDTCONTENT, W_CUSTOMXML)
+
+BOLD_LABEL_PATTERN = re.compile(r'^\*\*(.+?):\*\*\s*(.*)$')
+SECTION_SLUG_PATTERN = re.compile(r'[^\w]+')
+# Longest heading-derived part of a section file name
+SECTION_SLUG_LENGTH = 40
+HEADING_NUMBER_PATTERN = re.compile(r'(\d+)')
+
 class ConversionWarning:
     """Class to handle conversion warnings and issues"""
     
@@ -66,56 +140,1512 @@ class ConversionWarning:
         if not self.handled_issues:
             return "✅ Conversion completed successfully with no issues."
         
-        summary = f"✅ Conversion completed successfully with {len(self.warnings)} handled issue(s):\n\n"
-        summary += "\n".join(self.handled_issues)
-        summary += "\n\n💡 All issues were handled gracefully and the conversion proceeded successfully."
-        return summary
+        return "".join([
+            f"✅ Conversion completed successfully with {len(self.warnings)} handled issue(s):\n\n",
+            "\n".join(self.handled_issues),
+            "\n\n💡 All issues were handled gracefully and the conversion proceeded successfully.",
+        ])
+
+class MarkdownWriter:
+    """Append-only markdown sink.
+
+    Rendered pieces are collected in a list and joined once (or written out
+    piece by piece) instead of growing one string with repeated
+    concatenation. Given a ``stream``, pieces are written straight through.
+    """
+    
+    def __init__(self, stream=None):
+        self._parts = []
+        self._stream = stream
+    
+    def write(self, text: str):
+        if text:
+            if self._stream is not None:
+                self._stream.write(text)
+            else:
+                self._parts.append(text)
+    
+    def extend(self, other: 'MarkdownWriter'):
+        """Append everything another writer has collected, without joining it"""
+        for text in other._parts:
+            self.write(text)
+    
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+    
+    def reset(self):
+        """Discard everything written so far, truncating the stream if there is one"""
+        if self._stream is not None:
+            self._stream.seek(0)
+            self._stream.truncate()
+        else:
+            self._parts = []
+    
+    def write_to(self, stream):
+        """Write the collected pieces to a text stream"""
+        stream.writelines(self._parts)
+
+RELATIONSHIPS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+DOCUMENT_RELS_PART = 'word/_rels/document.xml.rels'
+
+# Image handling modes: copy all media, copy referenced media, or link only
+IMAGE_MODES = ('eager', 'lazy', 'links')
+
+# Bounded buffer for streaming parts out of the archive
+COPY_CHUNK_SIZE = 1024 * 1024
+# Fixed part of a zip local file header (signature through extra field length)
+ZIP_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+
+# Decompression-bomb guards (see DocxPackage.allowed_size): the most a single
+# part may expand to, the highest uncompressed/compressed ratio allowed for
+# parts larger than MIN_RATIO_CHECK_SIZE, and the most uncompressed bytes
+# read from one document
+MAX_PART_SIZE = 1024 * 1024 * 1024
+MAX_COMPRESSION_RATIO = 200
+MIN_RATIO_CHECK_SIZE = 10 * 1024 * 1024
+MAX_TOTAL_SIZE = 4 * 1024 * 1024 * 1024
+
+def resolve_part_name(target: str, source_dir: str = 'word') -> str:
+    """Resolve a relationship target to a package part name such as word/media/image1.png"""
+    if target.startswith('/'):
+        return posixpath.normpath(target.lstrip('/'))
+    return posixpath.normpath(posixpath.join(source_dir, target))
+
+class IOCounters:
+    """Bytes read from the package and written to the output tree.
+
+    Image writer threads update these too, so increments take a lock.
+    """
+    
+    def __init__(self):
+        self.zip_read = 0
+        self.written = 0
+        # Part name -> how far into it reads have reached; max_total_size is charged
+        # for these, so reading a part again does not count against the document twice
+        self.inflated = {}
+        self.inflated_total = 0
+        self._lock = threading.Lock()
+    
+    def add_read(self, size: int, part: str = None, end: int = 0):
+        """Count size bytes served from the package; end is the offset in part the read reached"""
+        with self._lock:
+            self.zip_read += size
+            charged = self.inflated.get(part, 0)
+            if part is not None and end > charged:
+                self.inflated[part] = end
+                self.inflated_total += end - charged
+    
+    def add_written(self, size: int):
+        with self._lock:
+            self.written += size
+
+class _CountingReader:
+    """Wraps a part stream and counts the bytes handed to the caller, ending it after limit bytes"""
+    
+    def __init__(self, stream, counters: IOCounters, part: str, limit: int = None):
+        self._stream = stream
+        self._counters = counters
+        self._part = part
+        self._position = 0
+        self._remaining = limit
+    
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining is not None:
+            size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._stream.read(size)
+        if self._remaining is not None:
+            self._remaining -= len(data)
+        self._position += len(data)
+        self._counters.add_read(len(data), self._part, self._position)
+        return data
+    
+    def close(self):
+        self._stream.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only file over a bytes-like object.
+
+    Reads copy only the requested range, so a document that is already in
+    memory (a bytes blob, a bytearray or a memoryview of a larger buffer)
+    is never copied whole.
+    """
+    
+    def __init__(self, buffer):
+        super().__init__()
+        self.view = memoryview(buffer).cast('B')
+        self._position = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> bytes:
+        end = len(self.view) if size is None or size < 0 else self._position + size
+        data = self.view[self._position:end].tobytes()
+        self._position += len(data)
+        return data
+    
+    def readinto(self, buffer) -> int:
+        data = self.view[self._position:self._position + len(buffer)]
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        if offset < 0:
+            raise ValueError("Negative seek position")
+        self._position = offset
+        return offset
+    
+    def tell(self) -> int:
+        return self._position
+
+def open_source(source, name: str = None) -> Tuple[object, str]:
+    """Normalise a conversion source to (path or seekable binary stream, display name).
+
+    Paths are returned unchanged. bytes, bytearray and memoryview are read
+    in place through a _BufferReader, and file-like objects that cannot seek
+    are read into one. The name, used for the markdown title, defaults to
+    the file object's name or "document".
+    """
+    if isinstance(source, (str, Path)):
+        return source, str(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _BufferReader(source), name or "document"
+    if hasattr(source, 'read'):
+        display_name = name or os.path.basename(str(getattr(source, 'name', '') or '')) or "document"
+        if not (hasattr(source, 'seekable') and source.seekable()):
+            source = _BufferReader(source.read())
+        return source, display_name
+    raise TypeError(f"Cannot convert a {type(source).__name__}; expected a path, a bytes-like object or a binary file object")
+
+class PartLimitError(OSError):
+    """A package part is larger than the decompression limits allow"""
+
+class DocxPackage:
+    """Single open handle on a DOCX archive shared by every conversion stage.
+
+    The central directory is indexed once when the archive is opened, small
+    parts are cached after their first read and relationship parts are parsed
+    at most once, so each stage gets its data without re-opening the file.
+
+    Parts are inflated as streams and never beyond allowed_size(): a part
+    that would exceed max_part_size, max_ratio or the document's remaining
+    max_total_size is cut off there by read() and open(), on_limit(part,
+    reason) is called, and copy_to() refuses it with PartLimitError rather
+    than writing a truncated file.
+    """
+
+    def __init__(self, input_file: str, counters: IOCounters = None, max_part_size: int = MAX_PART_SIZE,
+                 max_ratio: float = MAX_COMPRESSION_RATIO, max_total_size: int = MAX_TOTAL_SIZE, on_limit=None):
+        self.input_file = input_file
+        # Uncompressed bytes served to callers, shared with the converter across reopens;
+        # the first read of each byte of a part also counts towards max_total_size
+        self.counters = counters if counters is not None else IOCounters()
+        self.max_part_size = max_part_size
+        self.max_ratio = max_ratio
+        self.max_total_size = max_total_size
+        self.on_limit = on_limit
+        self._zip = zipfile.ZipFile(input_file, 'r')
+        self.entries = {info.filename: info for info in self._zip.infolist()}
+        self._parts = {}
+        self._relationships = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def namelist(self) -> List[str]:
+        """Part names in central-directory order"""
+        return list(self.entries)
+
+    def allowed_size(self, name: str) -> int:
+        """Uncompressed bytes of a part that may be read under the size, ratio and total limits"""
+        info = self.entries[name]
+        allowed = min(info.file_size, self.max_part_size, self._total_remaining(name))
+        if info.file_size > MIN_RATIO_CHECK_SIZE:
+            allowed = min(allowed, max(info.compress_size * self.max_ratio, MIN_RATIO_CHECK_SIZE))
+        return int(allowed)
+    
+    def limit_reason(self, name: str) -> str:
+        """Why a part is cut off by allowed_size, or None when it can be read whole"""
+        info = self.entries[name]
+        allowed = self.allowed_size(name)
+        if allowed >= info.file_size:
+            return None
+        if info.file_size > self.max_part_size:
+            return f"{name} expands to {_format_bytes(info.file_size)}, over the {_format_bytes(self.max_part_size)} part limit"
+        if self._total_remaining(name) <= allowed:
+            return (f"{name} expands to {_format_bytes(info.file_size)}, past the document's "
+                    f"{_format_bytes(self.max_total_size)} decompression limit")
+        return (f"{name} expands {info.file_size / max(info.compress_size, 1):.0f}:1, "
+                f"over the {self.max_ratio:g}:1 compression ratio limit")
+    
+    def _total_remaining(self, name: str) -> int:
+        """Bytes of a part max_total_size still allows, not charging again what was read of it before"""
+        return max(0, self.max_total_size - self.counters.inflated_total + self.counters.inflated.get(name, 0))
+    
+    def _limited_size(self, name: str) -> int:
+        """allowed_size(), reporting the part through on_limit when it is cut off"""
+        allowed = self.allowed_size(name)
+        if allowed < self.entries[name].file_size:
+            reason = self.limit_reason(name)
+            logger.warning(f"Decompression limit: {reason}")
+            if self.on_limit is not None:
+                self.on_limit(name, reason)
+        return allowed
+    
+    def read(self, name: str, cache: bool = True) -> bytes:
+        """Read a part, serving repeated reads from the part cache"""
+        if name in self._parts:
+            return self._parts[name]
+        with self.open(name) as source:
+            data = source.read()
+        if cache:
+            self._parts[name] = data
+        return data
+
+    def open(self, name: str):
+        """Open a part as a stream without caching its content"""
+        info = self.entries[name]
+        allowed = self._limited_size(name)
+        return _CountingReader(self._zip.open(info), self.counters, name, allowed if allowed < info.file_size else None)
+
+    def copy_to(self, name: str, destination) -> int:
+        """Stream a part to ``destination`` in bounded chunks; returns bytes written.
+
+        Stored (uncompressed) members of an archive on disk are transferred
+        with os.sendfile where the platform supports it, so their bytes never
+        pass through Python buffers.
+        """
+        info = self.entries[name]
+        if self.allowed_size(name) < info.file_size:
+            raise PartLimitError(self.limit_reason(name))
+        try:
+            with open(destination, 'wb') as target:
+                if (info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1
+                        and hasattr(os, 'sendfile') and isinstance(self.input_file, (str, Path))):
+                    try:
+                        copied = self._sendfile(info, target)
+                        self.counters.add_read(copied, name, info.file_size)
+                        return copied
+                    except OSError:
+                        # e.g. platforms that only sendfile to sockets; fall back to copying
+                        target.seek(0)
+                        target.truncate()
+                with self._zip.open(info) as source:
+                    shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+            self.counters.add_read(info.file_size, name, info.file_size)
+            return info.file_size
+        except BaseException:
+            # Never leave a partially written part behind
+            if os.path.exists(destination):
+                os.remove(destination)
+            raise
+
+    def _sendfile(self, info: zipfile.ZipInfo, target) -> int:
+        """Copy a stored member's raw bytes straight from the archive file"""
+        with open(self.input_file, 'rb') as source:
+            source.seek(info.header_offset)
+            header = source.read(ZIP_LOCAL_HEADER.size)
+            if len(header) != ZIP_LOCAL_HEADER.size or header[:4] != b'PK\x03\x04':
+                raise OSError(f"Bad local file header for {info.filename}")
+            fields = ZIP_LOCAL_HEADER.unpack(header)
+            offset = info.header_offset + ZIP_LOCAL_HEADER.size + fields[10] + fields[11]
+            remaining = info.compress_size
+            while remaining > 0:
+                sent = os.sendfile(target.fileno(), source.fileno(), offset, min(remaining, 1 << 30))
+                if sent == 0:
+                    raise OSError(f"Unexpected end of archive while copying {info.filename}")
+                offset += sent
+                remaining -= sent
+        return info.compress_size
+
+    def relationships(self, rels_part: str = DOCUMENT_RELS_PART) -> List[Tuple[str, str, str]]:
+        """Return (Id, Target, Type) triples of a relationships part, parsed once"""
+        if rels_part not in self._relationships:
+            relationships = []
+            if rels_part in self.entries:
+                rels_root = ET.fromstring(self.read(rels_part, cache=False).decode('utf-8'))
+                for rel in rels_root.findall('.//{%s}Relationship' % RELATIONSHIPS_NS):
+                    relationships.append((rel.get('Id'), rel.get('Target'), rel.get('Type')))
+            self._relationships[rels_part] = relationships
+        return self._relationships[rels_part]
+
+    @property
+    def closed(self) -> bool:
+        return self._zip.fp is None
+
+    def close(self):
+        self._zip.close()
+        self._parts.clear()
+
+# Parallel body rendering: blocks per chunk dealt to a worker, and the
+# smallest document.xml (uncompressed) worth starting worker processes for
+BODY_CHUNK_BLOCKS = 400
+PARALLEL_BODY_MIN_BYTES = 2 * 1024 * 1024
+
+XML_TAG_NAME_PATTERN = re.compile(rb'<([^\s/>!?]+)')
+WML_NAMESPACE_DECLARATION = re.compile(rb'xmlns(?::([\w.-]+))?="' + re.escape(NAMESPACES['w'].encode()) + rb'"')
+
+def _table_children(parent, tag):
+    """Yield the rows of a table or the cells of a row, looking through content-control wrappers
+    but never into nested tables"""
+    for child in parent:
+        if child.tag == tag:
+            yield child
+        elif child.tag in TABLE_CONTENT_WRAPPERS:
+            yield from _table_children(child, tag)
+
+def _cell_paragraphs(cell):
+    """Yield the paragraphs of a table cell in order, flattening nested tables into the cell"""
+    for child in cell:
+        if child.tag == W_P:
+            yield child
+        elif child.tag != W_TCPR:
+            yield from child.iter(W_P)
+
+def _grid_value(properties, tag, default: int) -> int:
+    """Integer w:val of a table/row/cell property such as gridSpan, or default when absent or invalid"""
+    if properties is None:
+        return default
+    elem = properties.find(tag)
+    if elem is None:
+        return default
+    try:
+        return max(int(elem.get(W_VAL, default)), 0)
+    except ValueError:
+        return default
+
+def _table_width(table_elem) -> int:
+    """Number of columns a table needs: its grid, or its widest row when a row spans past the grid"""
+    grid = table_elem.find(W_TBLGRID)
+    width = len(grid.findall(W_GRIDCOL)) if grid is not None else 0
+    for row in _table_children(table_elem, W_TR):
+        row_props = row.find(W_TRPR)
+        cells = sum(_grid_value(cell.find(W_TCPR), W_GRIDSPAN, 1) for cell in _table_children(row, W_TC))
+        width = max(width, _grid_value(row_props, W_GRIDBEFORE, 0) + cells + _grid_value(row_props, W_GRIDAFTER, 0))
+    return width
+
+def body_block_spans(document_xml: bytes):
+    """Locate the top-level blocks of w:body in raw document.xml bytes.
+
+    Returns (opening, closing, spans): the bytes up to and including the
+    body start tag, the matching end tags, and the (start, end) byte range
+    of every top-level body child. Any run of consecutive spans wrapped in
+    opening and closing is a well-formed document again, which is how the
+    body is split for parallel rendering without serializing elements.
+    Only tags with a block's own name are tokenized while finding its end,
+    so the scan stays in the regex engine for most of the document.
+    Returns None when the layout is not recognized, for example in a
+    UTF-16 encoded part.
+    """
+    root = XML_TAG_NAME_PATTERN.search(document_xml)
+    if root is None:
+        return None
+    root_end = document_xml.find(b'>', root.end())
+    declaration = WML_NAMESPACE_DECLARATION.search(document_xml, root.start(), root_end)
+    if declaration is None:
+        return None
+    prefix = declaration.group(1) + b':' if declaration.group(1) else b''
+    body = re.compile(b'<' + re.escape(prefix) + rb'body(?=[\s/>])').search(document_xml, root_end)
+    if body is None:
+        return None
+    body_end = document_xml.find(b'>', body.start())
+    closing = b'</' + prefix + b'body></' + root.group(1) + b'>'
+    opening = document_xml[:body_end + 1]
+    if document_xml[body_end - 1:body_end] == b'/':
+        return opening[:-2] + b'>', closing, []
+    
+    spans = []
+    tag_patterns = {}
+    position = body_end + 1
+    while True:
+        start = document_xml.find(b'<', position)
+        if start < 0:
+            return None
+        if document_xml.startswith(b'</', start):
+            # End of w:body
+            return opening, closing, spans
+        if document_xml.startswith(b'<!--', start):
+            position = document_xml.find(b'-->', start) + 3
+            continue
+        if document_xml.startswith(b'<?', start):
+            position = document_xml.find(b'?>', start) + 2
+            continue
+        name = XML_TAG_NAME_PATTERN.match(document_xml, start)
+        tag_end = document_xml.find(b'>', start)
+        if name is None or tag_end < 0:
+            return None
+        if document_xml[tag_end - 1:tag_end] == b'/':
+            spans.append((start, tag_end + 1))
+            position = tag_end + 1
+            continue
+        tag = name.group(1)
+        pattern = tag_patterns.get(tag)
+        if pattern is None:
+            pattern = tag_patterns[tag] = re.compile(b'<(/?)' + re.escape(tag) + rb'(?=[\s/>])[^>]*?(/?)>')
+        depth = 1
+        for token in pattern.finditer(document_xml, tag_end + 1):
+            if token.group(1):
+                depth -= 1
+                if depth == 0:
+                    break
+            elif not token.group(2):
+                depth += 1
+        else:
+            return None
+        spans.append((start, token.end()))
+        position = token.end()
+
+# Conversion phases in the order they run, with their report labels
+PROFILE_PHASES = {
+    'sensitivity': 'Sensitivity check',
+    'images': 'Image extraction',
+    'text': 'Text extraction',
+    'toc': 'Table of contents',
+    'save': 'Save markdown',
+}
+
+class ConversionProfiler:
+    """Opt-in per-phase measurements: wall time, CPU time, package bytes read,
+    bytes written and the tracemalloc peak above the memory held when the
+    phase started.
+
+    Disabled profilers record nothing, so phases can always be wrapped.
+    """
+    
+    def __init__(self, counters: IOCounters, enabled: bool = False):
+        self.counters = counters
+        self.enabled = enabled
+        self.phases = []
+        self._owns_tracemalloc = False
+    
+    def start(self):
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+    
+    def stop(self):
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+    
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        current_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        if hasattr(tracemalloc, 'reset_peak') and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        zip_read, written = self.counters.zip_read, self.counters.written
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                'phase': name,
+                'wall_seconds': time.perf_counter() - wall,
+                'cpu_seconds': time.process_time() - cpu,
+                'zip_bytes_read': self.counters.zip_read - zip_read,
+                'bytes_written': self.counters.written - written,
+                'memory_peak_bytes': None,
+            }
+            if tracemalloc.is_tracing():
+                # Before Python 3.9 the peak cannot be reset, so it covers every earlier phase too
+                record['memory_peak_bytes'] = max(0, tracemalloc.get_traced_memory()[1] - current_before)
+            self.phases.append(record)
+    
+    def totals(self) -> Dict:
+        return {
+            'wall_seconds': sum(p['wall_seconds'] for p in self.phases),
+            'cpu_seconds': sum(p['cpu_seconds'] for p in self.phases),
+            'zip_bytes_read': sum(p['zip_bytes_read'] for p in self.phases),
+            'bytes_written': sum(p['bytes_written'] for p in self.phases),
+            'memory_peak_bytes': max((p['memory_peak_bytes'] or 0 for p in self.phases), default=0),
+        }
+
+def _format_bytes(size) -> str:
+    """Human readable byte count for reports"""
+    if size is None:
+        return "n/a"
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+# Word 97-2003 binary format: paragraph/cell marks and the paragraph sprms
+# needed to rebuild tables (see [MS-DOC] 2.6.2)
+PARAGRAPH_MARK_PATTERN = re.compile('[\r\x07]')
+FIELD_MARK_PATTERN = re.compile('([\x13\x14\x15])')
+SPRM_OPERAND_SIZES = {0: 1, 1: 1, 2: 2, 3: 4, 4: 2, 5: 2, 7: 3}
+SPRM_P_F_IN_TABLE = 0x2416
+SPRM_P_F_TTP = 0x2417
+SPRM_P_F_INNER_TTP = 0x244C
+SPRM_P_ITAP = 0x6649
+# Special characters in Word binary text and their markdown replacements
+DOC_CHARACTER_MAP = {
+    0x0B: ' ',      # line break
+    0x0C: '\n\n',   # page/section break
+    0x1E: '-',      # non-breaking hyphen
+    0x1F: '',       # optional hyphen
+    0xA0: ' ',      # non-breaking space
+}
+DOC_CHARACTER_MAP.update({code: '' for code in range(0x20) if code not in DOC_CHARACTER_MAP and code not in (0x09, 0x0A)})
+
+class CompoundFileError(ValueError):
+    """Raised when a file is not a readable Compound File Binary container"""
+
+class CompoundFile:
+    """Minimal read-only Compound File Binary (OLE2) reader for legacy .doc files.
+
+    The container is memory-mapped and streams are read sector by sector by
+    following their FAT or miniFAT chains, so only the byte ranges that are
+    asked for are ever copied out of the file.
+    """
+    
+    SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+    MAX_REGULAR_SECTOR = 0xFFFFFFFA
+    END_OF_CHAIN = 0xFFFFFFFE
+    NO_STREAM = 0xFFFFFFFF
+    STORAGE, STREAM, ROOT = 1, 2, 5
+    
+    def __init__(self, path):
+        if isinstance(path, _BufferReader):
+            # Already in memory: sectors are sliced straight out of the caller's buffer
+            self._file = None
+            self._map = path.view
+        elif hasattr(path, 'read'):
+            self._file = None
+            path.seek(0)
+            self._map = path.read()
+        else:
+            self._file = open(path, 'rb')
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                self._file.close()
+                raise CompoundFileError("File is empty")
+        try:
+            self._read_header()
+        except Exception:
+            self.close()
+            raise
+    
+    def _read_header(self):
+        header = self._map[:512]
+        if len(header) < 512 or header[:8] != self.SIGNATURE:
+            raise CompoundFileError("Missing compound file signature")
+        sector_shift, mini_sector_shift = struct.unpack_from('<HH', header, 0x1E)
+        self.sector_size = 1 << sector_shift
+        self.mini_sector_size = 1 << mini_sector_shift
+        (num_fat_sectors, first_dir_sector, _, self.mini_stream_cutoff, first_minifat_sector,
+         num_minifat_sectors, first_difat_sector, num_difat_sectors) = struct.unpack_from('<8I', header, 0x2C)
+        
+        # The header holds the first 109 FAT sector numbers; DIFAT sectors hold the rest
+        fat_sectors = list(struct.unpack_from('<109I', header, 0x4C))
+        ints_per_sector = self.sector_size // 4
+        sector = first_difat_sector
+        for _ in range(num_difat_sectors):
+            if sector > self.MAX_REGULAR_SECTOR:
+                break
+            entries = struct.unpack_from(f'<{ints_per_sector}I', self._sector(sector))
+            fat_sectors.extend(entries[:-1])
+            sector = entries[-1]
+        fat_sectors = [s for s in fat_sectors[:num_fat_sectors] if s <= self.MAX_REGULAR_SECTOR]
+        
+        self._fat = array('I')
+        for sector in fat_sectors:
+            self._fat.frombytes(self._sector(sector))
+        if sys.byteorder != 'little':
+            self._fat.byteswap()
+        
+        self._entries = []
+        directory = b''.join(self._sector(s) for s in self._chain(first_dir_sector, self._fat))
+        for offset in range(0, len(directory) - 127, 128):
+            self._entries.append(self._parse_entry(directory[offset:offset + 128]))
+        if not self._entries or self._entries[0]['type'] != self.ROOT:
+            raise CompoundFileError("Missing root directory entry")
+        
+        self._minifat = array('I')
+        if num_minifat_sectors:
+            for sector in self._chain(first_minifat_sector, self._fat):
+                self._minifat.frombytes(self._sector(sector))
+            if sys.byteorder != 'little':
+                self._minifat.byteswap()
+        root = self._entries[0]
+        self._mini_stream_sectors = self._chain(root['start'], self._fat) if root['size'] else []
+    
+    @staticmethod
+    def _parse_entry(raw: bytes) -> Dict:
+        name_length, entry_type = struct.unpack_from('<HB', raw, 64)
+        left, right, child = struct.unpack_from('<3I', raw, 68)
+        start, size = struct.unpack_from('<IQ', raw, 116)
+        name = raw[:max(0, min(name_length, 64) - 2)].decode('utf-16-le', errors='replace')
+        return {'name': name, 'type': entry_type, 'left': left, 'right': right,
+                'child': child, 'start': start, 'size': size}
+    
+    def _sector(self, sector: int) -> bytes:
+        offset = (sector + 1) * self.sector_size
+        if offset + self.sector_size > len(self._map):
+            raise CompoundFileError(f"Sector {sector} lies beyond the end of the file")
+        return self._map[offset:offset + self.sector_size]
+    
+    def _chain(self, start: int, table: array) -> List[int]:
+        """Follow an allocation chain, guarding against loops and bad pointers"""
+        chain = []
+        sector = start
+        while sector <= self.MAX_REGULAR_SECTOR:
+            if sector >= len(table) or len(chain) > len(table):
+                raise CompoundFileError("Corrupt sector chain")
+            chain.append(sector)
+            sector = table[sector]
+        return chain
+    
+    def children(self, index: int = 0) -> List[Dict]:
+        """Direct children of a storage (the root by default), walking its sibling tree"""
+        children = []
+        stack = [self._entries[index]['child']]
+        while stack:
+            current = stack.pop()
+            if current == self.NO_STREAM or current >= len(self._entries) or len(children) > len(self._entries):
+                continue
+            entry = self._entries[current]
+            children.append(entry)
+            stack.extend((entry['left'], entry['right']))
+        return children
+    
+    def open_stream(self, name: str) -> 'CompoundStream':
+        """Open a stream that sits directly under the root storage"""
+        for entry in self.children():
+            if entry['type'] == self.STREAM and entry['name'].lower() == name.lower():
+                return CompoundStream(self, entry)
+        raise CompoundFileError(f"Stream {name} not found")
+    
+    def has_stream(self, name: str) -> bool:
+        return any(e['type'] == self.STREAM and e['name'].lower() == name.lower() for e in self.children())
+    
+    def close(self):
+        if self._file is not None:
+            self._map.close()
+            self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class CompoundStream:
+    """Random-access view of one stream inside a CompoundFile"""
+    
+    def __init__(self, container: CompoundFile, entry: Dict):
+        self._container = container
+        self.size = entry['size']
+        self._mini = self.size < container.mini_stream_cutoff
+        if self._mini:
+            self._unit = container.mini_sector_size
+            self._sectors = container._chain(entry['start'], container._minifat) if self.size else []
+        else:
+            self._unit = container.sector_size
+            self._sectors = container._chain(entry['start'], container._fat) if self.size else []
+    
+    def _unit_bytes(self, index: int) -> bytes:
+        container = self._container
+        sector = self._sectors[index]
+        if not self._mini:
+            return container._sector(sector)
+        # Mini sectors live inside the root entry's mini stream
+        offset = sector * self._unit
+        regular = container._mini_stream_sectors[offset // container.sector_size]
+        inner = offset % container.sector_size
+        return container._sector(regular)[inner:inner + self._unit]
+    
+    def read_at(self, offset: int, size: int) -> bytes:
+        """Read ``size`` bytes starting at ``offset`` (clipped to the stream end)"""
+        size = max(0, min(size, self.size - offset))
+        pieces = []
+        while size > 0:
+            index, inner = divmod(offset, self._unit)
+            if index >= len(self._sectors):
+                raise CompoundFileError("Stream is shorter than its declared size")
+            chunk = self._unit_bytes(index)[inner:inner + size]
+            pieces.append(chunk)
+            offset += len(chunk)
+            size -= len(chunk)
+        return b''.join(pieces)
+
+class WordBinaryDocument:
+    """Text of a Word 97-2003 binary document, decoded through its piece table.
+
+    Paragraph styles are looked up from the PAPX formatted disk pages; the
+    built-in heading styles use the reserved style indexes 1-9.
+    """
+    
+    WORD_IDENT = 0xA5EC
+    FLAG_ENCRYPTED = 0x0100
+    FLAG_WHICH_TABLE = 0x0200
+    COMPRESSED_FC = 0x40000000
+    
+    def __init__(self, container: CompoundFile):
+        self.container = container
+        self.word_stream = container.open_stream('WordDocument')
+        fib = self.word_stream.read_at(0, 0x1AA)
+        if len(fib) < 0x1AA:
+            raise CompoundFileError("WordDocument stream is too short for a Word 97 FIB")
+        ident, flags = struct.unpack_from('<H', fib, 0)[0], struct.unpack_from('<H', fib, 0x0A)[0]
+        if ident != self.WORD_IDENT:
+            raise CompoundFileError("Not a Word 97-2003 document")
+        self.encrypted = bool(flags & self.FLAG_ENCRYPTED)
+        self.ccp_text = struct.unpack_from('<I', fib, 0x4C)[0]
+        self.fc_plcf_bte_papx, self.lcb_plcf_bte_papx = struct.unpack_from('<II', fib, 0x102)
+        self.fc_clx, self.lcb_clx = struct.unpack_from('<II', fib, 0x1A2)
+        self.table_name = '1Table' if flags & self.FLAG_WHICH_TABLE else '0Table'
+    
+    def _pieces(self, table_stream: CompoundStream) -> List[Tuple[int, int, int, bool]]:
+        """Return (cp start, cp end, fc, compressed) for each piece of the main text"""
+        clx = table_stream.read_at(self.fc_clx, self.lcb_clx)
+        pos = 0
+        while pos < len(clx) and clx[pos] == 0x01:
+            # Prc: property modifiers for pieces, not needed for plain text
+            pos += 3 + struct.unpack_from('<H', clx, pos + 1)[0]
+        if pos >= len(clx) or clx[pos] != 0x02:
+            raise CompoundFileError("Piece table not found")
+        lcb = struct.unpack_from('<I', clx, pos + 1)[0]
+        plc = clx[pos + 5:pos + 5 + lcb]
+        count = (lcb - 4) // 12
+        cps = struct.unpack_from(f'<{count + 1}I', plc, 0)
+        pieces = []
+        for i in range(count):
+            fc = struct.unpack_from('<I', plc, 4 * (count + 1) + 8 * i + 2)[0]
+            compressed = bool(fc & self.COMPRESSED_FC)
+            fc &= ~self.COMPRESSED_FC
+            pieces.append((cps[i], cps[i + 1], fc // 2 if compressed else fc, compressed))
+        return pieces
+    
+    @staticmethod
+    def _scan_papx(grpprl: bytes) -> Tuple[int, bool, bool]:
+        """Return (style index, in table, table row end) from a GrpPrlAndIstd"""
+        if len(grpprl) < 2:
+            return 0, False, False
+        style = struct.unpack_from('<H', grpprl, 0)[0]
+        in_table = row_end = False
+        pos = 2
+        while pos + 2 < len(grpprl):
+            sprm = struct.unpack_from('<H', grpprl, pos)[0]
+            pos += 2
+            spra = sprm >> 13
+            if spra == 6:
+                size = grpprl[pos] + 1
+            else:
+                size = SPRM_OPERAND_SIZES.get(spra, 1)
+            operand = grpprl[pos]
+            if sprm == SPRM_P_F_IN_TABLE:
+                in_table = operand != 0
+            elif sprm in (SPRM_P_F_TTP, SPRM_P_F_INNER_TTP):
+                row_end = operand != 0
+            elif sprm == SPRM_P_ITAP and pos + 4 <= len(grpprl):
+                in_table = in_table or struct.unpack_from('<i', grpprl, pos)[0] > 0
+            pos += size
+        return style, in_table, row_end
+    
+    def _paragraph_properties(self, table_stream: CompoundStream) -> Tuple[List[int], List[Tuple[int, bool, bool]]]:
+        """Return parallel lists of FC range starts and (style, in table, row end) from the PAPX FKPs"""
+        starts, properties = [], []
+        if not self.lcb_plcf_bte_papx:
+            return starts, properties
+        plc = table_stream.read_at(self.fc_plcf_bte_papx, self.lcb_plcf_bte_papx)
+        count = (len(plc) - 4) // 8
+        page_numbers = struct.unpack_from(f'<{count}I', plc, 4 * (count + 1))
+        for page_number in page_numbers:
+            page = self.word_stream.read_at((page_number & 0x3FFFFF) * 512, 512)
+            if len(page) < 512:
+                continue
+            run_count = page[511]
+            fcs = struct.unpack_from(f'<{run_count + 1}I', page, 0)
+            for i in range(run_count):
+                offset = page[4 * (run_count + 1) + 13 * i] * 2
+                papx = (0, False, False)
+                if offset:
+                    # PapxInFkp: a zero count byte means the real (word) count follows
+                    if page[offset] == 0:
+                        grpprl = page[offset + 2:offset + 2 + 2 * page[offset + 1]]
+                    else:
+                        grpprl = page[offset + 1:offset + 2 * page[offset]]
+                    papx = self._scan_papx(grpprl)
+                starts.append(fcs[i])
+                properties.append(papx)
+        return starts, properties
+    
+    def paragraphs(self):
+        """Yield (text, mark, style, in table, row end) for each paragraph of the main text.
+
+        ``mark`` is the character that ended the paragraph: a paragraph mark
+        (\\r) or a table cell/row end mark (\\x07). ``row_end`` is None when
+        no paragraph properties cover the paragraph.
+        """
+        table_stream = self.container.open_stream(self.table_name)
+        property_starts, properties = self._paragraph_properties(table_stream)
+        buffer = []
+        for cp_start, cp_end, fc, compressed in self._pieces(table_stream):
+            if cp_start >= self.ccp_text:
+                break
+            cp_end = min(cp_end, self.ccp_text)
+            width = 1 if compressed else 2
+            data = self.word_stream.read_at(fc, (cp_end - cp_start) * width)
+            text = data.decode('cp1252', errors='replace') if compressed else data.decode('utf-16-le', errors='replace')
+            start = 0
+            for match in PARAGRAPH_MARK_PATTERN.finditer(text):
+                mark = match.start()
+                buffer.append(text[start:mark])
+                index = bisect.bisect_right(property_starts, fc + mark * width) - 1
+                style, in_table, row_end = properties[index] if index >= 0 else (0, False, None)
+                yield ''.join(buffer), match.group(), style, in_table, row_end
+                buffer = []
+                start = mark + 1
+            buffer.append(text[start:])
+        if any(buffer):
+            yield ''.join(buffer), '\r', 0, False, False
+
+class OutputSink(abc.ABC):
+    """Destination for the files of a conversion.
+
+    Files are addressed relative to the document's output folder: the
+    markdown file (markdown_path), conversion_report.md and images/<name>.
+    begin() is called once per document before anything is written. Image
+    writes may come from several threads (image_workers), so sinks that
+    share state must lock it. Subclasses implement open, size and location.
+    """
+    
+    markdown_path = None
+    
+    def begin(self, source_name: str, images: bool = True):
+        """Prepare for the files of one document"""
+        self.markdown_path = f"{Path(source_name).stem}.md"
+    
+    @abc.abstractmethod
+    def open(self, path: str, text: bool = False):
+        """Writable stream for one file, text (UTF-8) or binary; closing it completes the file"""
+    
+    def copy_part(self, path: str, package: DocxPackage, part: str) -> int:
+        """Copy a package part to path; returns the number of bytes written"""
+        with self.open(path) as target, package.open(part) as source:
+            shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+        return package.entries[part].file_size
+    
+    def image_url(self, path: str, package: DocxPackage, part: str) -> str:
+        """Link target the markdown uses for an image that copy_part writes to path"""
+        return path
+    
+    def write_text(self, path: str, content):
+        """Write a str or MarkdownWriter to path"""
+        with self.open(path, text=True) as f:
+            if isinstance(content, MarkdownWriter):
+                content.write_to(f)
+            else:
+                f.write(content)
+    
+    def spool(self, path: str):
+        """Temporary text file to build path in before it is written; removed when closed"""
+        return tempfile.TemporaryFile('w+', encoding='utf-8')
+    
+    @abc.abstractmethod
+    def size(self, path: str) -> int:
+        """Size in bytes of a file that has been written"""
+    
+    @abc.abstractmethod
+    def location(self, path: str = "") -> str:
+        """Human-readable location of a file (or of the document folder) for reports"""
+    
+    def commit(self):
+        """Publish the files of the current document once all of them are written"""
+    
+    def abort(self):
+        """Discard whatever was written for the current document, if the sink can"""
+    
+    def close(self):
+        """Finish the output; sinks shared by several documents are closed by their owner"""
+
+# Staging folders and temporary files left behind by a killed conversion are
+# removed by the next conversion of the same document once they are this old
+STALE_OUTPUT_SECONDS = 3600
+
+def _unique_name(name: str) -> str:
+    """A hidden sibling name for temporary output, unique per process and call"""
+    return f".{name}.{os.getpid()}-{os.urandom(4).hex()}"
+
+def _fsync_path(path: Path):
+    """Flush a file, or a directory entry list where the platform supports it, to stable storage"""
+    if path.is_dir():
+        if os.name == 'nt':
+            return
+        flags = os.O_RDONLY
+    else:
+        flags = os.O_RDWR if os.name == 'nt' else os.O_RDONLY
+    fd = os.open(str(path), flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _remove_stale(folder: Path, pattern: str):
+    """Delete leftovers of killed conversions matching pattern in folder"""
+    cutoff = time.time() - STALE_OUTPUT_SECONDS
+    for leftover in folder.glob(pattern):
+        try:
+            if leftover.lstat().st_mtime >= cutoff:
+                continue
+            if leftover.is_dir():
+                shutil.rmtree(str(leftover), ignore_errors=True)
+            else:
+                leftover.unlink()
+            logger.info(f"Removed stale output: {leftover}")
+        except OSError:
+            continue
+
+class AtomicFile:
+    """A file written under a temporary name and renamed over path when it is closed.
+
+    Readers of path see the previous file until the new one is complete; if
+    the with-block raises, the temporary file is removed and path is left
+    untouched. With fsync=True the data reaches the disk before the rename.
+    """
+    
+    def __init__(self, path, text: bool = False, fsync: bool = False):
+        self.path = Path(path)
+        self.temporary = self.path.parent / (_unique_name(self.path.name) + ".tmp")
+        self.fsync = fsync
+        # Exclusive create rather than mkstemp, so the file gets the usual umask permissions
+        if text:
+            self._file = open(self.temporary, 'x', encoding='utf-8')
+        else:
+            self._file = open(self.temporary, 'xb')
+    
+    def write(self, data):
+        return self._file.write(data)
+    
+    def writelines(self, lines):
+        self._file.writelines(lines)
+    
+    def close(self):
+        """Publish the file"""
+        if self._file.closed:
+            return
+        try:
+            if self.fsync:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(str(self.temporary), str(self.path))
+        except BaseException:
+            self.discard()
+            raise
+    
+    def discard(self):
+        """Drop the temporary file and leave path as it was"""
+        self._file.close()
+        if os.path.exists(str(self.temporary)):
+            os.remove(str(self.temporary))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+# How a document's images refer to the shared media store: hard links or
+# symbolic links in images/, or markdown links straight into the store
+MEDIA_MODES = ('hardlink', 'symlink', 'markdown')
+
+class MediaStore:
+    """Content-addressed folder of image files shared by many documents.
+
+    Each distinct image is stored once as <root>/<aa>/<sha256><ext>. A part
+    is inflated once: its bytes are hashed while they are copied to a
+    temporary file in the store, which becomes the stored file, or is
+    discarded when identical bytes are already there. Documents then hard link or symlink their images/
+    entries to the stored file (copying it where links are not supported),
+    or, in markdown mode, link to it from the markdown directly.
+    """
+    
+    def __init__(self, root: str, mode: str = 'hardlink'):
+        if mode not in MEDIA_MODES:
+            raise ValueError(f"Unknown media store mode '{mode}'; expected one of {', '.join(MEDIA_MODES)}")
+        self.root = Path(root)
+        self.mode = mode
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def path_for(self, digest: str, part: str) -> Path:
+        return self.root / digest[:2] / (digest + posixpath.splitext(part)[1].lower())
+    
+    def add(self, package: DocxPackage, part: str) -> Tuple[Path, int]:
+        """Store a part unless identical bytes already are; returns (stored file, bytes written)"""
+        if package.allowed_size(part) < package.entries[part].file_size:
+            raise PartLimitError(package.limit_reason(part))
+        digest = hashlib.sha256()
+        written = 0
+        temporary = self.root / (_unique_name(posixpath.basename(part)) + ".tmp")
+        try:
+            with package.open(part) as source, open(temporary, 'wb') as target:
+                for chunk in iter(lambda: source.read(COPY_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    target.write(chunk)
+                    written += len(chunk)
+            stored = self.path_for(digest.hexdigest(), part)
+            if stored.exists():
+                temporary.unlink()
+                return stored, written
+            stored.parent.mkdir(parents=True, exist_ok=True)
+            # Two documents may store the same new image at once; both copies are identical
+            os.replace(str(temporary), str(stored))
+        except BaseException:
+            if temporary.exists():
+                temporary.unlink()
+            raise
+        return stored, written
+    
+    def place(self, stored: Path, destination: Path, final: Path) -> int:
+        """Make destination refer to a stored file; returns bytes written.
+
+        final is where destination ends up once the output is published,
+        which is what a relative symlink has to be computed from.
+        """
+        try:
+            if self.mode == 'symlink':
+                os.symlink(os.path.relpath(str(stored.resolve()), str(final.parent.resolve())), str(destination))
+            else:
+                os.link(str(stored), str(destination))
+            return 0
+        except (OSError, NotImplementedError, ValueError) as e:
+            # e.g. another file system, no symlink privilege on Windows or the hard link limit
+            logger.info(f"Could not link {destination.name} to the media store ({e}); copying it")
+            shutil.copyfile(str(stored), str(destination))
+            return stored.stat().st_size
+    
+    def url(self, stored: Path, folder: Path) -> str:
+        """Markdown link target for a stored file, relative to the markdown file's folder"""
+        try:
+            return Path(os.path.relpath(str(stored.resolve()), str(folder.resolve()))).as_posix()
+        except ValueError:
+            # Different drives on Windows
+            return stored.resolve().as_uri()
+
+class DirectorySink(OutputSink):
+    """Writes each document to <output_folder>/<name>/, or next to an explicit .md path.
+
+    Nothing is ever half-written where readers look. With staged=True the
+    document folder is built in a hidden sibling folder and moved over the
+    previous output by commit(), so readers see either the old tree or the
+    complete new one. Otherwise (and always for explicit .md outputs, whose
+    folder is shared with other files) each file is written under a
+    temporary name and renamed into place. With fsync=True the data is
+    flushed to disk before it becomes visible: staged files in one pass at
+    commit(), other files as they are closed. With a MediaStore, images
+    are written to the store and only linked from the document.
+    """
+    
+    def __init__(self, output_folder: str = "TargetMDDirectory", staged: bool = False, fsync: bool = False,
+                 media: MediaStore = None):
+        self.output_folder = output_folder
+        self.staged = staged
+        self.fsync = fsync
+        self.media = media
+        # Part name -> media store file, for parts already added; image_url and
+        # copy_part (possibly on an image writer thread) share it so each part is read once
+        self._stored = {}
+        self._store_locks = {}
+        self._lock = threading.Lock()
+        # target is where the document's files end up; root is where they are being written
+        self.target = self.root = None
+    
+    def begin(self, source_name: str, images: bool = True):
+        self.target, markdown_file = DocxToMarkdownConverter.output_paths(source_name, self.output_folder)
+        self.markdown_path = markdown_file.name
+        if self.staged and Path(self.output_folder).suffix.lower() != ".md":
+            self.target.parent.mkdir(parents=True, exist_ok=True)
+            _remove_stale(self.target.parent, f".{self.target.name}.*-*")
+            self.root = self.target.parent / (_unique_name(self.target.name) + ".staging")
+            self.root.mkdir()
+        else:
+            self.root = self.target
+            self.root.mkdir(parents=True, exist_ok=True)
+            _remove_stale(self.root, f".{self.markdown_path}.*.tmp")
+            _remove_stale(self.root, f"{self.markdown_path}.*.part")
+        self._stored = {}
+        self._store_locks = {}
+        if images and not (self.media is not None and self.media.mode == 'markdown'):
+            (self.root / "images").mkdir(parents=True, exist_ok=True)
+    
+    def commit(self):
+        if self.root != self.target:
+            if self.fsync:
+                for folder, _, files in os.walk(str(self.root)):
+                    for name in files:
+                        _fsync_path(Path(folder) / name)
+                    _fsync_path(Path(folder))
+            replace_tree(self.root, self.target)
+            if self.fsync:
+                _fsync_path(self.target.parent)
+            self.root = self.target
+    
+    def abort(self):
+        if self.root != self.target:
+            shutil.rmtree(str(self.root), ignore_errors=True)
+            self.root = self.target
+    
+    def open(self, path: str, text: bool = False):
+        if self.root != self.target:
+            # Inside a staging folder nobody is reading yet
+            if text:
+                return open(self.root / path, 'w', encoding='utf-8')
+            return open(self.root / path, 'wb')
+        return AtomicFile(self.root / path, text=text, fsync=self.fsync)
+    
+    def copy_part(self, path: str, package: DocxPackage, part: str) -> int:
+        written = 0
+        if self.media is not None:
+            stored, written = self._store(package, part)
+            if self.media.mode == 'markdown':
+                return written
+        if self.root != self.target:
+            if self.media is not None:
+                return written + self.media.place(stored, self.root / path, self.target / path)
+            # DocxPackage.copy_to can sendfile stored parts straight into the file
+            return package.copy_to(part, self.root / path)
+        destination = self.root / path
+        temporary = destination.parent / (_unique_name(destination.name) + ".tmp")
+        if self.media is not None:
+            copied = written + self.media.place(stored, temporary, destination)
+        else:
+            copied = package.copy_to(part, temporary)
+        try:
+            if self.fsync:
+                _fsync_path(temporary)
+            os.replace(str(temporary), str(destination))
+        except BaseException:
+            if temporary.exists():
+                temporary.unlink()
+            raise
+        return copied
+    
+    def image_url(self, path: str, package: DocxPackage, part: str) -> str:
+        if self.media is None or self.media.mode != 'markdown':
+            return path
+        stored, _ = self._store(package, part)
+        return self.media.url(stored, self.target)
+    
+    def _store(self, package: DocxPackage, part: str) -> Tuple[Path, int]:
+        """Add a part to the media store once per document; returns (stored file, bytes written)"""
+        with self._lock:
+            part_lock = self._store_locks.setdefault(part, threading.Lock())
+        with part_lock:
+            if part in self._stored:
+                return self._stored[part], 0
+            stored, written = self.media.add(package, part)
+            self._stored[part] = stored
+            return stored, written
+    
+    def spool(self, path: str):
+        # Next to the output, so the body can be followed as it is rendered
+        return tempfile.NamedTemporaryFile('w+', encoding='utf-8', dir=str(self.root), prefix=f"{path}.", suffix='.part')
+    
+    def size(self, path: str) -> int:
+        return (self.root / path).stat().st_size
+    
+    def location(self, path: str = "") -> str:
+        return str(self.target / path) if path else str(self.target)
+
+def replace_tree(staged: Path, target: Path):
+    """Move a finished staging folder to target, replacing any previous output.
+
+    The old folder is renamed aside first and removed afterwards, so target
+    always holds a complete tree except for the instant between two renames.
+    If another process publishes the same target in that instant, the swap
+    is retried and the last writer wins.
+    """
+    for attempt in range(3):
+        retired = target.parent / (_unique_name(target.name) + ".old")
+        try:
+            os.rename(str(target), str(retired))
+        except FileNotFoundError:
+            retired = None
+        try:
+            os.rename(str(staged), str(target))
+            return
+        except OSError:
+            if attempt == 2:
+                raise
+        finally:
+            if retired is not None:
+                shutil.rmtree(str(retired), ignore_errors=True)
+
+class _SinkBuffer(io.BytesIO):
+    """In-memory file that hands its content to a callback when it is closed"""
+    
+    def __init__(self, on_close):
+        super().__init__()
+        self._on_close = on_close
+    
+    def close(self):
+        if not self.closed:
+            self._on_close(self.getvalue())
+        super().close()
+
+class MemorySink(OutputSink):
+    """Keeps the files of one document in ``files`` (relative path -> bytes)"""
+    
+    def __init__(self):
+        self.files = {}
+    
+    def open(self, path: str, text: bool = False):
+        buffer = _SinkBuffer(lambda data: self.files.__setitem__(path, data))
+        return io.TextIOWrapper(buffer, encoding='utf-8') if text else buffer
+    
+    def copy_part(self, path: str, package: DocxPackage, part: str) -> int:
+        data = package.read(part, cache=False)
+        self.files[path] = data
+        return len(data)
+    
+    def images(self) -> Dict[str, bytes]:
+        """Image filename -> bytes"""
+        return {path[len("images/"):]: data for path, data in self.files.items() if path.startswith("images/")}
+    
+    def size(self, path: str) -> int:
+        return len(self.files[path])
+    
+    def location(self, path: str = "") -> str:
+        return f"In memory ({path})" if path else "In memory"
+
+class ArchiveSink(OutputSink):
+    """Streams documents into a zip or tar archive, each under a <name>/ folder.
+
+    target is a path or a writable binary stream. Zip entries are written
+    as they are produced, so a non-seekable stream such as a pipe or an
+    upload works; tar needs each entry's size up front, so text files are
+    buffered until they are closed while images are streamed from the
+    package. Several documents can share one archive; close() finishes it.
+    """
+    
+    FORMATS = ('zip', 'tar', 'tar.gz')
+    
+    def __init__(self, target, archive_format: str = 'zip'):
+        if archive_format not in self.FORMATS:
+            raise ValueError(f"Unknown archive format '{archive_format}'; expected one of {', '.join(self.FORMATS)}")
+        self.target = target
+        self.archive_format = archive_format
+        self.prefix = ""
+        self._sizes = {}
+        self._lock = threading.Lock()
+        if archive_format == 'zip':
+            self._archive = zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED)
+        else:
+            compression = 'gz' if archive_format == 'tar.gz' else ''
+            if hasattr(target, 'write'):
+                # Stream mode: the target is never seeked
+                self._archive = tarfile.open(fileobj=target, mode=f'w|{compression}')
+            else:
+                self._archive = tarfile.open(target, f'w:{compression}')
+    
+    def begin(self, source_name: str, images: bool = True):
+        super().begin(source_name, images)
+        self.prefix = f"{Path(source_name).stem}/"
+    
+    def _add(self, path: str, data: bytes):
+        with self._lock:
+            if self.archive_format == 'zip':
+                self._archive.writestr(self.prefix + path, data)
+            else:
+                info = tarfile.TarInfo(self.prefix + path)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                self._archive.addfile(info, io.BytesIO(data))
+            self._sizes[self.prefix + path] = len(data)
+    
+    def open(self, path: str, text: bool = False):
+        buffer = _SinkBuffer(lambda data: self._add(path, data))
+        return io.TextIOWrapper(buffer, encoding='utf-8') if text else buffer
+    
+    def copy_part(self, path: str, package: DocxPackage, part: str) -> int:
+        size = package.entries[part].file_size
+        with self._lock, package.open(part) as source:
+            if self.archive_format == 'zip':
+                with self._archive.open(self.prefix + path, 'w', force_zip64=size >= zipfile.ZIP64_LIMIT) as target:
+                    shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+            else:
+                info = tarfile.TarInfo(self.prefix + path)
+                info.size = size
+                info.mtime = int(time.time())
+                self._archive.addfile(info, source)
+            self._sizes[self.prefix + path] = size
+        return size
+    
+    def size(self, path: str) -> int:
+        return self._sizes[self.prefix + path]
+    
+    def location(self, path: str = "") -> str:
+        name = self.target if isinstance(self.target, (str, Path)) else "archive"
+        return f"{name}:{self.prefix}{path}"
+    
+    def close(self):
+        self._archive.close()
 
 class DocxToMarkdownConverter:
     """Universal document converter for both .doc and .docx files"""
     
-    def __init__(self, input_file: str, output_folder: str = "TargetMDDirectory"):
-        self.input_file = input_file
+    def __init__(self, input_file, output_folder: str = "TargetMDDirectory", streaming: bool = True,
+                 image_workers: int = 0, image_mode: str = "eager", profile: bool = False,
+                 body_workers: int = 0, name: str = None, sink: OutputSink = None,
+                 max_part_size: int = MAX_PART_SIZE, max_ratio: float = MAX_COMPRESSION_RATIO,
+                 max_total_size: int = MAX_TOTAL_SIZE, split_level: int = 0):
+        if image_mode not in IMAGE_MODES:
+            raise ValueError(f"Unknown image mode '{image_mode}'; expected one of {', '.join(IMAGE_MODES)}")
+        if not 0 <= split_level <= 6:
+            raise ValueError(f"split_level must be 0 (no split) or a heading level from 1 to 6, not {split_level}")
+        # input_file is a path, bytes or a binary file object; source_name labels it in output
+        self.input_file, self.source_name = open_source(input_file, name)
+        self.streaming = streaming
+        # eager: copy every media part; lazy: copy only images the body references;
+        # links: write markdown references without copying any image bytes
+        self.image_mode = image_mode
+        self._image_parts = {}
+        self._materialized = {}
+        self.images_linked = []
+        # Extracted image filename -> markdown link target, resolved on first reference
+        self.image_urls = {}
+        # With image_workers > 0, image files are written by a thread pool while text is parsed
+        self.image_workers = image_workers
+        # With body_workers > 1, large document bodies are rendered in chunks on a process pool
+        self.body_workers = body_workers
+        self._image_executor = None
+        self._image_writes = []
+        # Byte counters survive package reopens; the profiler reads them per phase,
+        # and the decompression limits count the whole document against max_total_size
+        self.io = IOCounters()
+        self.package_limits = {'max_part_size': max_part_size, 'max_ratio': max_ratio,
+                               'max_total_size': max_total_size, 'on_limit': self._part_limited}
+        self._limited_parts = set()
+        self.profiler = ConversionProfiler(self.io, enabled=profile)
+        self.package = None
         self.images_extracted = []
+        # Package part name (and its lower-case form) -> extracted image filename
+        self.image_index = {}
         self.headings = []
+        # With split_level > 0, write_markdown starts a new file at each heading of that level or above
+        self.split_level = split_level
+        self.section_files = []
         self.warnings = ConversionWarning()
-        doc_name = Path(input_file).stem
-        # If output_folder ends with .md, treat as file, else as directory
-        output_path = Path(output_folder)
-        if output_path.suffix.lower() == ".md":
-            self.doc_output_path = output_path.parent
-            self.output_markdown_file = output_path
+        # Output goes to a sink: output_folder on disk by default, memory when it is None
+        if sink is None:
+            sink = DirectorySink(output_folder) if output_folder is not None else MemorySink()
+        self.sink = sink
+        self.sink.begin(self.source_name, images=image_mode != "links")
+        if isinstance(sink, DirectorySink):
+            self.doc_output_path = sink.target
+            self.output_markdown_file = sink.target / sink.markdown_path
+            self.images_path = sink.target / "images"
         else:
-            self.doc_output_path = output_path / doc_name
-            self.output_markdown_file = self.doc_output_path / f"{doc_name}.md"
-        self.images_path = self.doc_output_path / "images"
-        self.doc_output_path.mkdir(parents=True, exist_ok=True)
-        self.images_path.mkdir(parents=True, exist_ok=True)
+            self.doc_output_path = self.output_markdown_file = self.images_path = None
         
-        logger.info(f"Document output directory: {self.doc_output_path}")
-        logger.info(f"Images directory: {self.images_path}")
+        logger.info(f"Document output directory: {self.sink.location()}")
+        logger.info(f"Images directory: {self.sink.location('images')}")
         
         # Determine file type
         self.file_type = self._detect_file_type()
         logger.info(f"Detected file type: {self.file_type}")
     
+    @staticmethod
+    def output_paths(input_file: str, output_folder: str) -> Tuple[Path, Path]:
+        """Return (document output directory, markdown file) for an input and output folder"""
+        doc_name = Path(input_file).stem
+        # If output_folder ends with .md, treat as file, else as directory
+        output_path = Path(output_folder)
+        if output_path.suffix.lower() == ".md":
+            return output_path.parent, output_path
+        doc_output_path = output_path / doc_name
+        return doc_output_path, doc_output_path / f"{doc_name}.md"
+    
     def _detect_file_type(self) -> str:
         """Detect if file is .doc or .docx"""
         try:
-            # Check if it's a ZIP file (DOCX)
-            if zipfile.is_zipfile(self.input_file):
+            # Check if it's a ZIP file (DOCX); the opened package is reused by every stage
+            try:
+                self.package = DocxPackage(self.input_file, self.io, **self.package_limits)
                 return "docx"
+            except zipfile.BadZipFile:
+                pass
             
             # Check if it's an OLE file (DOC)
-            with open(self.input_file, 'rb') as f:
-                header = f.read(8)
-                if header[:4] == b'\xd0\xcf\x11\xe0':
-                    return "doc"
+            if self._read_source(8)[:4] == b'\xd0\xcf\x11\xe0':
+                return "doc"
                     
             return "unknown"
         except Exception as e:
             logger.error(f"Failed to detect file type: {e}")
             return "unknown"
+
+    def _read_source(self, size: int = -1) -> bytes:
+        """Read the start (or all) of the input, whether it is a path or a stream"""
+        if hasattr(self.input_file, 'read'):
+            self.input_file.seek(0)
+            data = self.input_file.read(size)
+            self.input_file.seek(0)
+            return data
+        with open(self.input_file, 'rb') as f:
+            return f.read(size)
+
+    def _source_size(self) -> int:
+        """Size of the input in bytes"""
+        if hasattr(self.input_file, 'read'):
+            position = self.input_file.tell()
+            size = self.input_file.seek(0, os.SEEK_END)
+            self.input_file.seek(position)
+            return size
+        return os.path.getsize(self.input_file)
+
+    def _get_package(self) -> DocxPackage:
+        """Return the shared package session, reopening it after close()"""
+        if self.package is None or self.package.closed:
+            self.package = DocxPackage(self.input_file, self.io, **self.package_limits)
+        return self.package
+    
+    def _part_limited(self, part: str, reason: str):
+        """Record a part cut off by the decompression limits, once per part"""
+        if part in self._limited_parts:
+            return
+        self._limited_parts.add(part)
+        self.warnings.add_warning(
+            "Decompression Limit Reached",
+            reason,
+            "Read the part only up to the limit and converted what it contained"
+        )
+
+    def close(self):
+        """Finish pending image writes and release the package session"""
+        self._finish_image_writes()
+        if self.package is not None:
+            self.package.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def extract_images_docx(self) -> Dict[str, str]:
         """Extract images from DOCX file with enhanced error handling"""
@@ -123,72 +1653,58 @@ class DocxToMarkdownConverter:
         image_counter = 1
         
         try:
-            with zipfile.ZipFile(self.input_file, 'r') as docx_zip:
-                # Find all image files
-                image_files = [f for f in docx_zip.namelist() 
-                             if f.startswith('word/media/') and 
-                             any(f.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.svg'])]
-                
-                for image_file in image_files:
-                    try:
-                        # Check for access restrictions
-                        try:
-                            # Extract image data
-                            image_data = docx_zip.read(image_file)
-                            
-                            # Check if image data is valid
-                            if len(image_data) == 0:
-                                self.warnings.add_warning(
-                                    "Empty Image File",
-                                    f"Image file {image_file} is empty or corrupted",
-                                    "Skipped empty image and continued processing"
-                                )
-                                continue
-                                
-                        except (zipfile.BadZipFile, PermissionError, OSError) as e:
-                            self.warnings.add_sensitive_content_warning("permissions")
-                            self.warnings.add_warning(
-                                "Image Access Restricted",
-                                f"Cannot access image {image_file}: {str(e)}",
-                                "Skipped restricted image and continued processing"
-                            )
-                            continue
-                        
-                        # Generate new filename
-                        original_name = os.path.basename(image_file)
-                        name, ext = os.path.splitext(original_name)
-                        new_filename = f"image_{image_counter:03d}_{name}{ext}"
-                        
-                        # Save image with error handling
-                        try:
-                            image_path = self.images_path / new_filename
-                            with open(image_path, 'wb') as img_file:
-                                img_file.write(image_data)
-                            
-                            # Store mapping
-                            image_mapping[original_name] = new_filename
-                            image_mapping[image_file] = new_filename
-                            
-                            self.images_extracted.append(new_filename)
-                            image_counter += 1
-                            logger.info(f"Extracted image: {new_filename}")
-                            
-                        except (PermissionError, OSError) as e:
-                            self.warnings.add_warning(
-                                "Image Save Error",
-                                f"Could not save image {new_filename}: {str(e)}",
-                                "Skipped problematic image and continued processing"
-                            )
-                            continue
-                            
-                    except Exception as e:
+            docx_zip = self._get_package()
+            # Find all image files
+            image_files = [f for f in docx_zip.namelist() 
+                         if f.startswith('word/media/') and 
+                         any(f.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.svg'])]
+            
+            for image_file in image_files:
+                try:
+                    # Check if image data is valid
+                    if docx_zip.entries[image_file].file_size == 0:
+                        self.warnings.add_warning(
+                            "Empty Image File",
+                            f"Image file {image_file} is empty or corrupted",
+                            "Skipped empty image and continued processing"
+                        )
+                        continue
+                    limit_reason = docx_zip.limit_reason(image_file)
+                    if limit_reason:
+                        self._limited_parts.add(image_file)
                         self.warnings.add_warning(
-                            "Image Processing Error",
-                            f"Error processing image {image_file}: {str(e)}",
-                            "Skipped problematic image and continued processing"
+                            "Decompression Limit Reached",
+                            limit_reason,
+                            "Skipped the image rather than writing a truncated file"
                         )
                         continue
+                    
+                    # Generate new filename
+                    original_name = os.path.basename(image_file)
+                    name, ext = os.path.splitext(original_name)
+                    new_filename = f"image_{image_counter:03d}_{name}{ext}"
+                    
+                    # Lazy and links-only modes just reserve the name; the bytes are
+                    # copied on first reference (lazy) or never (links)
+                    if self.image_mode == 'eager' and not self._materialize_image(image_file, new_filename):
+                        continue
+                    
+                    # Store mapping
+                    image_mapping[original_name] = new_filename
+                    image_mapping[image_file] = new_filename
+                    self.image_index[image_file] = new_filename
+                    self.image_index.setdefault(image_file.lower(), new_filename)
+                    self._image_parts[new_filename] = image_file
+                    image_counter += 1
                         
+                except Exception as e:
+                    self.warnings.add_warning(
+                        "Image Processing Error",
+                        f"Error processing image {image_file}: {str(e)}",
+                        "Skipped problematic image and continued processing"
+                    )
+                    continue
+                    
         except (zipfile.BadZipFile, PermissionError) as e:
             self.warnings.add_sensitive_content_warning("permissions")
             self.warnings.add_warning(
@@ -205,6 +1721,77 @@ class DocxToMarkdownConverter:
             
         return image_mapping
     
+    def _image_link(self, new_filename: str) -> str:
+        """Markdown link target of an image, asked of the sink once the image is referenced.
+
+        Under a markdown-mode media store the link names the stored file, so
+        only images the body actually uses are read and stored.
+        """
+        image_url = self.image_urls.get(new_filename)
+        if image_url is None:
+            image_url = f"images/{new_filename}"
+            if self.image_mode != 'links':
+                image_url = self.sink.image_url(image_url, self._get_package(), self._image_parts[new_filename])
+            self.image_urls[new_filename] = image_url
+        return image_url
+    
+    def _materialize_image(self, image_file: str, new_filename: str) -> bool:
+        """Write one image to the images folder; returns False if it could not be saved"""
+        if new_filename in self._materialized:
+            return self._materialized[new_filename]
+        docx_zip = self._get_package()
+        image_path = f"images/{new_filename}"
+        if self.image_workers > 0:
+            # Names are assigned up front so markdown can reference the image while it is written
+            if self._image_executor is None:
+                self._image_executor = ThreadPoolExecutor(max_workers=self.image_workers)
+            future = self._image_executor.submit(self.sink.copy_part, image_path, docx_zip, image_file)
+            self._image_writes.append((future, image_file, new_filename))
+        else:
+            # Stream image to disk with error handling
+            try:
+                self.io.add_written(self.sink.copy_part(image_path, docx_zip, image_file))
+            except zipfile.BadZipFile as e:
+                self.warnings.add_sensitive_content_warning("permissions")
+                self.warnings.add_warning(
+                    "Image Access Restricted",
+                    f"Cannot access image {image_file}: {str(e)}",
+                    "Skipped restricted image and continued processing"
+                )
+                self._materialized[new_filename] = False
+                return False
+            except (PermissionError, OSError) as e:
+                self.warnings.add_warning(
+                    "Image Save Error",
+                    f"Could not save image {new_filename}: {str(e)}",
+                    "Skipped problematic image and continued processing"
+                )
+                self._materialized[new_filename] = False
+                return False
+            logger.info(f"Extracted image: {new_filename}")
+        self.images_extracted.append(new_filename)
+        self._materialized[new_filename] = True
+        return True
+    
+    def _finish_image_writes(self):
+        """Wait for background image writes and report any that failed"""
+        if self._image_executor is None:
+            return
+        for future, image_file, new_filename in self._image_writes:
+            try:
+                self.io.add_written(future.result())
+                logger.info(f"Extracted image: {new_filename}")
+            except Exception as e:
+                self.images_extracted.remove(new_filename)
+                self.warnings.add_warning(
+                    "Image Save Error",
+                    f"Could not save image {new_filename}: {str(e)}",
+                    "Skipped problematic image; its markdown reference may be broken"
+                )
+        self._image_writes = []
+        self._image_executor.shutdown()
+        self._image_executor = None
+
     def _process_paragraph_text(self, paragraph, namespaces) -> str:
         """Enhanced paragraph processing with better style, bullet/list, and hyperlink preservation"""
         full_text = ""
@@ -274,78 +1861,281 @@ class DocxToMarkdownConverter:
             return f"- {full_text.strip()}"
         return full_text.strip()
 
-    def _get_hyperlink_mappings(self, docx_zip) -> Dict[str, str]:
+    def _get_hyperlink_mappings(self, package: DocxPackage) -> Dict[str, str]:
         """Get hyperlink mappings from document.xml.rels"""
         hyperlink_mapping = {}
         try:
-            if 'word/_rels/document.xml.rels' in docx_zip.namelist():
-                rels_xml = docx_zip.read('word/_rels/document.xml.rels').decode('utf-8')
-                rels_root = ET.fromstring(rels_xml)
-                for rel in rels_root.findall('.//{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'):
-                    rel_id = rel.get('Id')
-                    target = rel.get('Target')
-                    rel_type = rel.get('Type')
-                    if rel_id and target and rel_type and rel_type.endswith('/hyperlink'):
-                        hyperlink_mapping[rel_id] = target
+            for rel_id, target, rel_type in package.relationships():
+                if rel_id and target and rel_type and rel_type.endswith('/hyperlink'):
+                    hyperlink_mapping[rel_id] = target
         except Exception as e:
             logger.warning(f"Failed to read hyperlink mappings: {e}")
         return hyperlink_mapping
 
     def extract_text_docx(self) -> str:
         """Enhanced DOCX text extraction with better formatting and hyperlink preservation"""
-        text_content = ""
+        writer = MarkdownWriter()
+        self.write_text_docx(writer)
+        return writer.getvalue()
+
+    def write_text_docx(self, writer: 'MarkdownWriter'):
+        """Render the DOCX body into ``writer`` block by block"""
         try:
-            with zipfile.ZipFile(self.input_file, 'r') as docx_zip:
-                if 'word/document.xml' not in docx_zip.namelist():
-                    logger.error("No word/document.xml found in DOCX file")
-                    return text_content
-                document_xml = docx_zip.read('word/document.xml').decode('utf-8')
+            package = self._get_package()
+            if 'word/document.xml' not in package:
+                logger.error("No word/document.xml found in DOCX file")
+                return
+            namespaces = NAMESPACES
+            relationship_mapping = self._get_relationship_mappings(package)
+            self.hyperlink_mapping = self._get_hyperlink_mappings(package)
+            if (self.body_workers > 1 and package.entries['word/document.xml'].file_size >= PARALLEL_BODY_MIN_BYTES
+                    and self._render_body_parallel(package, relationship_mapping, writer)):
+                pass
+            elif self.streaming:
+                with package.open('word/document.xml') as document_stream:
+                    blocks = self._iter_body_blocks(document_stream)
+                    self._render_body_blocks(blocks, namespaces, relationship_mapping, writer)
+            else:
+                document_xml = package.read('word/document.xml', cache=False).decode('utf-8')
                 root = ET.fromstring(document_xml)
-                namespaces = {
-                    'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
-                    'wp': 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing',
-                    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
-                    'pic': 'http://schemas.openxmlformats.org/drawingml/2006/picture',
-                    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
-                }
-                relationship_mapping = self._get_relationship_mappings(docx_zip)
-                self.hyperlink_mapping = self._get_hyperlink_mappings(docx_zip)
                 body = root.find('.//w:body', namespaces)
                 if body is not None:
-                    for child in body:
-                        if child.tag.endswith('}p'):
-                            para_content = self._process_paragraph_with_images(child, namespaces, relationship_mapping)
-                            if para_content:
-                                text_content += para_content
-                        elif child.tag.endswith('}tbl'):
-                            table_md = self._convert_table_to_markdown(child, namespaces, relationship_mapping)
-                            if table_md:
-                                text_content += table_md + "\n\n"
+                    self._render_body_blocks(body, namespaces, relationship_mapping, writer)
+        except ET.ParseError as e:
+            if 'word/document.xml' in self._limited_parts:
+                # Expected: the body was cut off by a decompression limit, already reported
+                logger.warning(f"Document body ends at the decompression limit: {e}")
+            else:
+                logger.error(f"Failed to extract text from DOCX: {e}")
         except Exception as e:
             logger.error(f"Failed to extract text from DOCX: {e}")
-        return text_content
+
+    def _iter_body_blocks(self, document_stream):
+        """Yield each top-level child of w:body as soon as it is fully parsed.
+
+        Finished blocks are detached from the body after the caller has
+        consumed them, so only the block being rendered is held in memory.
+        """
+        body = None
+        body_depth = 0
+        depth = 0
+        for event, elem in ET.iterparse(document_stream, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if body is None and elem.tag == W_BODY:
+                    body = elem
+                    body_depth = depth
+                continue
+            if body is not None and depth == body_depth + 1:
+                yield elem
+                elem.clear()
+                body.remove(elem)
+            elif elem is body:
+                # Only the first body is rendered, matching root.find('.//w:body')
+                return
+            depth -= 1
+
+    def _render_body_blocks(self, blocks, namespaces, relationship_mapping, writer: 'MarkdownWriter'):
+        """Render body-level paragraphs and tables to markdown in document order"""
+        for child in blocks:
+            if child.tag == W_P:
+                writer.write(self._process_paragraph_with_images(child, namespaces, relationship_mapping))
+            elif child.tag == W_TBL:
+                if self._write_table(child, namespaces, relationship_mapping, writer):
+                    writer.write("\n\n")
+    
+    def _render_body_parallel(self, package: DocxPackage, relationship_mapping, writer: 'MarkdownWriter') -> bool:
+        """Render the body in chunks on worker processes and merge them in document order.
+
+        document.xml is cut between top-level body blocks (see
+        body_block_spans) and each chunk is parsed and rendered by a worker.
+        Headings, warnings and image references come back with each chunk
+        and are merged in submission order, so the output matches a serial
+        conversion. In lazy image mode the workers only report which images
+        are referenced; the files are copied here as chunks are merged, in
+        first-reference order, and their links rewritten when the sink does
+        not use images/<name>. Returns False, having rendered nothing, when
+        the body cannot be split.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        document_xml = package.read('word/document.xml', cache=False)
+        layout = body_block_spans(document_xml)
+        if layout is None:
+            logger.info("Could not split the document body; rendering it serially")
+            return False
+        opening, closing, spans = layout
+        
+        if self.image_mode == 'eager':
+            # Every image is already written, so workers can be given the final links
+            for image in self._image_parts:
+                self._image_link(image)
+        state = {
+            'input_file': self.source_name,
+            'image_mode': self.image_mode,
+            'image_index': self.image_index,
+            'image_urls': self.image_urls,
+            'hyperlink_mapping': self.hyperlink_mapping,
+            'relationship_mapping': relationship_mapping,
+        }
+        pending = []
+        
+        def merge_oldest():
+            markdown, headings, warnings, handled_issues, referenced = pending.pop(0).result()
+            for image in referenced:
+                if self.image_mode == 'lazy':
+                    self._materialize_image(self._image_parts[image], image)
+                    image_url = self._image_link(image)
+                    if image_url != f"images/{image}":
+                        markdown = markdown.replace(f"![{image}](images/{image})", f"![{image}]({image_url})")
+                elif image not in self._materialized:
+                    self._materialized[image] = True
+                    self.images_linked.append(image)
+            writer.write(markdown)
+            self.headings.extend(headings)
+            self.warnings.warnings.extend(warnings)
+            self.warnings.handled_issues.extend(handled_issues)
+        
+        logger.info(f"Rendering {len(spans)} body blocks on {self.body_workers} worker processes")
+        with ProcessPoolExecutor(max_workers=self.body_workers, initializer=_init_body_worker,
+                                 initargs=(state,)) as executor:
+            for first in range(0, len(spans), BODY_CHUNK_BLOCKS):
+                last = min(first + BODY_CHUNK_BLOCKS, len(spans)) - 1
+                chunk = opening + document_xml[spans[first][0]:spans[last][1]] + closing
+                pending.append(executor.submit(_render_body_chunk, chunk))
+                # Bound the rendered chunks held in memory
+                if len(pending) >= self.body_workers * 2:
+                    merge_oldest()
+            while pending:
+                merge_oldest()
+        return True
+    
+    @classmethod
+    def _body_chunk_renderer(cls, state: Dict) -> 'DocxToMarkdownConverter':
+        """A converter that only renders body blocks inside a worker process.
+
+        It is built without __init__, so it never detects the file type or
+        creates output folders. Lazy image mode renders references like links
+        mode; the parent copies the referenced files and fixes their links.
+        """
+        renderer = cls.__new__(cls)
+        renderer.input_file = state['input_file']
+        renderer.image_mode = 'links' if state['image_mode'] == 'lazy' else state['image_mode']
+        renderer.image_index = state['image_index']
+        renderer.image_urls = state['image_urls']
+        renderer.hyperlink_mapping = state['hyperlink_mapping']
+        renderer.relationship_mapping = state['relationship_mapping']
+        renderer._image_parts = {}
+        renderer._materialized = {}
+        renderer.images_linked = []
+        renderer.headings = []
+        renderer.warnings = ConversionWarning()
+        return renderer
     
     def extract_text_doc(self) -> str:
-        """Extract text from DOC file using basic parsing"""
+        """Extract text from a Word 97-2003 .doc file through its piece table"""
+        try:
+            with CompoundFile(self.input_file) as container:
+                document = WordBinaryDocument(container)
+                if document.encrypted:
+                    self.warnings.add_warning(
+                        "Encrypted Document",
+                        "The .doc file is password-encrypted",
+                        "Skipped the encrypted content; save an unencrypted copy to convert it"
+                    )
+                    return "Could not extract text from this encrypted .doc file."
+                return self._render_doc_paragraphs(document.paragraphs())
+        except (CompoundFileError, struct.error, IndexError) as e:
+            # Word 6/95 files and damaged containers: fall back to scanning for text
+            logger.warning(f"Could not read .doc structure ({e}); falling back to text scan")
+            return self._scan_text_doc()
+    
+    def _render_doc_paragraphs(self, paragraphs) -> str:
+        """Render (text, mark, style, in table, row end) paragraphs of a .doc as markdown"""
+        writer = MarkdownWriter()
+        field_stack = []
+        table_data = []
+        row = []
+        cell = []
+        previous_mark = '\r'
+        
+        def clean(text: str) -> str:
+            # Keep field results, drop field codes; fields can span paragraphs
+            kept = []
+            for piece in FIELD_MARK_PATTERN.split(text):
+                if piece == '\x13':
+                    field_stack.append('code')
+                elif piece == '\x14':
+                    if field_stack:
+                        field_stack[-1] = 'result'
+                elif piece == '\x15':
+                    if field_stack:
+                        field_stack.pop()
+                elif 'code' not in field_stack:
+                    kept.append(piece)
+            return ''.join(kept).translate(DOC_CHARACTER_MAP).strip()
+        
+        def flush_table():
+            rows = [cells for cells in table_data if any(value.strip() for value in cells)]
+            if rows:
+                table_md = self._format_table_by_type(rows)
+                if table_md:
+                    writer.write(table_md)
+                    writer.write("\n\n")
+            del table_data[:]
+        
+        for text, mark, style, in_table, row_end in paragraphs:
+            text = clean(text)
+            if mark == '\x07':
+                if row_end is None:
+                    # No paragraph properties: an empty mark right after a cell end closes the row
+                    row_end = not text and not cell and previous_mark == '\x07'
+                if row_end:
+                    table_data.append(row)
+                    row = []
+                else:
+                    cell.append(text)
+                    row.append('\n\n'.join(p for p in cell if p))
+                    cell = []
+            elif in_table or cell:
+                # Paragraph inside a table cell that continues until the cell mark
+                cell.append(text)
+            else:
+                if table_data or row:
+                    if row:
+                        table_data.append(row)
+                        row = []
+                    flush_table()
+                if text:
+                    if 1 <= style <= 9:
+                        # Styles 1-9 are the built-in Heading 1-9 styles
+                        level = min(style, 6)
+                        self.headings.append((level, text))
+                        writer.write(f"{'#' * level} {text}\n\n")
+                    else:
+                        writer.write(f"{text}\n\n")
+            previous_mark = mark
+        if row:
+            table_data.append(row)
+        if table_data:
+            flush_table()
+        
+        content = writer.getvalue()
+        if not content.strip():
+            return "Could not extract readable text from this .doc file."
+        return content
+    
+    def _scan_text_doc(self) -> str:
+        """Fallback for .doc files without a readable piece table: scan for printable text"""
         text_content = ""
         
         try:
-            # For .doc files, we'll try to extract readable text
             # This is a basic approach that looks for text patterns
-            with open(self.input_file, 'rb') as f:
-                content = f.read()
+            content = self._read_source()
                 
             # Convert to string and extract readable text
             try:
-                # Try different encodings
-                for encoding in ['utf-8', 'latin-1', 'cp1252', 'utf-16']:
-                    try:
-                        text = content.decode(encoding, errors='ignore')
-                        break
-                    except:
-                        continue
-                else:
-                    text = content.decode('latin-1', errors='ignore')
+                text = content.decode('utf-8', errors='ignore')
                 
                 # Extract readable text using regex
                 # Look for sequences of printable characters
@@ -394,92 +2184,88 @@ class DocxToMarkdownConverter:
             text_content = f"Error extracting from .doc file: {e}"            
         return text_content
     
-    def _get_relationship_mappings(self, docx_zip) -> Dict[str, str]:
+    def _get_relationship_mappings(self, package: DocxPackage) -> Dict[str, str]:
         """Get relationship mappings from document.xml.rels"""
         relationship_mapping = {}
         
         try:
-            if 'word/_rels/document.xml.rels' in docx_zip.namelist():
-                rels_xml = docx_zip.read('word/_rels/document.xml.rels').decode('utf-8')
-                rels_root = ET.fromstring(rels_xml)
-                
-                for rel in rels_root.findall('.//{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'):
-                    rel_id = rel.get('Id')
-                    target = rel.get('Target')
-                    if rel_id and target and target.startswith('media/'):
-                        relationship_mapping[rel_id] = target
-                        
+            for rel_id, target, rel_type in package.relationships():
+                if rel_id and target and target.startswith('media/'):
+                    relationship_mapping[rel_id] = target
+                    
         except Exception as e:
             logger.warning(f"Failed to read relationship mappings: {e}")
             
         return relationship_mapping
     
-    def _process_paragraph_with_images(self, para, namespaces, relationship_mapping) -> str:
-        """Process a paragraph and handle any inline images, hyperlinks, and whitespace preservation, with improved heading/subheading detection"""
+    @staticmethod
+    def _run_is_bold(run) -> bool:
+        """True when a run's own properties carry w:b"""
+        run_props = run.find(W_RPR)
+        return run_props is not None and run_props.find(W_B) is not None
+
+    @staticmethod
+    def _format_run(run) -> Tuple[str, str, bool]:
+        """Return (plain text, markdown text, is_bold) for a run in one pass over its properties"""
+        run_text = "".join([text_elem.text for text_elem in run.iter(W_T) if text_elem.text])
+        formatted_text = run_text
+        is_bold = False
+        run_props = run.find(W_RPR)
+        if run_props is not None:
+            is_italic = is_underlined = False
+            for prop in run_props:
+                tag = prop.tag
+                if tag == W_B:
+                    is_bold = True
+                elif tag == W_I:
+                    is_italic = True
+                elif tag == W_U:
+                    is_underlined = True
+            if is_bold:
+                formatted_text = f"**{formatted_text}**"
+            if is_italic:
+                formatted_text = f"*{formatted_text}*"
+            if is_underlined and not formatted_text.startswith('**'):
+                formatted_text = f"**{formatted_text}**"
+        return run_text, formatted_text, is_bold
+
+    def _process_paragraph_with_images(self, para, namespaces, relationship_mapping, detect_headings: bool = True) -> str:
+        """Process a paragraph and handle any inline images, hyperlinks, and whitespace preservation, with improved heading/subheading detection.
+
+        With detect_headings=False (table cells) only the paragraph text is
+        returned and nothing is added to the table of contents.
+        """
         parts = []
-        is_fully_bold = False
-        is_heading = False
-        heading_level = 0
-        para_text = ""
-        bold_text = ""
-        # Check if the paragraph is fully bold (all runs bold)
-        runs = para.findall('.//w:r', namespaces)
-        if runs:
-            all_bold = True
-            for run in runs:
-                run_props = run.find('.//w:rPr', namespaces)
-                if not (run_props is not None and run_props.find('.//w:b', namespaces) is not None):
-                    all_bold = False
-                    break
-            if all_bold:
-                is_fully_bold = True
+        # A paragraph is fully bold when every run in it (including runs nested in
+        # hyperlinks or other containers) is bold; tracked while building content
+        has_runs = False
+        all_bold = True
         # Build up the paragraph content in order, handling text, hyperlinks, and images
         for child in para:
-            if child.tag.endswith('}hyperlink'):
-                link_id = child.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
+            tag = child.tag
+            if tag == W_HYPERLINK:
+                link_id = child.get(R_ID)
                 href = None
                 if link_id and hasattr(self, 'hyperlink_mapping'):
                     href = self.hyperlink_mapping.get(link_id)
                 link_text = ""
-                for run in child.findall('.//w:r', namespaces):
-                    run_text = ""
-                    for text_elem in run.findall('.//w:t', namespaces):
-                        if text_elem.text:
-                            run_text += text_elem.text
-                    run_props = run.find('.//w:rPr', namespaces)
-                    formatted_text = run_text
-                    if run_props is not None:
-                        if run_props.find('.//w:b', namespaces) is not None:
-                            formatted_text = f"**{formatted_text}**"
-                        if run_props.find('.//w:i', namespaces) is not None:
-                            formatted_text = f"*{formatted_text}*"
-                        if run_props.find('.//w:u', namespaces) is not None:
-                            if not formatted_text.startswith('**'):
-                                formatted_text = f"**{formatted_text}**"
+                for run in child.iter(W_R):
+                    has_runs = True
+                    run_text, formatted_text, is_bold = self._format_run(run)
+                    if not is_bold:
+                        all_bold = False
                     link_text += formatted_text
-                if href:
-                    parts.append(f"[{link_text}]({href})")
-                else:
-                    parts.append(link_text)
-            elif child.tag.endswith('}r'):
-                run_text = ""
-                for text_elem in child.findall('.//w:t', namespaces):
-                    if text_elem.text:
-                        run_text += text_elem.text
-                run_props = child.find('.//w:rPr', namespaces)
-                formatted_text = run_text
-                is_bold = False
-                if run_props is not None:
-                    if run_props.find('.//w:b', namespaces) is not None:
-                        formatted_text = f"**{formatted_text}**"
-                        is_bold = True
-                    if run_props.find('.//w:i', namespaces) is not None:
-                        formatted_text = f"*{formatted_text}*"
-                    if run_props.find('.//w:u', namespaces) is not None:
-                        if not formatted_text.startswith('**'):
-                            formatted_text = f"**{formatted_text}**"
+                if href:
+                    parts.append(f"[{link_text}]({href})")
+                else:
+                    parts.append(link_text)
+            elif tag == W_R:
+                has_runs = True
+                run_text, formatted_text, is_bold = self._format_run(child)
+                if not is_bold:
+                    all_bold = False
                 # Add images in this run
-                drawings = child.findall('.//w:drawing', namespaces)
+                drawings = list(child.iter(W_DRAWING))
                 if drawings:
                     for drawing in drawings:
                         image_md = self._process_drawing(drawing, namespaces, relationship_mapping)
@@ -493,25 +2279,35 @@ class DocxToMarkdownConverter:
                 else:
                     if formatted_text:
                         parts.append(formatted_text)
-                # For heading/subheading detection
-                if is_bold:
-                    bold_text += run_text
-                para_text += run_text
-            elif child.tag.endswith('}drawing'):
-                image_md = self._process_drawing(child, namespaces, relationship_mapping)
-                if image_md:
-                    parts.append(image_md.strip())
+                if all_bold:
+                    # Runs nested inside this run (e.g. text boxes) count towards the bold check
+                    for nested in child.iter(W_R):
+                        if nested is not child and not self._run_is_bold(nested):
+                            all_bold = False
+                            break
+            else:
+                if tag == W_DRAWING:
+                    image_md = self._process_drawing(child, namespaces, relationship_mapping)
+                    if image_md:
+                        parts.append(image_md.strip())
+                if all_bold:
+                    for nested in child.iter(W_R):
+                        has_runs = True
+                        if not self._run_is_bold(nested):
+                            all_bold = False
+                            break
         para_text = ''.join(parts).strip()
+        if not detect_headings:
+            return para_text
         # Heuristic: treat fully bold paragraphs as headings
-        if is_fully_bold and para_text:
+        if has_runs and all_bold and para_text:
             # If short, treat as H2, else H3
             heading_level = 2 if len(para_text) < 60 else 3
             self.headings.append((heading_level, para_text))
             return f"{'#' * heading_level} {para_text}\n\n"
         # Heuristic: treat bold label + colon as subheading
         if para_text:
-            import re
-            match = re.match(r'^\*\*(.+?):\*\*\s*(.*)$', para_text)
+            match = BOLD_LABEL_PATTERN.match(para_text)
             if match:
                 label = match.group(1).strip()
                 rest = match.group(2).strip()
@@ -525,23 +2321,19 @@ class DocxToMarkdownConverter:
         if not para_text:
             return "\n"
         # Fallback: use style-based heading detection
-        style_elem = para.find('.//w:pStyle', namespaces)
+        ppr = para.find(W_PPR)
+        style_elem = ppr.find(W_PSTYLE) if ppr is not None else None
         heading_level = 1
         if style_elem is not None:
-            style_val = style_elem.get('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}val', '')
+            style_val = style_elem.get(W_VAL, '')
             if 'Heading' in style_val:
-                match = re.search(r'(\d+)', style_val)
+                match = HEADING_NUMBER_PATTERN.search(style_val)
                 if match:
                     heading_level = min(int(match.group(1)), 6)
                 self.headings.append((heading_level, para_text))
                 return f"{'#' * heading_level} {para_text}\n\n"
         # Detect if this is a bullet or numbered list
-        is_bullet = False
-        ppr = para.find('.//w:pPr', namespaces)
-        if ppr is not None:
-            numpr = ppr.find('.//w:numPr', namespaces)
-            if numpr is not None:
-                is_bullet = True
+        is_bullet = ppr is not None and ppr.find(W_NUMPR) is not None
         # Format output
         if para_text.startswith('!['):
             # Image only, do not indent
@@ -565,121 +2357,182 @@ class DocxToMarkdownConverter:
         """Process a drawing element and return markdown for any images"""
         try:
             # Look for image references
-            blips = drawing.findall('.//a:blip', namespaces)
-            
-            for blip in blips:
-                embed_id = blip.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed')
+            for blip in drawing.iter(A_BLIP):
+                embed_id = blip.get(R_EMBED)
                 if embed_id and embed_id in relationship_mapping:
-                    image_path = relationship_mapping[embed_id]
-                    image_filename = os.path.basename(image_path)
-                    
-                    # Find the corresponding extracted image
-                    for extracted_image in self.images_extracted:
-                        if image_filename in extracted_image or extracted_image.endswith(f"_{image_filename}"):
-                            return f"![{extracted_image}](images/{extracted_image})\n\n"
+                    # Relationship targets are relative to word/; resolve to the package part name
+                    part_name = resolve_part_name(relationship_mapping[embed_id])
+                    extracted_image = self.image_index.get(part_name) or self.image_index.get(part_name.lower())
+                    if not extracted_image:
+                        continue
+                    if self.image_mode == 'lazy':
+                        if not self._materialize_image(self._image_parts[extracted_image], extracted_image):
+                            continue
+                    elif self.image_mode == 'links' and extracted_image not in self._materialized:
+                        self._materialized[extracted_image] = True
+                        self.images_linked.append(extracted_image)
+                    return f"![{extracted_image}]({self._image_link(extracted_image)})\n\n"
                     
-                    # If not found in extracted images, try to match by original name
-                    for extracted_image in self.images_extracted:
-                        if image_filename.lower() in extracted_image.lower():
-                                                        return f"![{extracted_image}](images/{extracted_image})\n\n"
-                            
         except Exception as e:
             logger.warning(f"Failed to process drawing: {e}")
             
         return ""
     
-    def _convert_table_to_markdown(self, table_elem, namespaces, relationship_mapping) -> str:
-        """Convert a table element to markdown with enhanced formatting"""
+    @staticmethod
+    def _plain_paragraph_text(para):
+        """Text of a paragraph made only of unformatted text runs, or None when it needs the full renderer.
+
+        Most table cells hold plain text; this skips the hyperlink, image and
+        formatting handling of _process_paragraph_with_images for them.
+        """
+        parts = []
+        for child in para:
+            tag = child.tag
+            if tag == W_R:
+                for run_child in child:
+                    run_tag = run_child.tag
+                    if run_tag == W_T:
+                        if run_child.text:
+                            parts.append(run_child.text)
+                    elif run_tag == W_RPR:
+                        for prop in run_child:
+                            if prop.tag in (W_B, W_I, W_U):
+                                return None
+                    elif len(run_child):
+                        # Drawings, text boxes and alternate content
+                        return None
+            elif tag != W_PPR and len(child):
+                # Hyperlinks, fields and other containers
+                return None
+        return ''.join(parts).strip()
+    
+    def _cell_text(self, cell, namespaces, relationship_mapping) -> str:
+        """Markdown text of one table cell, paragraphs separated by blank lines"""
+        para_texts = []
+        for para in _cell_paragraphs(cell):
+            para_content = self._plain_paragraph_text(para)
+            if para_content is None:
+                para_content = self._process_paragraph_with_images(para, namespaces, relationship_mapping,
+                                                                   detect_headings=False).strip()
+            if para_content:
+                para_texts.append(para_content)
+        # Join with double newlines to preserve markdown formatting and paragraph breaks
+        cell_text = '\n\n'.join(para_texts)
+        # If cell_text starts with bold and has a colon, split to next line (handle colon before closing **) and trailing spaces)
+        if cell_text.startswith('**') and ':' in cell_text:
+            # Find the first colon after '**'
+            colon_idx = cell_text.find(':')
+            bold_end = cell_text.find('**', 2)
+            # Check if colon is just before the closing ** (allow spaces)
+            if bold_end != -1 and (colon_idx < bold_end or (colon_idx < bold_end + 3 and cell_text[colon_idx+1:bold_end].strip() == '')):
+                # Move the bolded label (including trailing **) to its own line
+                label = cell_text[:bold_end+2].strip()
+                rest = cell_text[bold_end+2:].strip()
+                cell_text = f"{label}\n{rest}"
+        return cell_text
+    
+    def _iter_table_rows(self, table_elem, namespaces, relationship_mapping):
+        """Yield the non-empty rows of a table as lists of cell texts laid out on the table grid.
+
+        A cell spanning n grid columns (w:gridSpan) is followed by n - 1 empty
+        cells, continuation cells of a vertical merge (w:vMerge) are empty,
+        and w:gridBefore/w:gridAfter add the skipped leading/trailing columns.
+        """
+        for row in _table_children(table_elem, W_TR):
+            row_props = row.find(W_TRPR)
+            row_data = [""] * _grid_value(row_props, W_GRIDBEFORE, 0)
+            for cell in _table_children(row, W_TC):
+                cell_props = cell.find(W_TCPR)
+                v_merge = cell_props.find(W_VMERGE) if cell_props is not None else None
+                if v_merge is not None and v_merge.get(W_VAL, 'continue') == 'continue':
+                    row_data.append("")
+                else:
+                    row_data.append(self._cell_text(cell, namespaces, relationship_mapping))
+                span = _grid_value(cell_props, W_GRIDSPAN, 1)
+                if span > 1:
+                    row_data.extend([""] * (span - 1))
+            row_data.extend([""] * _grid_value(row_props, W_GRIDAFTER, 0))
+            if any(row_data):
+                yield row_data
+    
+    def _write_table(self, table_elem, namespaces, relationship_mapping, writer: 'MarkdownWriter') -> bool:
+        """Render a table element straight to writer row by row; True when anything was written"""
+        written = False
         try:
-            rows = table_elem.findall('.//w:tr', namespaces)
-            if not rows:
-                return ""
-            table_data = []
-            for row in rows:
-                cells = row.findall('.//w:tc', namespaces)
-                row_data = []
-                for cell in cells:
-                    paras = cell.findall('.//w:p', namespaces)
-                    para_texts = []
-                    for para in paras:
-                        para_content = self._process_paragraph_with_images(para, namespaces, relationship_mapping)
-                        if para_content.strip():
-                            para_texts.append(para_content.strip())
-                    # Join with double newlines to preserve markdown formatting and paragraph breaks
-                    cell_text = '\n\n'.join(para_texts).strip()
-                    # If cell_text starts with bold and has a colon, split to next line (handle colon before closing **) and trailing spaces)
-                    if cell_text.startswith('**') and ':' in cell_text:
-                        # Find the first colon after '**'
-                        colon_idx = cell_text.find(':')
-                        bold_end = cell_text.find('**', 2)
-                        # Check if colon is just before the closing ** (allow spaces)
-                        if bold_end != -1 and (colon_idx < bold_end or (colon_idx < bold_end + 3 and cell_text[colon_idx+1:bold_end].strip() == '')):
-                            # Move the bolded label (including trailing **) to its own line
-                            label = cell_text[:bold_end+2].strip()
-                            rest = cell_text[bold_end+2:].strip()
-                            cell_text = f"{label}\n{rest}"
-                    row_data.append(cell_text)
-                if any(cell.strip() for cell in row_data):
-                    table_data.append(row_data)
-            if not table_data:
-                return ""
-            return self._format_table_by_type(table_data)
+            columns = _table_width(table_elem)
+            rows = self._iter_table_rows(table_elem, namespaces, relationship_mapping)
+            for piece in self._iter_table_markdown(rows, columns or None):
+                if piece:
+                    writer.write(piece)
+                    written = True
         except Exception as e:
             logger.warning(f"Failed to convert table: {e}")
-            return ""
+        return written
+    
+    def _convert_table_to_markdown(self, table_elem, namespaces, relationship_mapping) -> str:
+        """Convert a table element to markdown with enhanced formatting"""
+        writer = MarkdownWriter()
+        self._write_table(table_elem, namespaces, relationship_mapping, writer)
+        return writer.getvalue()
     
     def _format_table_by_type(self, table_data) -> str:
         """Format table based on detected type"""
-        if not table_data:
-            return ""
-        
-        num_cols = len(table_data[0])
-        num_rows = len(table_data)
+        return "".join(self._iter_table_markdown(iter(table_data)))
+    
+    def _iter_table_markdown(self, rows, columns: int = None):
+        """Yield the markdown of a table, picking its layout from the first few rows.
+
+        Only the rows needed to choose the layout are held back; the rest are
+        formatted as they are produced. columns is the width of the table,
+        at least as wide as its widest row; without it a standard table is
+        buffered to find its widest row.
+        """
+        head = list(islice(rows, 4))
+        if not head:
+            return
+        rows = chain(head, rows)
+        num_cols = len(head[0])
         
         # Detect two-column layout with image+text or key-value pairs
-        if num_cols == 2 and num_rows >= 1:
-            return self._format_two_column_table(table_data)
+        if num_cols == 2:
+            yield from self._format_two_column_table(rows)
         
         # Detect complex multi-category tables
-        elif num_cols == 3 and num_rows > 3:
-            return self._format_multi_category_table(table_data)
+        elif num_cols == 3 and len(head) > 3:
+            yield from self._format_multi_category_table(rows)
         
         # Default markdown table formatting for other cases
         else:
-            return self._format_standard_table(table_data)
+            yield from self._format_standard_table(rows, columns)
     
-    def _format_standard_table(self, table_data) -> str:
-        """Format table as standard markdown table"""
-        if not table_data:
-            return ""
-        
-        # Get the maximum number of columns
-        max_cols = max(len(row) for row in table_data)
-        
-        # Pad rows to have the same number of columns
-        for row in table_data:
-            while len(row) < max_cols:
-                row.append("")
-        
-        # Format as markdown table
-        lines = []
+    def _format_standard_table(self, rows, columns: int = None):
+        """Format table as standard markdown table, yielding one line per row"""
+        if columns is None:
+            rows = list(rows)
+            if not rows:
+                return
+            columns = max(len(row) for row in rows)
+        rows = iter(rows)
         
         # Header row
-        if table_data:
-            header_row = table_data[0]
-            lines.append("| " + " | ".join(cell.replace('\n', ' ').strip() for cell in header_row) + " |")
-            lines.append("| " + " | ".join("---" for _ in header_row) + " |")
-            
-            # Data rows
-            for row in table_data[1:]:
-                lines.append("| " + " | ".join(cell.replace('\n', ' ').strip() for cell in row) + " |")
+        header_row = next(rows, None)
+        if header_row is None:
+            return
+        header_row = header_row + [""] * (columns - len(header_row))
+        yield "| " + " | ".join(cell.replace('\n', ' ').strip() for cell in header_row) + " |\n"
+        yield "| " + " | ".join("---" for _ in header_row) + " |\n"
         
-        return "\n".join(lines) + "\n\n"
+        # Data rows, padded to the table width
+        for row in rows:
+            if len(row) < columns:
+                row = row + [""] * (columns - len(row))
+            yield "| " + " | ".join(cell.replace('\n', ' ').strip() for cell in row) + " |\n"
+        yield "\n"
     
-    def _format_two_column_table(self, table_data) -> str:
+    def _format_two_column_table(self, rows):
         """Enhanced two-column layout formatting with better text and image handling"""
-        formatted_sections = []
-        for row_idx, row in enumerate(table_data):
+        separator = ""
+        for row_idx, row in enumerate(rows):
             if row_idx == 0:
                 continue
             if len(row) >= 2:
@@ -687,21 +2540,25 @@ class DocxToMarkdownConverter:
                 right_content = row[1].strip()
                 # If either cell contains a markdown image, render as a markdown table row
                 if ('![' in left_content and not '![' in right_content) or ('![' in right_content and not '![' in left_content):
-                    formatted_sections.append(f"| {left_content} | {right_content} |")
+                    yield f"{separator}| {left_content} | {right_content} |"
+                    separator = "\n"
                 elif left_content and right_content:
-                    formatted_sections.append(f"**{left_content}**\n")
+                    # Bold labels are already emphasised; wrapping them again would print ****label****
+                    if not (left_content.startswith('**') and left_content.endswith('**')):
+                        left_content = f"**{left_content}**"
+                    yield f"{separator}{left_content}\n"
                     paragraphs = right_content.split('\n\n')
                     for para in paragraphs:
                         if para.strip():
-                            formatted_sections.append(f"{para.strip()}\n")
-                    formatted_sections.append("")
-        return "\n".join(formatted_sections)
+                            yield f"\n{para.strip()}\n"
+                    yield "\n"
+                    separator = "\n"
     
-    def _format_multi_category_table(self, table_data) -> str:
+    def _format_multi_category_table(self, rows):
         """Enhanced multi-category table formatting with better indentation preservation"""
-        formatted_sections = []
+        separator = ""
         current_category = None
-        for row_idx, row in enumerate(table_data):
+        for row in rows:
             if len(row) < 3:
                 continue
             category, component, description = row[0].strip(), row[1].strip(), row[2].strip()
@@ -716,21 +2573,23 @@ class DocxToMarkdownConverter:
                 continue
             if category and category != current_category:
                 current_category = category
-                formatted_sections.append(f"\n### {category}\n")
+                yield f"{separator}\n### {category}\n"
+                separator = "\n"
             if component or description:
                 if component:
                     component_formatted = f"**{component}**"
                     if description:
                         description_lines = description.split('\n')
                         formatted_description = self._format_description_with_indentation(description_lines)
-                        formatted_sections.append(f"{component_formatted}: {formatted_description}\n")
+                        yield f"{separator}{component_formatted}: {formatted_description}\n"
                     else:
-                        formatted_sections.append(f"{component_formatted}\n")
+                        yield f"{separator}{component_formatted}\n"
                 elif description:
                     description_lines = description.split('\n')
                     formatted_description = self._format_description_with_indentation(description_lines)
-                    formatted_sections.append(f"{formatted_description}\n")
-        return "\n".join(formatted_sections) + "\n\n"
+                    yield f"{separator}{formatted_description}\n"
+                separator = "\n"
+        yield "\n\n"
     
     def _format_description_with_indentation(self, description_lines) -> str:
         if not description_lines:
@@ -751,47 +2610,122 @@ class DocxToMarkdownConverter:
                     formatted_lines.append(line)
         return "".join(formatted_lines)
 
-    def create_table_of_contents(self) -> str:
-        """Create table of contents from headings"""
+    def create_table_of_contents(self, files: List[str] = None) -> str:
+        """Create table of contents from headings, linking into the file each heading is in when files is given"""
         if not self.headings:
             return ""
             
         toc = ["## Table of Contents\n"]
         
-        for level, heading in self.headings:
+        for index, (level, heading) in enumerate(self.headings):
             indent = "  " * (level - 1)
             # Create anchor link
             anchor = heading.lower().replace(" ", "-").replace(".", "").replace(",", "")
             anchor = re.sub(r'[^\w\-]', '', anchor)
-            toc.append(f"{indent}- [{heading}](#{anchor})")
+            target = files[index] if files and files[index] else ""
+            toc.append(f"{indent}- [{heading}]({target}#{anchor})")
             
         return "\n".join(toc) + "\n\n"
     
     def convert(self) -> str:
         """Main conversion method with enhanced error handling"""
-        logger.info(f"Starting conversion of {self.input_file}")
+        try:
+            return self.render().getvalue()
+        finally:
+            self.profiler.stop()
+    
+    def render(self) -> MarkdownWriter:
+        """Convert the document and return the complete markdown as a MarkdownWriter"""
+        content = MarkdownWriter()
+        self.render_body(content)
+        markdown = self.render_header()
+        
+        # Add main content
+        markdown.extend(content)
+        
+        # All parts have been consumed; release the archive handle
+        self.close()
+        
+        return markdown
+    
+    def write_markdown(self) -> str:
+        """Convert the document straight to the output markdown file and return its location.
+
+        Body blocks are written to a spool file as they are rendered, so only
+        a few blocks are in memory at a time and the spool can be tailed while
+        a large document converts. The title, conversion notes and table of
+        contents depend on the whole body; once it is done they are written
+        to the markdown file followed by the spooled body, or, with
+        split_level, by an index linking to section files (see _write_sections).
+        """
+        output_file = self.sink.markdown_path
+        try:
+            with self.sink.spool(output_file) as spool:
+                self.render_body(MarkdownWriter(spool))
+                header = self.render_header()
+                self.close()
+                if self.split_level:
+                    files = self._plan_sections()
+                    header.write(f"*Split into one file per level {self.split_level} section; see the table of contents.*\n\n")
+                    if self.headings:
+                        with self.profiler.phase('toc'):
+                            header.write(self.create_table_of_contents(files))
+                    spool.seek(0)
+                    with self.profiler.phase('save'):
+                        location = self._write_sections(spool, header, files)
+                    logger.info(f"Markdown saved to: {location} and {len(self.section_files)} section files")
+                    return location
+                with self.profiler.phase('save'):
+                    spool.seek(0)
+                    with self.sink.open(output_file, text=True) as f:
+                        header.write_to(f)
+                        shutil.copyfileobj(spool, f, COPY_CHUNK_SIZE)
+                    self.io.add_written(self.sink.size(output_file))
+            logger.info(f"Markdown saved to: {self.sink.location(output_file)}")
+            return self.sink.location(output_file)
+        except Exception as e:
+            logger.error(f"Failed to save markdown: {e}")
+            raise
+        finally:
+            # Saving is the last profiled phase
+            self.profiler.stop()
+    
+    def render_body(self, content: MarkdownWriter):
+        """Render the document body (or a notice explaining why it could not be read) into content"""
+        logger.info(f"Starting conversion of {self.source_name}")
+        self.profiler.start()
         
         try:
             # Check for sensitivity labels or protected content
-            self._check_sensitivity_labels()
+            with self.profiler.phase('sensitivity'):
+                self._check_sensitivity_labels()
             
             # Extract content based on file type
             if self.file_type == "docx":
                 try:
                     # Extract images
-                    image_mapping = self.extract_images_docx()
-                    logger.info(f"Extracted {len(self.images_extracted)} images")
+                    with self.profiler.phase('images'):
+                        image_mapping = self.extract_images_docx()
+                    if self.image_mode == 'eager':
+                        logger.info(f"Extracted {len(self.images_extracted)} images")
                     
                     # Extract text content
-                    content = self.extract_text_docx()
+                    with self.profiler.phase('text'):
+                        self.write_text_docx(content)
+                        self._finish_image_writes()
+                    if self.image_mode == 'lazy':
+                        logger.info(f"Extracted {len(self.images_extracted)} referenced images")
+                    elif self.image_mode == 'links':
+                        logger.info(f"Linked {len(self.images_linked)} images without extracting them")
                 except (PermissionError, zipfile.BadZipFile) as e:
                     self.warnings.add_sensitive_content_warning("permissions")
-                    content = f"⚠️ Document content partially restricted. Extracted available content.\n\n"
+                    content.reset()
+                    content.write(f"⚠️ Document content partially restricted. Extracted available content.\n\n")
                     # Try to extract what we can
                     try:
-                        content += self.extract_text_docx()
+                        self.write_text_docx(content)
                     except:
-                        content += "Unable to extract document content due to access restrictions."
+                        content.write("Unable to extract document content due to access restrictions.")
                         
             elif self.file_type == "doc":
                 try:
@@ -799,18 +2733,20 @@ class DocxToMarkdownConverter:
                     logger.info("DOC file detected - image extraction not supported")
                     
                     # Extract text content
-                    content = self.extract_text_doc()
+                    with self.profiler.phase('text'):
+                        content.write(self.extract_text_doc())
                 except (PermissionError, struct.error) as e:
                     self.warnings.add_sensitive_content_warning("permissions")
-                    content = f"⚠️ DOC file content partially restricted. Extracted available content.\n\n"
-                    content += "Unable to fully extract DOC file content due to format restrictions or protection."
+                    content.reset()
+                    content.write(f"⚠️ DOC file content partially restricted. Extracted available content.\n\n")
+                    content.write("Unable to fully extract DOC file content due to format restrictions or protection.")
             else:
                 self.warnings.add_warning(
                     "Unsupported File Format",
-                    f"File '{self.input_file}' is not a recognized document format",
+                    f"File '{self.source_name}' is not a recognized document format",
                     "Please ensure the file is a valid .docx or .doc file"
                 )
-                content = f"❌ Unsupported file type. File '{self.input_file}' is not a recognized document format."
+                content.write(f"❌ Unsupported file type. File '{self.source_name}' is not a recognized document format.")
                 
         except Exception as e:
             self.warnings.add_warning(
@@ -818,167 +2754,1506 @@ class DocxToMarkdownConverter:
                 f"Unexpected error during conversion: {str(e)}",
                 "Attempted to recover and continue processing"
             )
-            content = f"⚠️ Conversion encountered issues but proceeded with available content.\n\n"
+            content.reset()
+            content.write(f"⚠️ Conversion encountered issues but proceeded with available content.\n\n")
+    
+    def _plan_sections(self) -> List[str]:
+        """Section file of each heading (None while still in the index), numbered in document order"""
+        stem = Path(self.sink.markdown_path).stem
+        width = max(2, len(str(sum(1 for level, _ in self.headings if level <= self.split_level))))
+        files = []
+        current = None
+        number = 0
+        for level, heading in self.headings:
+            if level <= self.split_level:
+                number += 1
+                slug = SECTION_SLUG_PATTERN.sub('-', heading.lower()).strip('-_')[:SECTION_SLUG_LENGTH].strip('-_')
+                current = f"{stem}-{number:0{width}d}-{slug or 'section'}.md"
+            files.append(current)
+        return files
+    
+    def _write_sections(self, spool, header: MarkdownWriter, files: List[str]) -> str:
+        """Split the spooled body into section files and write the index; returns the index location.
+
+        The body is cut before every heading of split_level or above, found
+        by walking the spool and self.headings together, so a line that only
+        looks like a heading never starts a section. Anything before the
+        first such heading stays in the index after the table of contents.
+        Section files sit next to the index, so image links are unchanged.
+
+        files is the section file of each heading from _plan_sections, and
+        header already holds the title, notes and the table of contents.
+        """
+        # First line of each heading as the body writes it
+        expected = [f"{'#' * level} {heading}".split('\n', 1)[0] for level, heading in self.headings]
+        next_heading = 0
+        self.section_files = []
+        target = self.sink.open(self.sink.markdown_path, text=True)
+        try:
+            header.write_to(target)
+            for line in spool:
+                if next_heading < len(expected) and line.rstrip('\n') == expected[next_heading]:
+                    section = files[next_heading]
+                    next_heading += 1
+                    if section is not None and (not self.section_files or self.section_files[-1] != section):
+                        target.close()
+                        self.section_files.append(section)
+                        target = self.sink.open(section, text=True)
+                target.write(line)
+        finally:
+            target.close()
+        for path in [self.sink.markdown_path] + self.section_files:
+            self.io.add_written(self.sink.size(path))
+        return self.sink.location(self.sink.markdown_path)
+    
+    def render_header(self) -> MarkdownWriter:
+        """Title, file type, conversion notes and table of contents, once the body has been rendered"""
+        markdown = MarkdownWriter()
         
         # Add document title
-        doc_name = Path(self.input_file).stem
-        markdown_content = f"# {doc_name}\n\n"
+        doc_name = Path(self.source_name).stem
+        markdown.write(f"# {doc_name}\n\n")
         
         # Add file type info
-        markdown_content += f"*Document Type: {self.file_type.upper()}*\n\n"
+        markdown.write(f"*Document Type: {self.file_type.upper()}*\n\n")
         
         # Add warnings summary if any
         if self.warnings.warnings:
-            markdown_content += "## Conversion Notes\n\n"
-            markdown_content += self.warnings.get_summary() + "\n\n"
+            markdown.write("## Conversion Notes\n\n")
+            markdown.write(self.warnings.get_summary() + "\n\n")
         
-        # Add table of contents
-        if self.headings:
-            toc = self.create_table_of_contents()
-            markdown_content += toc
-            
-        # Add main content
-        markdown_content += content
+        # Add table of contents; split output links it across the section files instead
+        if self.headings and not self.split_level:
+            with self.profiler.phase('toc'):
+                markdown.write(self.create_table_of_contents())
         
-        return markdown_content
+        return markdown
     
     def _check_sensitivity_labels(self):
         """Check for sensitivity labels and protected content"""
         try:
             if self.file_type == "docx":
-                with zipfile.ZipFile(self.input_file, 'r') as docx_zip:
-                    # Check for sensitivity/protection indicators
-                    file_list = docx_zip.namelist()
-                    
-                    # Check for DRM or protection files
-                    protection_indicators = [
-                        'customXml/itemProps',
-                        'docProps/custom.xml',
-                        'word/settings.xml'
-                    ]
-                    
-                    for indicator in protection_indicators:
-                        if any(indicator in f for f in file_list):
-                            try:
-                                # Check settings for protection
-                                settings_content = docx_zip.read('word/settings.xml').decode('utf-8', errors='ignore')
-                                if any(term in settings_content.lower() for term in ['protect', 'restricted', 'drm', 'sensitivity']):
-                                    self.warnings.add_sensitive_content_warning("sensitivity_label")
-                                    break
-                            except:
-                                continue
+                package = self._get_package()
+                # Check for sensitivity/protection indicators
+                file_list = package.namelist()
+                
+                # Check for DRM or protection files
+                protection_indicators = [
+                    'customXml/itemProps',
+                    'docProps/custom.xml',
+                    'word/settings.xml'
+                ]
+                
+                for indicator in protection_indicators:
+                    if any(indicator in f for f in file_list):
+                        try:
+                            # Check settings for protection
+                            settings_content = package.read('word/settings.xml').decode('utf-8', errors='ignore')
+                            if any(term in settings_content.lower() for term in ['protect', 'restricted', 'drm', 'sensitivity']):
+                                self.warnings.add_sensitive_content_warning("sensitivity_label")
+                                break
+                        except:
+                            continue
                                 
         except Exception as e:
             # Don't let sensitivity checking block conversion
             logger.info(f"Could not check for sensitivity labels: {e}")
             
-    def save_markdown(self, content: str) -> str:
-        """Save markdown content to file"""
-        output_file = self.output_markdown_file
+    def save_markdown(self, content) -> str:
+        """Save markdown content (a str or MarkdownWriter) to file"""
+        output_file = self.sink.markdown_path
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-            logger.info(f"Markdown saved to: {output_file}")
-            return str(output_file)
+            with self.profiler.phase('save'):
+                self.sink.write_text(output_file, content)
+                self.io.add_written(self.sink.size(output_file))
+            logger.info(f"Markdown saved to: {self.sink.location(output_file)}")
+            return self.sink.location(output_file)
         except Exception as e:
             logger.error(f"Failed to save markdown: {e}")
             raise
+        finally:
+            # Saving is the last profiled phase
+            self.profiler.stop()
+    
+    def _image_mode_note(self) -> str:
+        """Report line suffix describing non-default image handling"""
+        if self.image_mode == 'lazy':
+            return f" (referenced only; {len(self._image_parts) - len(self.images_extracted)} unreferenced skipped)"
+        if self.image_mode == 'links':
+            return f" (links only; {len(self.images_linked)} referenced, none copied)"
+        return ""
     
     def generate_report(self) -> str:
         """Generate conversion report with warnings and handled issues"""
-        report = f"""# Conversion Report
+        report = MarkdownWriter()
+        report.write(f"""# Conversion Report
 
 ## Document Information
-- **Source File**: {self.input_file}
+- **Source File**: {self.source_name}
 - **File Type**: {self.file_type.upper()}
-- **Output Directory**: {self.doc_output_path}
-- **Images Directory**: {self.images_path}
+- **Output Directory**: {self.sink.location()}
+- **Images Directory**: {self.sink.location('images')}
 
 ## Conversion Results
-- **Total Headings**: {len(self.headings)}
-- **Images Extracted**: {len(self.images_extracted)}
+- **Total Headings**: {len(self.headings)}{f" (split into {len(self.section_files)} section files)" if self.section_files else ""}
+- **Images Extracted**: {len(self.images_extracted)}{self._image_mode_note()}
 - **Issues Handled**: {len(self.warnings.warnings)}
 - **Status**: {'✅ Completed Successfully' if not self.warnings.warnings else '✅ Completed with Handled Issues'}
 
-"""
+""")
 
         # Add warnings summary if any
         if self.warnings.warnings:
-            report += "## Handled Issues\n\n"
-            report += self.warnings.get_summary() + "\n\n"
+            report.write("## Handled Issues\n\n")
+            report.write(self.warnings.get_summary() + "\n\n")
 
-        report += """## Extracted Images
-"""
+        report.write("""## Extracted Images
+""")
         
         for i, image in enumerate(self.images_extracted, 1):
-            report += f"{i}. {image}\n"
+            report.write(f"{i}. {image}\n")
             
         if not self.images_extracted:
-            report += "No images found or extracted.\n"
+            report.write("No images found or extracted.\n")
             
         if self.headings:
-            report += "\n## Document Structure\n"
+            report.write("\n## Document Structure\n")
             for level, heading in self.headings:
                 indent = "  " * (level - 1)
-                report += f"{indent}- {heading}\n"
+                report.write(f"{indent}- {heading}\n")
         else:
-            report += "\n## Document Structure\nNo headings detected.\n"
+            report.write("\n## Document Structure\nNo headings detected.\n")
             
         # Add technical details if there were issues
         if self.warnings.warnings:
-            report += "\n## Technical Details\n"
-            report += "This conversion used advanced error handling to process your document safely.\n"
-            report += "All issues were handled gracefully, and the conversion completed successfully.\n"
-            report += "The markdown file contains all accessible content from your document.\n"
+            report.write("\n## Technical Details\n")
+            report.write("This conversion used advanced error handling to process your document safely.\n")
+            report.write("All issues were handled gracefully, and the conversion completed successfully.\n")
+            report.write("The markdown file contains all accessible content from your document.\n")
+        
+        if self.profiler.phases:
+            report.write(self._performance_section())
+                
+        return report.getvalue()
+    
+    def _performance_section(self) -> str:
+        """Report section with the profiler's per-phase measurements"""
+        rows = [(PROFILE_PHASES.get(p['phase'], p['phase']), p) for p in self.profiler.phases]
+        rows.append(("**Total**", self.profiler.totals()))
+        lines = [
+            "\n## Performance\n",
+            "| Phase | Wall (ms) | CPU (ms) | Read from package | Written | Peak memory |",
+            "|-------|-----------|----------|-------------------|---------|-------------|",
+        ]
+        for label, p in rows:
+            lines.append(
+                f"| {label} | {p['wall_seconds'] * 1000:.1f} | {p['cpu_seconds'] * 1000:.1f} | "
+                f"{_format_bytes(p['zip_bytes_read'])} | {_format_bytes(p['bytes_written'])} | "
+                f"{_format_bytes(p['memory_peak_bytes'])} |"
+            )
+        return "\n".join(lines) + "\n"
+    
+    def profile_data(self) -> Dict:
+        """Machine-readable profile of this conversion for the JSON sidecar"""
+        return {
+            'converter_version': __version__,
+            'input_file': self.source_name,
+            'input_bytes': self._source_size(),
+            'file_type': self.file_type,
+            'image_mode': self.image_mode,
+            'image_workers': self.image_workers,
+            'images': len(self.images_extracted),
+            'headings': len(self.headings),
+            'issues': len(self.warnings.warnings),
+            'phases': self.profiler.phases,
+            'totals': self.profiler.totals(),
+        }
+
+    def result(self, markdown) -> 'ConversionResult':
+        """Package a finished conversion (markdown from render() or convert()) as a ConversionResult"""
+        if isinstance(markdown, MarkdownWriter):
+            markdown = markdown.getvalue()
+        return ConversionResult(
+            name=self.source_name,
+            file_type=self.file_type,
+            markdown=markdown,
+            images=self.sink.images() if isinstance(self.sink, MemorySink) else {},
+            report=self.generate_report(),
+            headings=list(self.headings),
+            warnings=list(self.warnings.warnings),
+            profile=self.profile_data() if self.profiler.enabled else None,
+        )
+
+class ConversionResult:
+    """Everything an in-memory conversion produced.
+
+    images maps each image filename to its bytes; the markdown refers to
+    them as ``images/<filename>``. profile is the profile_data() dict when
+    the conversion was profiled.
+    """
+    
+    def __init__(self, name: str, file_type: str, markdown: str, images: Dict[str, bytes], report: str,
+                 headings: List[Tuple[int, str]], warnings: List[Dict], profile: Dict = None):
+        self.name = name
+        self.file_type = file_type
+        self.markdown = markdown
+        self.images = images
+        self.report = report
+        self.headings = headings
+        self.warnings = warnings
+        self.profile = profile
+    
+    def __repr__(self):
+        return (f"ConversionResult(name={self.name!r}, file_type={self.file_type!r}, "
+                f"markdown={len(self.markdown)} chars, images={len(self.images)})")
+
+def convert_source(source, name: str = None, **options) -> ConversionResult:
+    """Convert a path, bytes or binary file object without writing anything to disk"""
+    with DocxToMarkdownConverter(source, None, name=name, sink=MemorySink(), **options) as converter:
+        return converter.result(converter.convert())
+
+async def convert_async(source, name: str = None, executor=None, **options) -> ConversionResult:
+    """Convert a document in memory without blocking the event loop.
+
+    source is a path, bytes, a binary file object, or an object with an
+    ``async read()`` (such as an aiohttp upload field), which is read on the
+    loop first. Parsing and rendering run on ``executor``: the loop's default
+    thread pool when None, or e.g. a ProcessPoolExecutor, for which file
+    objects are read into bytes so they can be sent to the worker. Other
+    keyword arguments are DocxToMarkdownConverter options.
+    """
+    # get_running_loop is 3.7+; inside a coroutine get_event_loop returns the same loop on 3.6
+    loop = asyncio.get_running_loop() if hasattr(asyncio, 'get_running_loop') else asyncio.get_event_loop()
+    read = getattr(source, 'read', None)
+    if read is not None and (asyncio.iscoroutinefunction(read)
+                             or executor is not None and not isinstance(executor, ThreadPoolExecutor)):
+        # Only the bytes are passed on, so keep the file's name for the title and report
+        file_name = getattr(source, 'name', None) or getattr(source, 'filename', None)
+        name = name or (os.path.basename(str(file_name)) if file_name else None)
+        if asyncio.iscoroutinefunction(read):
+            source = await read()
+        else:
+            source = await loop.run_in_executor(None, read)
+    return await loop.run_in_executor(executor, partial(convert_source, source, name, **options))
+
+# Per-process renderer for parallel body rendering, set by _init_body_worker
+_body_renderer = None
+
+def _init_body_worker(state: Dict):
+    """Build the chunk renderer once per worker process"""
+    global _body_renderer
+    logging.getLogger().setLevel(logging.WARNING)
+    _body_renderer = DocxToMarkdownConverter._body_chunk_renderer(state)
+
+def _render_body_chunk(chunk: bytes) -> Tuple[str, List, List, List, List]:
+    """Render one chunk of body blocks in a worker process.
+
+    Returns the markdown, headings, warnings, handled issue lines and
+    referenced images for the parent to merge.
+    """
+    renderer = _body_renderer
+    renderer.headings = []
+    renderer.warnings = ConversionWarning()
+    renderer.images_linked = []
+    renderer._materialized = {}
+    body = ET.fromstring(chunk).find(W_BODY)
+    writer = MarkdownWriter()
+    renderer._render_body_blocks(body, NAMESPACES, renderer.relationship_mapping, writer)
+    return (writer.getvalue(), renderer.headings, renderer.warnings.warnings,
+            renderer.warnings.handled_issues, renderer.images_linked)
+
+class ConversionCache:
+    """Persistent, content-addressed store of finished conversion outputs.
+
+    Entries are keyed on the SHA-256 of the input document plus the converter
+    version, the document name (it becomes the markdown title) and the
+    conversion options. Each entry keeps a copy of the markdown, report and
+    images; the least recently used entries are evicted once the cache grows
+    beyond ``max_bytes``.
+    """
+    
+    MANIFEST = 'manifest.json'
+    # Options that change how a conversion runs but not what it produces
+    OUTPUT_NEUTRAL_OPTIONS = ('streaming', 'image_workers', 'body_workers')
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 of a file, read in bounded chunks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def key_for(self, input_file: str, options: Dict = None) -> str:
+        """Cache key for converting ``input_file`` with the given options"""
+        key_material = json.dumps({
+            'content': self.hash_file(input_file),
+            'version': __version__,
+            'name': Path(input_file).stem,
+            'options': {name: value for name, value in (options or {}).items()
+                        if name not in self.OUTPUT_NEUTRAL_OPTIONS},
+        }, sort_keys=True)
+        return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+    
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+    
+    def lookup(self, key: str) -> Dict:
+        """Return the manifest of a cached entry, or None on a miss"""
+        manifest_file = self._entry_path(key) / self.MANIFEST
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            # Refresh the entry's recency for LRU eviction
+            os.utime(str(manifest_file), None)
+            return manifest
+        except (OSError, ValueError):
+            return None
+    
+    def restore(self, key: str, manifest: Dict, input_file: str, sink: 'DirectorySink') -> bool:
+        """Materialize a cached entry into the output tree through sink.
+
+        When every output already holds the cached content (compared by
+        SHA-256) and, for a staged sink, nothing else is in the document's
+        folder, nothing is written, so an unchanged document whose outputs
+        are intact is skipped entirely. Otherwise the whole entry is written
+        through the sink; a staged sink swaps the folder in complete, which
+        also drops files an earlier conversion left behind. Returns True
+        when every output was already up to date.
+        """
+        files_path = self._entry_path(key) / 'files'
+        doc_output_path, markdown_file = DocxToMarkdownConverter.output_paths(input_file, sink.output_folder)
+        digests = manifest.get('digests', {})
+        outputs = {}
+        for relative_name in manifest['files']:
+            if relative_name == 'markdown':
+                outputs[relative_name] = markdown_file.name
+            elif relative_name == 'report':
+                outputs[relative_name] = 'conversion_report.md'
+            elif relative_name.startswith('sections/'):
+                # Section files of a split conversion sit next to the index
+                outputs[relative_name] = relative_name[len('sections/'):]
+            else:
+                outputs[relative_name] = f"images/{relative_name}"
+        
+        # The report names the source and output locations; point it at this run's paths
+        with open(files_path / 'report', 'r', encoding='utf-8') as f:
+            report = f.read()
+        for old, new in ((manifest['images_path'], str(doc_output_path / 'images')),
+                         (manifest['doc_output_path'], str(doc_output_path)),
+                         (manifest['input_file'], str(input_file))):
+            report = report.replace(old, new)
+        
+        def up_to_date(relative_name: str) -> bool:
+            target = doc_output_path / outputs[relative_name]
+            if not target.is_file():
+                return False
+            if relative_name == 'report':
+                with open(target, 'r', encoding='utf-8') as f:
+                    return f.read() == report
+            digest = digests.get(relative_name) or self.hash_file(files_path / relative_name)
+            return self.hash_file(target) == digest
+        
+        if all(up_to_date(relative_name) for relative_name in outputs):
+            if not (sink.staged and Path(sink.output_folder).suffix.lower() != ".md"):
+                return True
+            # The folder is the document's own, so anything else in it is stale
+            present = {path.relative_to(doc_output_path).as_posix()
+                       for path in doc_output_path.rglob('*') if not path.is_dir()}
+            if present == set(outputs.values()):
+                return True
+        
+        sink.begin(str(input_file))
+        try:
+            for relative_name, path in outputs.items():
+                if relative_name == 'report':
+                    with sink.open(path, text=True) as f:
+                        f.write(report)
+                else:
+                    with sink.open(path) as f, open(files_path / relative_name, 'rb') as cached:
+                        shutil.copyfileobj(cached, f, COPY_CHUNK_SIZE)
+        except BaseException:
+            sink.abort()
+            raise
+        sink.commit()
+        return False
+    
+    def store(self, key: str, summary: Dict, doc_output_path: Path, markdown_file: Path, evict: bool = True):
+        """Copy a finished conversion into the cache and, by default, evict old entries"""
+        entry_path = self._entry_path(key)
+        if entry_path.exists():
+            return
+        staging_path = entry_path.parent / f".{key}.{os.getpid()}.tmp"
+        files_path = staging_path / 'files'
+        try:
+            files_path.mkdir(parents=True, exist_ok=True)
+            files = {}
+            digests = {}
+            sources = [('markdown', markdown_file), ('report', doc_output_path / 'conversion_report.md')]
+            sources += [(image, doc_output_path / 'images' / image) for image in summary['image_files']]
+            sources += [(f"sections/{Path(section).name}", Path(section)) for section in summary.get('section_files', [])]
+            for relative_name, source in sources:
+                (files_path / relative_name).parent.mkdir(exist_ok=True)
+                shutil.copyfile(str(source), str(files_path / relative_name))
+                files[relative_name] = source.stat().st_size
+                digests[relative_name] = self.hash_file(files_path / relative_name)
+            manifest = {
+                'summary': summary,
+                'files': files,
+                'digests': digests,
+                'size': sum(files.values()),
+                'input_file': summary['input_file'],
+                'doc_output_path': str(doc_output_path),
+                'images_path': summary['images_path'],
+            }
+            with open(staging_path / self.MANIFEST, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            # A concurrent worker may have stored the same key first; keep its entry
+            os.rename(str(staging_path), str(entry_path))
+        except OSError as e:
+            logger.warning(f"Could not store conversion in cache: {e}")
+        finally:
+            shutil.rmtree(str(staging_path), ignore_errors=True)
+        if evict:
+            self.evict()
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for manifest_file in self.cache_dir.glob('*/*/' + self.MANIFEST):
+            try:
+                with open(manifest_file, 'r', encoding='utf-8') as f:
+                    size = json.load(f)['size']
+                entries.append((manifest_file.stat().st_mtime, size, manifest_file.parent))
+                total += size
+            except (OSError, ValueError, KeyError):
+                continue
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(str(entry_path), ignore_errors=True)
+            total -= size
+            logger.info(f"Evicted cache entry: {entry_path.name}")
+
+SUPPORTED_EXTENSIONS = ('.docx', '.doc')
+
+def convert_document(input_file, output_folder: str = "TargetMDDirectory", cache: ConversionCache = None,
+                     evict_cache: bool = True, sink: OutputSink = None, staged: bool = True, fsync: bool = False,
+                     media_store: str = None, media_mode: str = 'hardlink', **options) -> Dict:
+    """Convert one document, write its markdown and report, and return a summary.
+
+    With a ``cache``, an unchanged document is restored from (or skipped
+    because of) a previous conversion instead of being converted again.
+    With ``profile=True`` the report gains a Performance section and the
+    measurements are also written to ``conversion_profile.json``. A ``sink``
+    other than a DirectorySink (e.g. an ArchiveSink) replaces output_folder.
+    By default the document's output folder is built aside and swapped into
+    place when it is complete (see DirectorySink); ``fsync=True`` also
+    flushes it to disk first. With ``media_store``, images are kept once
+    per content in that folder and linked from the document as
+    ``media_mode`` says (see MediaStore).
+    """
+    if options.get('profile') or (sink is not None and not isinstance(sink, DirectorySink)) or media_store:
+        # A profile has to measure a real conversion, not a cache restore,
+        # cache entries are restored into directories only, and restoring
+        # the cache's own copies of images would undo the media store
+        cache = None
+    if cache is not None:
+        key = cache.key_for(input_file, options)
+        manifest = cache.lookup(key)
+        if manifest is not None:
+            if sink is None:
+                sink = DirectorySink(output_folder, staged=staged, fsync=fsync)
+            up_to_date = cache.restore(key, manifest, input_file, sink)
+            doc_output_path, markdown_file = DocxToMarkdownConverter.output_paths(input_file, sink.output_folder)
+            summary = dict(manifest['summary'])
+            summary.update({
+                'input_file': str(input_file),
+                'status': 'cached',
+                'up_to_date': up_to_date,
+                'markdown_file': str(markdown_file),
+                'images_path': str(doc_output_path / 'images'),
+                'report_file': str(doc_output_path / 'conversion_report.md'),
+            })
+            if 'section_files' in summary:
+                summary['section_files'] = [str(markdown_file.parent / Path(section).name)
+                                            for section in summary['section_files']]
+            logger.info(f"Cache hit for {input_file}" + (" (outputs up to date)" if up_to_date else " (outputs restored)"))
+            return summary
+    
+    if sink is None:
+        media = MediaStore(media_store, media_mode) if media_store else None
+        sink = DirectorySink(output_folder, staged=staged, fsync=fsync, media=media)
+    converter = DocxToMarkdownConverter(input_file, output_folder, sink=sink, **options)
+    output_sink = converter.sink
+    
+    try:
+        # Convert straight to the markdown file, spooling the body to disk as it is rendered
+        output_file = converter.write_markdown()
+        
+        # Generate and save report
+        output_sink.write_text("conversion_report.md", converter.generate_report())
+        
+        profile_file = None
+        if converter.profiler.enabled:
+            output_sink.write_text("conversion_profile.json", json.dumps(converter.profile_data(), indent=2))
+            profile_file = output_sink.location("conversion_profile.json")
+    except BaseException:
+        output_sink.abort()
+        raise
+    output_sink.commit()
+    
+    summary = {
+        'input_file': converter.source_name,
+        'status': 'converted',
+        'markdown_file': output_file,
+        'images_path': output_sink.location("images"),
+        'report_file': output_sink.location("conversion_report.md"),
+        'file_type': converter.file_type,
+        'images': len(converter.images_extracted),
+        'headings': len(converter.headings),
+        'issues': len(converter.warnings.warnings),
+        'handled_issues': list(converter.warnings.handled_issues),
+    }
+    if converter.section_files:
+        summary['section_files'] = [output_sink.location(section) for section in converter.section_files]
+    if profile_file is not None:
+        summary['profile_file'] = profile_file
+    if cache is not None:
+        summary['image_files'] = list(converter.images_extracted)
+        cache.store(key, summary, converter.doc_output_path, converter.output_markdown_file, evict=evict_cache)
+    return summary
+
+def _is_document(path: Path) -> bool:
+    """True for .doc/.docx files, skipping Word lock files such as ~$report.docx"""
+    return path.suffix.lower() in SUPPORTED_EXTENSIONS and not path.name.startswith('~$')
+
+def collect_batch_jobs(inputs: List[str], output_folder: str, manifest: str = None) -> List[Tuple[str, str]]:
+    """Expand files, directories, globs and manifest entries into (input, output folder) jobs.
+
+    Documents found under a directory keep their relative sub-folder in the
+    output tree so that files with the same name in different folders do not
+    overwrite each other.
+    """
+    import glob
+    
+    entries = list(inputs)
+    if manifest:
+        with open(manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    entries.append(line)
+    
+    jobs = []
+    seen = set()
+    
+    def add_job(document: Path, job_output: Path):
+        key = os.path.normcase(os.path.abspath(str(document)))
+        if key not in seen:
+            seen.add(key)
+            jobs.append((str(document), str(job_output)))
+    
+    for entry in entries:
+        path = Path(entry)
+        if path.is_dir():
+            for root, dirs, files in os.walk(str(path)):
+                dirs.sort()
+                for name in sorted(files):
+                    document = Path(root) / name
+                    if _is_document(document):
+                        relative_parent = document.parent.relative_to(path)
+                        add_job(document, Path(output_folder) / relative_parent)
+        elif path.is_file():
+            add_job(path, Path(output_folder))
+        else:
+            matches = sorted(glob.glob(entry, recursive=True))
+            if not matches:
+                logger.warning(f"No documents matched: {entry}")
+            for match in matches:
+                document = Path(match)
+                if document.is_file() and _is_document(document):
+                    add_job(document, Path(output_folder))
+    return jobs
+
+# Preflight reads metadata parts only up to this size, so a hostile package cannot make it decompress much
+PREFLIGHT_PART_LIMIT = 1024 * 1024
+# Rough conversion cost model, measured on the synthetic benchmark corpus:
+# fixed per-document seconds, seconds per MB of body XML and per MB of
+# copied media, and the peak memory of a streaming conversion
+PREFLIGHT_BASE_SECONDS = 0.02
+PREFLIGHT_XML_SECONDS_PER_MB = 0.15
+PREFLIGHT_MEDIA_SECONDS_PER_MB = 0.005
+PREFLIGHT_BASE_MEMORY_MB = 25
+PREFLIGHT_XML_MEMORY_RATIO = 0.6
+
+EXTENDED_PROPERTIES_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/extended-properties'
+CONTENT_TYPES_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+# Extended properties copied into the preflight record, as record key -> app.xml element
+APP_PROPERTIES = {'pages': 'Pages', 'words': 'Words', 'characters': 'Characters', 'paragraphs': 'Paragraphs'}
+WORD_MAIN_CONTENT_TYPES = (
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml',
+    'application/vnd.ms-word.document.macroEnabled.main+xml',
+    'application/vnd.ms-word.template.macroEnabledTemplate.main+xml',
+)
+
+def _read_small_part(package: DocxPackage, name: str) -> bytes:
+    """A metadata part, or None when it is missing or larger than PREFLIGHT_PART_LIMIT"""
+    if name not in package or package.entries[name].file_size > PREFLIGHT_PART_LIMIT:
+        return None
+    with package.open(name) as source:
+        data = source.read(PREFLIGHT_PART_LIMIT + 1)
+    return data if len(data) <= PREFLIGHT_PART_LIMIT else None
+
+def _preflight_docx(package: DocxPackage, record: Dict):
+    """Fill a preflight record from a DOCX central directory and its metadata parts"""
+    entries = package.entries
+    media = [info for name, info in entries.items() if name.startswith('word/media/')]
+    record.update({
+        'parts': len(entries),
+        'uncompressed_bytes': sum(info.file_size for info in entries.values()),
+        'document_xml_bytes': entries['word/document.xml'].file_size if 'word/document.xml' in entries else None,
+        'media_count': len(media),
+        'media_bytes': sum(info.file_size for info in media),
+        'macros': any(name.lower().endswith('vbaproject.bin') for name in entries),
+    })
+    if record['document_xml_bytes'] is None:
+        record['issues'].append("No word/document.xml part")
+    limited = [name for name in entries if package.allowed_size(name) < entries[name].file_size]
+    if limited:
+        record['issues'].append(f"Over the decompression limits: {package.limit_reason(limited[0])}"
+                                + (f" (and {len(limited) - 1} more part(s))" if len(limited) > 1 else ""))
+    if record['uncompressed_bytes'] > MAX_TOTAL_SIZE:
+        record['issues'].append(f"Expands to {_format_bytes(record['uncompressed_bytes'])}, over the "
+                                f"{_format_bytes(MAX_TOTAL_SIZE)} decompression limit")
+    
+    content_types = _read_small_part(package, '[Content_Types].xml')
+    if content_types is not None:
+        for override in ET.fromstring(content_types).iter('{%s}Override' % CONTENT_TYPES_NS):
+            if override.get('PartName', '').lower() == '/word/document.xml':
+                record['content_type'] = override.get('ContentType')
+        if record.get('content_type') not in WORD_MAIN_CONTENT_TYPES:
+            record['issues'].append(f"Not a Word document (main part type {record.get('content_type')})")
+    
+    app = _read_small_part(package, 'docProps/app.xml')
+    if app is not None:
+        properties = ET.fromstring(app)
+        for key, element in APP_PROPERTIES.items():
+            value = properties.findtext('{%s}%s' % (EXTENDED_PROPERTIES_NS, element))
+            if value and value.strip().isdigit():
+                record[key] = int(value)
+    
+    settings = _read_small_part(package, 'word/settings.xml')
+    if settings is not None:
+        settings = ET.fromstring(settings)
+        protection = settings.find('{%s}documentProtection' % NAMESPACES['w'])
+        if protection is not None and protection.get('{%s}enforcement' % NAMESPACES['w']) in ('1', 'true', 'on'):
+            record['protection'] = protection.get('{%s}edit' % NAMESPACES['w']) or 'unknown'
+            record['issues'].append(f"Editing restricted ({record['protection']})")
+        if settings.find('{%s}writeProtection' % NAMESPACES['w']) is not None:
+            record['write_protected'] = True
+    
+    # Microsoft Information Protection labels live in custom properties or, in newer files, docMetadata
+    custom = _read_small_part(package, 'docProps/custom.xml')
+    if 'docMetadata/LabelInfo.xml' in entries or (custom is not None and b'MSIP_Label_' in custom):
+        record['sensitivity_label'] = True
+        record['issues'].append("Sensitivity label")
+    if record['macros']:
+        record['issues'].append("Macro-enabled")
+
+def preflight_document(input_file: str) -> Dict:
+    """Classify a document without converting it.
+
+    Only the zip central directory and small metadata parts
+    ([Content_Types].xml, docProps/app.xml, word/settings.xml,
+    docProps/custom.xml) are read, or the header of a Word 97-2003 file.
+    The record gives the body and media sizes, the page and word counts
+    Word saved, protection flags and an estimate of the conversion time
+    and peak memory.
+    """
+    record = {
+        'input_file': str(input_file),
+        'bytes': os.path.getsize(input_file),
+        'file_type': 'unknown',
+        'encrypted': False,
+        'protection': None,
+        'write_protected': False,
+        'sensitivity_label': False,
+        'issues': [],
+    }
+    for key in APP_PROPERTIES:
+        record[key] = None
+    body_bytes = record['bytes']
+    try:
+        package = DocxPackage(input_file)
+    except zipfile.BadZipFile:
+        package = None
+    try:
+        if package is not None:
+            record['file_type'] = 'docx'
+            with closing(package):
+                _preflight_docx(package, record)
+            body_bytes = record['document_xml_bytes'] or 0
+        else:
+            with open(input_file, 'rb') as f:
+                is_ole = f.read(8)[:4] == b'\xd0\xcf\x11\xe0'
+            if is_ole:
+                with CompoundFile(input_file) as container:
+                    if container.has_stream('EncryptedPackage'):
+                        # A password-protected DOCX is an OLE container around the encrypted package
+                        record['file_type'] = 'docx'
+                        record['encrypted'] = True
+                    elif container.has_stream('WordDocument'):
+                        record['file_type'] = 'doc'
+                        document = WordBinaryDocument(container)
+                        record['encrypted'] = document.encrypted
+                        record['characters'] = document.ccp_text
+            if record['encrypted']:
+                record['issues'].append("Encrypted")
+            elif record['file_type'] == 'unknown':
+                record['issues'].append("Not a DOCX or DOC file")
+    except Exception as e:
+        record['issues'].append(f"Unreadable: {e}")
+    
+    body_mb = body_bytes / (1024 * 1024)
+    media_mb = (record.get('media_bytes') or 0) / (1024 * 1024)
+    record['estimated_seconds'] = round(PREFLIGHT_BASE_SECONDS + body_mb * PREFLIGHT_XML_SECONDS_PER_MB
+                                        + media_mb * PREFLIGHT_MEDIA_SECONDS_PER_MB, 3)
+    record['estimated_peak_mb'] = round(PREFLIGHT_BASE_MEMORY_MB + body_mb * PREFLIGHT_XML_MEMORY_RATIO, 1)
+    record['issues'] = record.pop('issues')
+    return record
+
+def run_preflight(documents: List[str], workers: int = None, stream=None) -> List[Dict]:
+    """Preflight many documents across a process pool, writing one JSON line per document in order"""
+    from concurrent.futures import ProcessPoolExecutor
+    
+    stream = stream or sys.stdout
+    workers = max(1, min(workers or os.cpu_count() or 1, len(documents)))
+    start = time.monotonic()
+    records = []
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker)
+        results = executor.map(preflight_document, documents, chunksize=max(1, min(64, len(documents) // (workers * 4))))
+    else:
+        executor = None
+        results = map(preflight_document, documents)
+    try:
+        for record in results:
+            records.append(record)
+            stream.write(json.dumps(record) + '\n')
+            stream.flush()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    elapsed = time.monotonic() - start
+    flagged = sum(1 for record in records if record['issues'])
+    print(f"🔎 Preflighted {len(records)} document(s) in {elapsed:.2f}s "
+          f"({len(records) / elapsed if elapsed else 0:.0f}/s), {flagged} with issues", file=sys.stderr)
+    return records
+
+def _init_batch_worker():
+    """Keep per-image/per-stage log lines out of batch runs"""
+    logging.getLogger().setLevel(logging.WARNING)
+
+def _run_batch_job(job: Tuple[str, str, Dict, Dict]) -> Dict:
+    """Convert one batch job in a worker process, reporting failures as data"""
+    input_file, output_folder, cache_settings, options = job
+    start = time.monotonic()
+    try:
+        cache = ConversionCache(**cache_settings) if cache_settings else None
+        # Eviction scans the whole cache, so batch runs evict once at the end
+        summary = convert_document(input_file, output_folder, cache=cache, evict_cache=False, **options)
+    except Exception as e:
+        summary = {'input_file': input_file, 'status': 'failed', 'error': str(e)}
+    summary['seconds'] = time.monotonic() - start
+    return summary
+
+# Batch scheduling: job orders, how often running jobs are checked against
+# their time and memory limits, and the concurrency of the retry lane
+BATCH_ORDERS = ('input', 'largest', 'shortest')
+SCHEDULER_POLL_INTERVAL = 0.2
+RETRY_WORKERS = 1
+
+def _process_rss_mb(pid: int) -> float:
+    """Resident set size of a process in MB, or None where /proc is not available"""
+    try:
+        with open(f"/proc/{pid}/statm", 'rb') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+def _remove_killed_output(job: Tuple, pid: int):
+    """Delete the staging folder and temporary files a killed worker left for a job"""
+    input_file, output_folder = job[0], job[1]
+    target, _ = DocxToMarkdownConverter.output_paths(input_file, output_folder)
+    leftovers = chain(target.parent.glob(f".{target.name}.{pid}-*"), target.glob(f".*.{pid}-*.tmp"))
+    for leftover in leftovers:
+        if leftover.is_dir():
+            shutil.rmtree(str(leftover), ignore_errors=True)
+        else:
+            leftover.unlink()
+
+def _batch_worker_main(connection):
+    """Worker process of a BatchScheduler: convert jobs received on connection until told to stop"""
+    _init_batch_worker()
+    # Ctrl+C is handled by the scheduler, which stops its workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        connection.send(_run_batch_job(job))
+
+class _BatchWorker:
+    """A worker process and the job it is running"""
+    
+    def __init__(self):
+        import multiprocessing
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_batch_worker_main, args=(child_connection,), daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.job = None
+        self.started = None
+    
+    def submit(self, job: Dict):
+        self.job = job
+        self.started = time.monotonic()
+        self.connection.send(job['job'])
+    
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        self.kill()
+    
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+class BatchScheduler:
+    """Runs batch jobs on worker processes under a memory budget and per-job limits.
+
+    Each document's peak memory and conversion time are estimated from its
+    zip metadata (see preflight_document). Jobs are started in ``order``
+    (input order, largest-first or shortest-first) as long as their
+    estimates fit in ``memory_budget_mb`` together with the running jobs;
+    a job that does not fit waits while later ones that do are started, and
+    one larger than the whole budget runs alone. A job that runs longer
+    than ``job_timeout`` seconds or whose worker grows beyond
+    ``job_memory_mb`` (where /proc is available) is stopped and its worker
+    replaced. Failed jobs are retried up to ``retries`` times once the main
+    lane is done, on RETRY_WORKERS workers with the whole budget.
+    """
+    
+    def __init__(self, memory_budget_mb: float = None, order: str = 'input', job_timeout: float = None,
+                 job_memory_mb: float = None, retries: int = 1):
+        if order not in BATCH_ORDERS:
+            raise ValueError(f"Unknown batch order '{order}'; expected one of {', '.join(BATCH_ORDERS)}")
+        self.memory_budget_mb = memory_budget_mb
+        self.order = order
+        self.job_timeout = job_timeout
+        self.job_memory_mb = job_memory_mb
+        self.retries = retries
+        if job_memory_mb and _process_rss_mb(os.getpid()) is None:
+            logger.warning("Per-job memory limits need /proc; they are not enforced on this platform")
+    
+    def _estimate(self, job: Tuple) -> Dict:
+        entry = {'job': job, 'memory_mb': 0, 'seconds': 0, 'attempts': 0}
+        if self.memory_budget_mb or self.order != 'input':
+            try:
+                record = preflight_document(job[0])
+                entry['memory_mb'] = record['estimated_peak_mb']
+                entry['seconds'] = record['estimated_seconds']
+            except OSError:
+                pass
+        return entry
+    
+    def run(self, jobs: List[Tuple], workers: int, record) -> List[Dict]:
+        """Run jobs on up to workers processes, passing each result to record(result, retrying)"""
+        entries = [self._estimate(job) for job in jobs]
+        if self.order != 'input':
+            entries.sort(key=lambda entry: entry['seconds'], reverse=self.order == 'largest')
+        results = []
+        idle = []
+        try:
+            failed = self._run_lane(entries, workers, idle, results, record)
+            for attempt in range(self.retries):
+                if not failed:
+                    break
+                print(f"🔁 Retrying {len(failed)} failed document(s) with {RETRY_WORKERS} worker(s)", flush=True)
+                failed = self._run_lane(failed, RETRY_WORKERS, idle, results, record,
+                                        final=attempt == self.retries - 1)
+        finally:
+            for worker in idle:
+                worker.stop()
+        return results
+    
+    def _run_lane(self, pending: List[Dict], slots: int, idle: List[_BatchWorker], results: List[Dict], record,
+                  final: bool = None) -> List[Dict]:
+        """Run one lane of jobs; returns the failed ones that are left for a retry"""
+        from multiprocessing.connection import wait
+        
+        if final is None:
+            final = self.retries == 0
+        pending = list(pending)
+        running = {}
+        failed = []
+        
+        def finish(worker: _BatchWorker, result: Dict):
+            entry = worker.job
+            del running[worker.connection]
+            worker.job = None
+            result['attempts'] = entry['attempts']
+            if result['status'] == 'failed' and not final:
+                failed.append(entry)
+                record(result, True)
+            else:
+                results.append(result)
+                record(result, False)
+        
+        def stop(worker: _BatchWorker, error: str):
+            worker.kill()
+            _remove_killed_output(worker.job['job'], worker.process.pid)
+            finish(worker, {'input_file': worker.job['job'][0], 'status': 'failed', 'error': error,
+                            'seconds': time.monotonic() - worker.started})
+        
+        try:
+            while pending or running:
+                in_use = sum(worker.job['memory_mb'] for worker in running.values())
+                for entry in list(pending):
+                    if len(running) >= slots:
+                        break
+                    fits = (not self.memory_budget_mb or not running
+                            or in_use + entry['memory_mb'] <= self.memory_budget_mb)
+                    if not fits:
+                        continue
+                    pending.remove(entry)
+                    entry['attempts'] += 1
+                    worker = idle.pop() if idle else _BatchWorker()
+                    worker.submit(entry)
+                    running[worker.connection] = worker
+                    in_use += entry['memory_mb']
+                
+                for connection in wait(list(running), timeout=SCHEDULER_POLL_INTERVAL):
+                    worker = running[connection]
+                    try:
+                        result = connection.recv()
+                    except (EOFError, OSError):
+                        worker.process.join()
+                        stop(worker, f"Worker process died (exit code {worker.process.exitcode})")
+                        continue
+                    finish(worker, result)
+                    idle.append(worker)
                 
-        return report
+                now = time.monotonic()
+                for worker in list(running.values()):
+                    if self.job_timeout and now - worker.started > self.job_timeout:
+                        stop(worker, f"Timed out after {self.job_timeout:g}s")
+                        continue
+                    rss = _process_rss_mb(worker.process.pid) if self.job_memory_mb else None
+                    if rss is not None and rss > self.job_memory_mb:
+                        stop(worker, f"Exceeded the memory limit ({rss:.0f} MB > {self.job_memory_mb:g} MB)")
+        except BaseException:
+            for worker in running.values():
+                worker.kill()
+            raise
+        return failed
+
+def run_batch(jobs: List[Tuple[str, str]], workers: int = None, cache_settings: Dict = None,
+              options: Dict = None, scheduler: BatchScheduler = None) -> List[Dict]:
+    """Convert many documents across worker processes and print an aggregate summary.
+
+    With a single worker and no scheduler the documents are converted in
+    this process; otherwise they go through ``scheduler`` (by default a
+    BatchScheduler with no memory budget or limits and one retry).
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    options = dict(options or {})
+    if (workers > 1 or scheduler is not None) and options.get('body_workers'):
+        # Batch workers already use every core, and worker processes cannot start pools of their own
+        logger.info("Ignoring --body-workers in a multi-process batch run")
+        options['body_workers'] = 0
+    jobs = [(input_file, output_folder, cache_settings, options) for input_file, output_folder in jobs]
+    start = time.monotonic()
+    results = []
+    completed = [0]
+    print(f"📚 Converting {len(jobs)} document(s) with {workers} worker(s)")
+    
+    def record(result, retrying=False):
+        if retrying:
+            print(f"⚠️  {result['input_file']} failed, will retry: {result['error']}", flush=True)
+            return
+        completed[0] += 1
+        marker = {'converted': '✅', 'cached': '♻️ '}.get(result['status'], '❌')
+        print(f"{marker} [{completed[0]}/{len(jobs)}] {result['input_file']}", flush=True)
+        if result['status'] == 'failed':
+            print(f"   {result['error']}", file=sys.stderr)
+    
+    if workers == 1 and scheduler is None:
+        _init_batch_worker()
+        for job in jobs:
+            result = _run_batch_job(job)
+            results.append(result)
+            record(result)
+    else:
+        results = (scheduler or BatchScheduler()).run(jobs, workers, record)
+    
+    elapsed = time.monotonic() - start
+    converted = [r for r in results if r['status'] != 'failed']
+    failed = [r for r in results if r['status'] == 'failed']
+    cached = [r for r in results if r['status'] == 'cached']
+    retried = [r for r in results if r.get('attempts', 1) > 1]
+    if cache_settings:
+        ConversionCache(**cache_settings).evict()
+    
+    print(f"\n📊 Batch summary")
+    print(f"📄 Converted: {len(converted)}/{len(results)}")
+    if cache_settings:
+        print(f"♻️  Served from cache: {len(cached)}")
+    if retried:
+        print(f"🔁 Retried: {len(retried)} ({sum(1 for r in retried if r['status'] != 'failed')} succeeded)")
+    print(f"🖼️  Images extracted: {sum(r['images'] for r in converted)}")
+    print(f"📋 Headings found: {sum(r['headings'] for r in converted)}")
+    print(f"ℹ️  Issues handled: {sum(r['issues'] for r in converted)}")
+    print(f"⏱️  Elapsed: {elapsed:.1f}s ({len(results) / elapsed if elapsed else 0:.1f} docs/sec)")
+    if failed:
+        print(f"❌ Failed: {len(failed)}")
+        for result in failed:
+            print(f"   {result['input_file']}: {result['error']}")
+    return results
+
+# Watch mode: seconds between scans, and how long a changed document must
+# stay unchanged before it is converted (so a burst of saves converts once)
+WATCH_INTERVAL = 1.0
+WATCH_DEBOUNCE = 2.0
+
+def _init_watch_worker():
+    """Batch worker setup; Ctrl+C is handled by the watching process, not mid-conversion"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, 'SIGTERM'):
+        # Forked workers inherit the watcher's SIGTERM handler
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _init_batch_worker()
+
+def _stop_watching(signum, frame):
+    raise KeyboardInterrupt
+
+class DocumentWatcher:
+    """Keeps the Markdown mirror of watched documents up to date by polling.
+
+    Every interval the inputs are expanded like a batch run and each
+    document's size and modification time are compared with what was last
+    converted. A changed document waits until it has been stable for
+    ``debounce`` seconds and is skipped if its SHA-256 did not change (a
+    touch, or a sync client rewriting the same bytes). Conversions run on a
+    bounded process pool, at most one per document at a time, and replace
+    the document's output folder in one step (see convert_document); a
+    document saved again while it converts is picked up by a later scan. Documents
+    whose markdown is newer than the document are not reconverted on start.
+    """
+    
+    def __init__(self, inputs: List[str], output_folder: str, manifest: str = None, workers: int = None,
+                 cache_settings: Dict = None, options: Dict = None, interval: float = WATCH_INTERVAL,
+                 debounce: float = WATCH_DEBOUNCE):
+        self.inputs = list(inputs)
+        self.output_folder = output_folder
+        self.manifest = manifest
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.cache_settings = cache_settings
+        self.options = dict(options or {})
+        if self.workers > 1 and self.options.get('body_workers'):
+            logger.info("Ignoring --body-workers while watching with several workers")
+            self.options['body_workers'] = 0
+        self.interval = interval
+        self.debounce = debounce
+        # key -> (size, mtime_ns) last seen and when it was first seen
+        self._observed = {}
+        # key -> ((size, mtime_ns), sha256 or None) of the last conversion
+        self._converted = {}
+        # key -> (future, signature, sha256) of conversions in flight
+        self._running = {}
+    
+    @staticmethod
+    def _signature(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    
+    @staticmethod
+    def _output_is_current(input_file: str, output_folder: str) -> bool:
+        """True when the document's markdown exists and is newer than the document"""
+        markdown_file = DocxToMarkdownConverter.output_paths(input_file, output_folder)[1]
+        try:
+            return markdown_file.stat().st_mtime_ns >= os.stat(input_file).st_mtime_ns
+        except OSError:
+            return False
+    
+    def poll(self, executor) -> List[Dict]:
+        """Run one scan: return finished conversions and submit documents that changed"""
+        results = []
+        for key, (future, signature, digest) in list(self._running.items()):
+            if future.done():
+                del self._running[key]
+                # Failed conversions are retried on the document's next change, not every scan
+                self._converted[key] = (signature, digest)
+                results.append(future.result())
+        
+        now = time.monotonic()
+        present = set()
+        for input_file, job_output in collect_batch_jobs(self.inputs, self.output_folder, self.manifest):
+            key = os.path.normcase(os.path.abspath(input_file))
+            present.add(key)
+            try:
+                signature = self._signature(input_file)
+            except OSError:
+                # Deleted or replaced between the scan and the stat
+                continue
+            observed = self._observed.get(key)
+            if observed is None or observed[0] != signature:
+                # Every change restarts the debounce window
+                if observed is None and key not in self._converted and self._output_is_current(input_file, job_output):
+                    self._converted[key] = (signature, None)
+                self._observed[key] = (signature, now)
+                continue
+            if now - observed[1] < self.debounce or key in self._running:
+                continue
+            converted = self._converted.get(key)
+            if converted is not None and converted[0] == signature:
+                continue
+            digest = ConversionCache.hash_file(input_file)
+            if converted is not None and converted[1] == digest:
+                self._converted[key] = (signature, digest)
+                continue
+            future = executor.submit(_run_batch_job, (input_file, job_output, self.cache_settings, self.options))
+            self._running[key] = (future, signature, digest)
+        
+        for key in list(self._observed):
+            if key not in present:
+                # Removed documents keep their last output
+                del self._observed[key]
+                self._converted.pop(key, None)
+        return results
+    
+    def run(self):
+        """Scan until interrupted (Ctrl+C or SIGTERM), printing a line per conversion"""
+        from concurrent.futures import ProcessPoolExecutor
+        
+        if hasattr(signal, 'SIGTERM'):
+            signal.signal(signal.SIGTERM, _stop_watching)
+        watched = ', '.join(self.inputs + ([self.manifest] if self.manifest else []))
+        print(f"👀 Watching {watched} -> {self.output_folder} with {self.workers} worker(s) (Ctrl+C to stop)", flush=True)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_watch_worker) as executor:
+            try:
+                while True:
+                    for result in self.poll(executor):
+                        stamp = time.strftime('%H:%M:%S')
+                        marker = {'converted': '✅', 'cached': '♻️ '}.get(result['status'], '❌')
+                        print(f"{marker} {stamp} {result['input_file']} ({result['seconds']:.1f}s)", flush=True)
+                        if result['status'] == 'failed':
+                            print(f"   {result['error']}", file=sys.stderr, flush=True)
+                    time.sleep(self.interval)
+            except KeyboardInterrupt:
+                print("👋 Stopped watching; waiting for running conversions to finish", flush=True)
+        if self.cache_settings:
+            ConversionCache(**self.cache_settings).evict()
+
+# JSON-RPC error codes used by the --serve protocol
+RPC_PARSE_ERROR = -32700
+RPC_INVALID_REQUEST = -32600
+RPC_METHOD_NOT_FOUND = -32601
+RPC_INVALID_PARAMS = -32602
+RPC_CONVERSION_FAILED = -32000
+
+class ServeChannel:
+    """Writes newline-delimited JSON-RPC messages to the daemon's protocol stream"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        # Image writer threads log too, so progress may arrive from several threads
+        self._lock = threading.Lock()
+    
+    def send(self, message: Dict):
+        line = json.dumps({'jsonrpc': '2.0', **message}) + "\n"
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+    
+    def result(self, request_id, result):
+        self.send({'id': request_id, 'result': result})
+    
+    def error(self, request_id, code: int, message: str):
+        self.send({'id': request_id, 'error': {'code': code, 'message': message}})
+
+class _ProgressHandler(logging.Handler):
+    """Forwards log records of the running request as progress notifications"""
+    
+    def __init__(self, channel: ServeChannel, request_id):
+        super().__init__(logging.INFO)
+        self.channel = channel
+        self.request_id = request_id
+        self.setFormatter(logging.Formatter('%(message)s'))
+    
+    def emit(self, record):
+        try:
+            self.channel.send({'method': 'progress', 'params': {'id': self.request_id, 'message': self.format(record)}})
+        except Exception:
+            self.handleError(record)
+
+def _serve_convert(params: Dict) -> Dict:
+    """Run one ``convert`` request and return its summary"""
+    input_file = params.get('input_file')
+    if not isinstance(input_file, str) or not input_file:
+        raise ValueError("'input_file' is required")
+    if not os.path.isfile(input_file):
+        raise FileNotFoundError(f"Input file '{input_file}' not found")
+    
+    options = {
+        'image_workers': int(params.get('image_workers', 0)),
+        'image_mode': params.get('image_mode', 'eager'),
+        'profile': bool(params.get('profile', False)),
+        'body_workers': int(params.get('body_workers', 0)),
+        'fsync': bool(params.get('fsync', False)),
+    }
+    if params.get('split_level'):
+        options['split_level'] = int(params['split_level'])
+    for limit, kind in (('max_part_size', int), ('max_ratio', float), ('max_total_size', int)):
+        if params.get(limit):
+            options[limit] = kind(params[limit])
+    if params.get('media_store'):
+        options['media_store'] = params['media_store']
+        options['media_mode'] = params.get('media_mode', 'hardlink')
+    if options['image_mode'] not in IMAGE_MODES:
+        raise ValueError(f"image_mode must be one of {', '.join(IMAGE_MODES)}")
+    cache = None
+    if params.get('cache_dir'):
+        cache = ConversionCache(params['cache_dir'], int(params.get('cache_size', 1024)) * 1024 * 1024)
+    return convert_document(input_file, params.get('output_folder') or 'TargetMDDirectory', cache=cache, **options)
+
+def serve(stdin=None, stdout=None):
+    """Answer newline-delimited JSON-RPC requests until ``shutdown`` or end of input.
+    
+    This keeps one warm interpreter for the VS Code extension. Requests are
+    handled in order: ``hello`` reports the converter and Python versions,
+    ``convert`` converts one document and returns the same summary as
+    ``convert_document``, and ``shutdown`` stops the loop. Log records
+    emitted while a conversion runs are streamed back as ``progress``
+    notifications carrying the request id.
+    """
+    stdin = stdin if stdin is not None else sys.stdin.buffer
+    channel = ServeChannel(stdout if stdout is not None else sys.stdout)
+    
+    # Stray prints must not corrupt the protocol stream, and INFO logs travel
+    # as progress notifications instead of duplicating on stderr
+    saved_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    root = logging.getLogger()
+    quieted = [(handler, handler.level) for handler in root.handlers]
+    for handler, _ in quieted:
+        handler.setLevel(logging.WARNING)
+    
+    try:
+        for raw in stdin:
+            if isinstance(raw, bytes):
+                raw = raw.decode('utf-8', errors='replace')
+            if not raw.strip():
+                continue
+            try:
+                request = json.loads(raw)
+            except ValueError as e:
+                channel.error(None, RPC_PARSE_ERROR, f"Invalid JSON: {e}")
+                continue
+            if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+                channel.error(None, RPC_INVALID_REQUEST, "Request must be an object with a 'method'")
+                continue
+            
+            request_id = request.get('id')
+            method = request['method']
+            params = request.get('params') or {}
+            if method == 'hello':
+                channel.result(request_id, {
+                    'version': __version__,
+                    'python': '.'.join(str(part) for part in sys.version_info[:3]),
+                    'executable': sys.executable,
+                })
+            elif method == 'shutdown':
+                channel.result(request_id, None)
+                break
+            elif method == 'convert':
+                handler = _ProgressHandler(channel, request_id)
+                root.addHandler(handler)
+                try:
+                    summary = _serve_convert(params)
+                except (ValueError, TypeError) as e:
+                    channel.error(request_id, RPC_INVALID_PARAMS, str(e))
+                except Exception as e:
+                    logger.error(f"Conversion failed: {e}")
+                    channel.error(request_id, RPC_CONVERSION_FAILED, f"Conversion failed: {e}")
+                else:
+                    channel.result(request_id, summary)
+                finally:
+                    root.removeHandler(handler)
+            else:
+                channel.error(request_id, RPC_METHOD_NOT_FOUND, f"Unknown method: {method}")
+    finally:
+        sys.stdout = saved_stdout
+        for handler, level in quieted:
+            handler.setLevel(level)
 
 def main():
     """Main function"""
     import argparse
     
     parser = argparse.ArgumentParser(description='Convert DOC/DOCX to Markdown with image extraction')
-    parser.add_argument('input_file', help='Path to input DOC/DOCX file')
+    parser.add_argument('input_file', nargs='*', help='Path to input DOC/DOCX file, or directories/globs for batch conversion')
     parser.add_argument('--output', '-o', default='TargetMDDirectory', help='Output folder name')
+    parser.add_argument('--manifest', help='Text file listing documents, directories or globs to convert (one per line)')
+    parser.add_argument('--workers', '-j', type=int, default=None, help='Worker processes for batch conversion (default: CPU count)')
+    parser.add_argument('--memory-budget', type=float,
+                        help='Start batch conversions only while their estimated peak memory fits in this many MB')
+    parser.add_argument('--order', choices=BATCH_ORDERS, default='input',
+                        help='Batch job order by estimated cost: input order, largest-first or shortest-first (default: input)')
+    parser.add_argument('--job-timeout', type=float, help='Stop a batch conversion that runs longer than this many seconds')
+    parser.add_argument('--job-memory', type=float, help='Stop a batch conversion whose process grows beyond this many MB (Linux)')
+    parser.add_argument('--retries', type=int, default=1,
+                        help='Times a failed batch conversion is retried on a single worker after the others (default: 1)')
+    parser.add_argument('--cache-dir', help='Reuse outputs of unchanged documents from this conversion cache directory')
+    parser.add_argument('--cache-size', type=int, default=1024, help='Maximum conversion cache size in MB (default: 1024)')
+    parser.add_argument('--image-workers', type=int, default=0, help='Threads writing images while text is converted (default: 0, write inline)')
+    parser.add_argument('--body-workers', type=int, default=0,
+                        help='Processes rendering the body of large documents in parallel (default: 0, render serially)')
+    parser.add_argument('--images', choices=IMAGE_MODES, default='eager',
+                        help='eager: extract all images; lazy: only images referenced in the body; links: markdown references only, no files')
+    parser.add_argument('--max-part-mb', type=float,
+                        help=f'Cut off any package part that expands beyond this many MB (default: {MAX_PART_SIZE // (1024 * 1024)})')
+    parser.add_argument('--max-ratio', type=float,
+                        help=f'Cut off parts compressed more than this ratio, e.g. zip bombs (default: {MAX_COMPRESSION_RATIO})')
+    parser.add_argument('--max-total-mb', type=float,
+                        help=f'Stop decompressing a document after this many MB in total (default: {MAX_TOTAL_SIZE // (1024 * 1024)})')
+    parser.add_argument('--split', choices=('h1', 'h2'),
+                        help='Write one markdown file per H1 (or H1 and H2) section plus an index with the table of contents')
+    parser.add_argument('--profile', action='store_true',
+                        help='Measure time, CPU, I/O and memory per conversion phase (report section plus conversion_profile.json)')
+    parser.add_argument('--fsync', action='store_true',
+                        help='Flush each output folder to disk before it replaces the previous output (slower, survives power loss)')
+    parser.add_argument('--media-store',
+                        help='Keep each distinct image once in this shared folder and link documents to it')
+    parser.add_argument('--media-mode', choices=MEDIA_MODES, default='hardlink',
+                        help='How documents refer to the media store: hard links or symlinks in images/, '
+                             'or markdown links into the store (default: hardlink)')
+    parser.add_argument('--preflight', action='store_true',
+                        help='Classify the inputs without converting them and print one JSON line per document')
+    parser.add_argument('--serve', action='store_true', help='Run as a converter daemon answering JSON-RPC requests on stdin (used by the VS Code extension)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and reconvert documents under the inputs whenever they change')
+    parser.add_argument('--watch-interval', type=float, default=WATCH_INTERVAL,
+                        help=f'Seconds between scans in --watch mode (default: {WATCH_INTERVAL:g})')
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE,
+                        help=f'Seconds a changed document must stay unchanged before it is converted (default: {WATCH_DEBOUNCE:g})')
     
     args = parser.parse_args()
+    if args.serve:
+        serve()
+        return
+    
+    options = {'image_workers': args.image_workers, 'image_mode': args.images}
+    if args.body_workers:
+        options['body_workers'] = args.body_workers
+    if args.profile:
+        options['profile'] = True
+    if args.fsync:
+        options['fsync'] = True
+    if args.split:
+        options['split_level'] = int(args.split[1])
+    if args.max_part_mb:
+        options['max_part_size'] = int(args.max_part_mb * 1024 * 1024)
+    if args.max_ratio:
+        options['max_ratio'] = args.max_ratio
+    if args.max_total_mb:
+        options['max_total_size'] = int(args.max_total_mb * 1024 * 1024)
+    if args.media_store:
+        options['media_store'] = args.media_store
+        options['media_mode'] = args.media_mode
+    cache_settings = None
+    if args.cache_dir:
+        cache_settings = {'cache_dir': args.cache_dir, 'max_bytes': args.cache_size * 1024 * 1024}
+    
+    if not args.input_file and not args.manifest:
+        parser.error('an input file, directory, glob or --manifest is required')
     
-    if not os.path.exists(args.input_file):
-        print(f"❌ Error: Input file '{args.input_file}' not found.")
+    if args.preflight:
+        documents = [input_file for input_file, _ in collect_batch_jobs(args.input_file, args.output, args.manifest)]
+        if not documents:
+            print("❌ Error: No .docx or .doc files found to preflight.", file=sys.stderr)
+            sys.exit(1)
+        run_preflight(documents, args.workers)
+        return
+    
+    if args.watch:
+        DocumentWatcher(args.input_file, args.output, args.manifest, args.workers, cache_settings, options,
+                        interval=args.watch_interval, debounce=args.debounce).run()
+        return
+    
+    single = args.input_file[0] if len(args.input_file) == 1 and not args.manifest else None
+    if single is None or os.path.isdir(single) or (not os.path.exists(single) and any(c in single for c in '*?[')):
+        jobs = collect_batch_jobs(args.input_file, args.output, args.manifest)
+        if not jobs:
+            print("❌ Error: No .docx or .doc files found to convert.")
+            sys.exit(1)
+        scheduler = None
+        if args.memory_budget or args.order != 'input' or args.job_timeout or args.job_memory or args.retries != 1:
+            scheduler = BatchScheduler(memory_budget_mb=args.memory_budget, order=args.order,
+                                       job_timeout=args.job_timeout, job_memory_mb=args.job_memory,
+                                       retries=args.retries)
+        results = run_batch(jobs, args.workers, cache_settings, options, scheduler)
+        if any(r['status'] == 'failed' for r in results):
+            sys.exit(1)
+        return
+    
+    input_file = args.input_file[0]
+    if not os.path.exists(input_file):
+        print(f"❌ Error: Input file '{input_file}' not found.")
         sys.exit(1)
     
     try:
-        # Create converter
-        converter = DocxToMarkdownConverter(args.input_file, args.output)
-        
-        # Convert to markdown
-        markdown_content = converter.convert()
-        
-        # Save markdown file
-        output_file = converter.save_markdown(markdown_content)
-        
-        # Generate and save report
-        report = converter.generate_report()
-        report_file = converter.doc_output_path / "conversion_report.md"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write(report)
+        cache = ConversionCache(**cache_settings) if cache_settings else None
+        summary = convert_document(input_file, args.output, cache=cache, **options)
         
         # Output handled issues to stderr for extension to detect
-        if converter.warnings.handled_issues:
-            import sys
-            for issue in converter.warnings.handled_issues:
-                print(issue, file=sys.stderr)
+        for issue in summary['handled_issues']:
+            print(issue, file=sys.stderr)
         
         print(f"\n✅ Conversion completed successfully!")
-        print(f"📄 Markdown file: {output_file}")
-        print(f"🖼️  Images folder: {converter.images_path}")
-        print(f"📊 Report: {report_file}")
-        print(f"📈 Extracted {len(converter.images_extracted)} images")
-        print(f"📋 Found {len(converter.headings)} headings")
-        print(f"🗂️  File type: {converter.file_type.upper()}")
-        
-        if converter.warnings.warnings:
-            print(f"ℹ️  Handled {len(converter.warnings.warnings)} issue(s) gracefully")
+        if summary['status'] == 'cached':
+            print("♻️  Document unchanged; outputs " + ("already up to date" if summary['up_to_date'] else "restored from cache"))
+        print(f"📄 Markdown file: {summary['markdown_file']}")
+        print(f"🖼️  Images folder: {summary['images_path']}")
+        print(f"📊 Report: {summary['report_file']}")
+        if 'section_files' in summary:
+            print(f"📑 Section files: {len(summary['section_files'])}")
+        if 'profile_file' in summary:
+            print(f"⏱️  Profile: {summary['profile_file']}")
+        print(f"📈 Extracted {summary['images']} images")
+        print(f"📋 Found {summary['headings']} headings")
+        print(f"🗂️  File type: {summary['file_type'].upper()}")
+        
+        if summary['issues']:
+            print(f"ℹ️  Handled {summary['issues']} issue(s) gracefully")
         
     except Exception as e:
         print(f"❌ Conversion failed: {e}")
@@ -0,0 +1,212 @@
+import * as readline from 'readline';
+import { spawn, ChildProcess } from 'child_process';
+
+// Summary returned by convert_document() in docx_to_markdown_converter.py
+export interface ConversionSummary {
+    input_file: string;
+    status: 'converted' | 'cached';
+    markdown_file: string;
+    images_path: string;
+    report_file: string;
+    file_type?: string;
+    images?: number;
+    headings?: number;
+    issues?: number;
+    handled_issues?: string[];
+    up_to_date?: boolean;
+    section_files?: string[];
+}
+
+export interface ConversionOptions {
+    image_mode?: string;
+    image_workers?: number;
+    cache_dir?: string;
+    cache_size?: number;
+    fsync?: boolean;
+    media_store?: string;
+    media_mode?: string;
+    split_level?: number;
+}
+
+export interface DaemonInfo {
+    version: string;
+    python: string;
+    executable: string;
+}
+
+interface PendingRequest {
+    method: string;
+    resolve: (value: any) => void;
+    reject: (error: Error) => void;
+    onProgress?: (message: string) => void;
+    timeout?: number;
+    timer?: NodeJS.Timeout;
+}
+
+const HELLO_TIMEOUT = 15000;
+// Same limit the one-process-per-file path puts on execFile
+const CONVERT_TIMEOUT = 120000;
+
+/**
+ * A warm `docx_to_markdown_converter.py --serve` process.
+ *
+ * Requests are newline-delimited JSON-RPC messages on stdin; responses and
+ * `progress` notifications come back on stdout. The daemon handles requests
+ * in order, so several conversions can be queued at once without forking a
+ * new interpreter per file.
+ */
+export class ConverterDaemon {
+    private nextId = 1;
+    private readonly pending = new Map<number, PendingRequest>();
+    private exited = false;
+
+    private constructor(
+        private readonly child: ChildProcess,
+        readonly pythonPath: string,
+        readonly scriptPath: string,
+        private readonly log: (text: string) => void
+    ) {
+        const lines = readline.createInterface({ input: child.stdout! });
+        lines.on('line', line => this.handleLine(line));
+
+        child.stderr?.on('data', data => this.log(`stderr: ${data.toString()}`));
+        child.stdin?.on('error', error => this.handleExit(error));
+        child.on('error', error => this.handleExit(error));
+        child.on('exit', code => this.handleExit(new Error(`Converter daemon exited with code ${code}`)));
+    }
+
+    /**
+     * Start a daemon with the first Python command that answers `hello` with 3.6+.
+     * The handshake doubles as the Python compatibility check.
+     */
+    static async start(
+        pythonCommands: string[],
+        scriptPath: string,
+        cwd: string,
+        log: (text: string) => void
+    ): Promise<{ daemon: ConverterDaemon; info: DaemonInfo }> {
+        let lastError: Error = new Error('No Python command to try');
+
+        for (const cmd of pythonCommands) {
+            const child = spawn(cmd, [scriptPath, '--serve'], { cwd, stdio: ['pipe', 'pipe', 'pipe'] });
+            const daemon = new ConverterDaemon(child, cmd, scriptPath, log);
+
+            try {
+                const info = await daemon.request<DaemonInfo>('hello', undefined, undefined, HELLO_TIMEOUT);
+                const [major, minor] = info.python.split('.').map(part => parseInt(part));
+                if (major === 3 && minor >= 6) {
+                    return { daemon, info };
+                }
+                lastError = new Error(`Python ${info.python} found, but Python 3.6+ is required.`);
+            } catch (error) {
+                lastError = error instanceof Error ? error : new Error(String(error));
+            }
+            daemon.dispose();
+        }
+
+        throw lastError;
+    }
+
+    get isAlive(): boolean {
+        return !this.exited;
+    }
+
+    convert(
+        inputFile: string,
+        outputFolder: string,
+        options: ConversionOptions = {},
+        onProgress?: (message: string) => void
+    ): Promise<ConversionSummary> {
+        return this.request<ConversionSummary>('convert', {
+            input_file: inputFile,
+            output_folder: outputFolder,
+            ...options
+        }, onProgress, CONVERT_TIMEOUT);
+    }
+
+    /**
+     * Send a request and wait for its response.
+     * The timeout runs from the moment the daemon starts on the request, not while it
+     * waits behind earlier ones; when it expires the daemon is stopped, since it is
+     * still busy with that request, and every pending request is rejected.
+     */
+    request<T>(method: string, params?: object, onProgress?: (message: string) => void, timeout?: number): Promise<T> {
+        if (this.exited) {
+            return Promise.reject(new Error('Converter daemon is not running'));
+        }
+
+        const id = this.nextId++;
+        return new Promise<T>((resolve, reject) => {
+            this.pending.set(id, { method, resolve, reject, onProgress, timeout });
+            this.child.stdin!.write(JSON.stringify({ jsonrpc: '2.0', id, method, params }) + '\n');
+            this.startTimer();
+        });
+    }
+
+    dispose(): void {
+        if (!this.exited) {
+            this.child.stdin?.end();
+            this.child.kill();
+        }
+        this.handleExit(new Error('Converter daemon stopped'));
+    }
+
+    private handleLine(line: string): void {
+        let message: any;
+        try {
+            message = JSON.parse(line);
+        } catch {
+            this.log(line + '\n');
+            return;
+        }
+
+        if (message.method === 'progress') {
+            this.pending.get(message.params?.id)?.onProgress?.(message.params.message);
+            return;
+        }
+
+        const request = this.pending.get(message.id);
+        if (!request) {
+            if (message.error) {
+                this.log(`⚠️ Converter daemon: ${message.error.message}\n`);
+            }
+            return;
+        }
+
+        this.pending.delete(message.id);
+        clearTimeout(request.timer);
+        this.startTimer();
+        if (message.error) {
+            request.reject(new Error(message.error.message));
+        } else {
+            request.resolve(message.result);
+        }
+    }
+
+    private handleExit(error: Error): void {
+        this.exited = true;
+        const requests = [...this.pending.values()];
+        this.pending.clear();
+        for (const request of requests) {
+            clearTimeout(request.timer);
+            request.reject(error);
+        }
+    }
+
+    // Requests are answered in order, so the oldest pending one is the one being worked on
+    private startTimer(): void {
+        const first = this.pending.entries().next();
+        if (first.done) {
+            return;
+        }
+        const [id, request] = first.value;
+        if (!request.timeout || request.timer) {
+            return;
+        }
+        request.timer = setTimeout(() => {
+            this.pending.delete(id);
+            request.reject(new Error(`Converter daemon did not answer '${request.method}' within ${request.timeout! / 1000}s`));
+            this.dispose();
+        }, request.timeout);
+    }
+}
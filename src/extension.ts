@@ -1,10 +1,21 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
 import * as fs from 'fs';
-import { execFile, spawn } from 'child_process';
+import { execFile, spawn, ChildProcess } from 'child_process';
+import { ConverterDaemon, ConversionSummary } from './converterDaemon';
 
 let outputChannel: vscode.OutputChannel;
 
+// Warm converter process shared by conversions, restarted when settings or the script change
+let converterDaemon: ConverterDaemon | undefined;
+let converterDaemonKey: string | undefined;
+const failedDaemonKeys = new Set<string>();
+const pythonInfoCache = new Map<string, PythonInfo>();
+
+// `--watch` converter processes keeping a folder's Markdown mirror fresh, keyed by folder path
+const folderWatchers = new Map<string, ChildProcess>();
+let watchStatusItem: vscode.StatusBarItem | undefined;
+
 // Usage tracking for review prompt
 interface UsageStats {
     usageCount: number;
@@ -19,45 +30,58 @@ export function activate(context: vscode.ExtensionContext) {
     outputChannel = vscode.window.createOutputChannel('Docx2MD Converter');
 
     // Register the conversion command
-    let convertDisposable = vscode.commands.registerCommand('docx2mdconverter.convertDocxToMarkdown', async (uri?: vscode.Uri) => {
+    let convertDisposable = vscode.commands.registerCommand('docx2mdconverter.convertDocxToMarkdown', async (uri?: vscode.Uri, selectedUris?: vscode.Uri[]) => {
         try {
             // Track usage for review prompt
             await trackUsageAndPromptReview(context);
 
-            // Get the file path
-            let filePath: string;
+            // Get the file paths (explorer multi-select passes every selected resource)
+            let filePaths: string[];
 
-            if (uri) {
-                filePath = uri.fsPath;
+            if (selectedUris && selectedUris.length > 1) {
+                filePaths = selectedUris.map(selected => selected.fsPath);
+            } else if (uri) {
+                filePaths = [uri.fsPath];
             } else {
                 // Show file picker if no file selected
-                const fileUri = await vscode.window.showOpenDialog({
+                const fileUris = await vscode.window.showOpenDialog({
                     canSelectFiles: true,
                     canSelectFolders: false,
-                    canSelectMany: false,
+                    canSelectMany: true,
                     filters: {
                         'Word Documents': ['docx', 'doc']
                     },
-                    title: 'Select DOCX or DOC file to convert',
+                    title: 'Select DOCX or DOC files to convert',
                     openLabel: 'Convert to Markdown'
                 });
 
-                if (!fileUri || fileUri.length === 0) {
+                if (!fileUris || fileUris.length === 0) {
                     return;
                 }
-                filePath = fileUri[0].fsPath;
-            }
-
-            // Validate file exists and has correct extension
-            if (!fs.existsSync(filePath)) {
-                vscode.window.showErrorMessage('Selected file does not exist.');
-                return;
+                filePaths = fileUris.map(fileUri => fileUri.fsPath);
             }
 
-            const ext = path.extname(filePath).toLowerCase();
-            if (ext !== '.docx' && ext !== '.doc') {
-                vscode.window.showErrorMessage('Please select a .docx or .doc file.');
-                return;
+            // Validate files exist and have the correct extension
+            const isDocument = (candidate: string) => ['.docx', '.doc'].includes(path.extname(candidate).toLowerCase());
+            if (filePaths.length === 1) {
+                if (!fs.existsSync(filePaths[0])) {
+                    vscode.window.showErrorMessage('Selected file does not exist.');
+                    return;
+                }
+                if (!isDocument(filePaths[0])) {
+                    vscode.window.showErrorMessage('Please select a .docx or .doc file.');
+                    return;
+                }
+            } else {
+                const skipped = filePaths.filter(candidate => !isDocument(candidate) || !fs.existsSync(candidate));
+                filePaths = filePaths.filter(candidate => !skipped.includes(candidate));
+                if (filePaths.length === 0) {
+                    vscode.window.showErrorMessage('Please select .docx or .doc files.');
+                    return;
+                }
+                if (skipped.length > 0) {
+                    outputChannel.appendLine(`⏭️ Skipping ${skipped.length} file(s) that are not .docx or .doc documents`);
+                }
             }
 
             // Get configuration
@@ -105,204 +129,476 @@ export function activate(context: vscode.ExtensionContext) {
                 return;
             }
 
-            // Check Python version compatibility
-            const pythonInfo = await checkPythonCompatibility(pythonPath);
-            if (!pythonInfo.isCompatible) {
-                const message = pythonInfo.version
-                    ? `Python ${pythonInfo.version} found, but Python 3.6+ is required.`
-                    : 'Python not found or not accessible. Please install Python 3.6+ and ensure it\'s in your PATH.';
+            const workspaceFolder = vscode.workspace.workspaceFolders?.[0]?.uri.fsPath || path.dirname(filePaths[0]);
+            const outputPathFor = (filePath: string) =>
+                path.join(vscode.workspace.workspaceFolders?.[0]?.uri.fsPath || path.dirname(filePath), outputDir);
+
+            outputChannel.show(true);
 
-                vscode.window.showErrorMessage(message + ' Configure the Python path in settings if needed.');
+            const daemon = await getConverterDaemon(pythonPath, scriptPath, workspaceFolder);
+            if (daemon) {
+                await convertWithDaemon(daemon, filePaths, outputPathFor, showReport, autoOpenResult);
                 return;
             }
 
-            outputChannel.show(true);
+            // Fall back to one process per document, e.g. for a workspace copy of an older script
+            for (const filePath of filePaths) {
+                await convertWithProcess(filePath, pythonPath, scriptPath, outputPathFor(filePath), showReport, autoOpenResult);
+            }
+
+        } catch (error) {
+            outputChannel.appendLine(`💥 Unexpected error: ${error}`);
+            vscode.window.showErrorMessage(`Conversion failed: ${error}`);
+        }
+    });
+
+    // Watch a folder and reconvert its documents whenever they are saved; running it again stops watching
+    let watchDisposable = vscode.commands.registerCommand('docx2mdconverter.watchFolder', async (uri?: vscode.Uri) => {
+        try {
+            let folderPath = uri?.fsPath;
+            if (!folderPath) {
+                const folderUris = await vscode.window.showOpenDialog({
+                    canSelectFiles: false,
+                    canSelectFolders: true,
+                    canSelectMany: false,
+                    title: 'Select a folder of DOCX or DOC files to watch',
+                    openLabel: 'Watch Folder'
+                });
+
+                if (!folderUris || folderUris.length === 0) {
+                    return;
+                }
+                folderPath = folderUris[0].fsPath;
+            }
+
+            if (folderWatchers.has(folderPath)) {
+                stopFolderWatcher(folderPath);
+                vscode.window.showInformationMessage(`Stopped watching ${path.basename(folderPath)}.`);
+                return;
+            }
+
+            const config = vscode.workspace.getConfiguration('docx2mdconverter');
+            const pythonPath = config.get<string>('pythonPath', 'python');
+            const outputDir = config.get<string>('outputDirectory', 'TargetMDDirectory');
+
+            const scriptPath = await findPythonScript(context.extensionPath);
+            if (!scriptPath) {
+                vscode.window.showErrorMessage('Python converter script (docx_to_markdown_converter.py) not found. Convert a single document first to install or locate it.');
+                return;
+            }
+
+            const pythonInfo = await getPythonInfo(pythonPath);
+            if (!pythonInfo.isCompatible || !pythonInfo.executable) {
+                vscode.window.showErrorMessage('Python 3.6+ is required to watch folders. Please check the docx2mdconverter.pythonPath setting.');
+                return;
+            }
+
+            const outputPath = path.join(vscode.workspace.workspaceFolders?.[0]?.uri.fsPath || folderPath, outputDir);
+            startFolderWatcher(folderPath, pythonInfo.executable, scriptPath, outputPath);
+            vscode.window.showInformationMessage(`Watching ${path.basename(folderPath)}; changed documents are converted to ${outputDir}.`);
+
+        } catch (error) {
+            outputChannel.appendLine(`💥 Unexpected error: ${error}`);
+            vscode.window.showErrorMessage(`Could not watch folder: ${error}`);
+        }
+    });
+
+    let stopWatchDisposable = vscode.commands.registerCommand('docx2mdconverter.stopWatching', () => {
+        for (const folderPath of [...folderWatchers.keys()]) {
+            stopFolderWatcher(folderPath);
+        }
+    });
+
+    // A changed interpreter setting needs a fresh daemon and a fresh compatibility check
+    let configDisposable = vscode.workspace.onDidChangeConfiguration(event => {
+        if (event.affectsConfiguration('docx2mdconverter.pythonPath')) {
+            disposeConverterDaemon();
+            failedDaemonKeys.clear();
+            pythonInfoCache.clear();
+        }
+    });
+
+    context.subscriptions.push(convertDisposable);
+    context.subscriptions.push(watchDisposable);
+    context.subscriptions.push(stopWatchDisposable);
+    context.subscriptions.push(configDisposable);
+    context.subscriptions.push(outputChannel);
+}
+
+/**
+ * Return a running converter daemon for this interpreter and script, starting one if needed.
+ * Returns undefined when the daemon cannot be started, so callers fall back to one process per file.
+ */
+async function getConverterDaemon(pythonPath: string, scriptPath: string, cwd: string): Promise<ConverterDaemon | undefined> {
+    const key = `${pythonPath}\n${scriptPath}\n${fs.statSync(scriptPath).mtimeMs}`;
+
+    if (converterDaemon?.isAlive && converterDaemonKey === key) {
+        return converterDaemon;
+    }
+    disposeConverterDaemon();
+
+    if (failedDaemonKeys.has(key)) {
+        return undefined;
+    }
+
+    try {
+        const { daemon, info } = await ConverterDaemon.start(
+            [pythonPath, 'python3', 'python'],
+            scriptPath,
+            cwd,
+            text => outputChannel.append(text)
+        );
+        converterDaemon = daemon;
+        converterDaemonKey = key;
+        pythonInfoCache.set(pythonPath, { isCompatible: true, version: info.python, executable: daemon.pythonPath });
+        outputChannel.appendLine(`🐍 Python version: ${info.python}`);
+        outputChannel.appendLine(`📄 Using script: ${scriptPath} (converter ${info.version}, warm process)`);
+        return daemon;
+    } catch (error) {
+        failedDaemonKeys.add(key);
+        outputChannel.appendLine(`ℹ️ Converter daemon unavailable (${error instanceof Error ? error.message : error}); using one process per file`);
+        return undefined;
+    }
+}
+
+function disposeConverterDaemon(): void {
+    converterDaemon?.dispose();
+    converterDaemon = undefined;
+    converterDaemonKey = undefined;
+}
+
+/**
+ * Start `docx_to_markdown_converter.py <folder> --watch`, which polls the folder, debounces
+ * bursts of saves and swaps each reconverted document's output folder into place.
+ */
+function startFolderWatcher(folderPath: string, pythonExecutable: string, scriptPath: string, outputPath: string): void {
+    const args = [scriptPath, folderPath, '--watch', '--output', outputPath];
+    outputChannel.appendLine(`👀 Watching ${folderPath} (output: ${outputPath})`);
+    outputChannel.appendLine(`💻 Executing: ${pythonExecutable} ${args.join(' ')}`);
+
+    const child = spawn(pythonExecutable, args, {
+        cwd: path.dirname(outputPath),
+        env: { ...process.env, PYTHONUNBUFFERED: '1' }
+    });
+    folderWatchers.set(folderPath, child);
+
+    child.stdout?.on('data', data => outputChannel.append(data.toString()));
+    child.stderr?.on('data', data => outputChannel.append(data.toString()));
+    child.on('error', error => outputChannel.appendLine(`❌ Watcher for ${folderPath} failed: ${error.message}`));
+    child.on('exit', code => {
+        // Only report watchers that stopped on their own
+        if (folderWatchers.get(folderPath) === child) {
+            folderWatchers.delete(folderPath);
+            outputChannel.appendLine(`⚠️ Watcher for ${folderPath} exited with code ${code}`);
+            updateWatchStatus();
+        }
+    });
+
+    updateWatchStatus();
+}
+
+function stopFolderWatcher(folderPath: string): void {
+    const child = folderWatchers.get(folderPath);
+    folderWatchers.delete(folderPath);
+    // On POSIX kill() sends SIGTERM, which lets the watcher finish running conversions. On Windows it
+    // ends the process at once. A conversion killed that way leaves hidden staging folders beside
+    // its output, removed by later conversions once stale; killed mid-swap, the document has no
+    // output folder until it is converted again.
+    child?.kill();
+    outputChannel.appendLine(`🛑 Stopped watching ${folderPath}`);
+    updateWatchStatus();
+}
+
+function updateWatchStatus(): void {
+    if (folderWatchers.size === 0) {
+        watchStatusItem?.hide();
+        return;
+    }
+
+    if (!watchStatusItem) {
+        watchStatusItem = vscode.window.createStatusBarItem(vscode.StatusBarAlignment.Left);
+        watchStatusItem.command = 'docx2mdconverter.stopWatching';
+    }
+    watchStatusItem.text = `$(eye) Docx2MD: watching ${folderWatchers.size}`;
+    watchStatusItem.tooltip = `Converting changed documents in:\n${[...folderWatchers.keys()].join('\n')}\nClick to stop watching`;
+    watchStatusItem.show();
+}
+
+async function convertWithDaemon(
+    daemon: ConverterDaemon,
+    filePaths: string[],
+    outputPathFor: (filePath: string) => string,
+    showReport: boolean,
+    autoOpenResult: boolean
+): Promise<void> {
+    const title = filePaths.length === 1
+        ? `Converting ${path.basename(filePaths[0])} to Markdown...`
+        : `Converting ${filePaths.length} documents to Markdown...`;
+
+    let cancelled = false;
+    const results = await vscode.window.withProgress({
+        location: vscode.ProgressLocation.Notification,
+        title,
+        cancellable: true
+    }, async (progress, token) => {
+        token.onCancellationRequested(() => {
+            cancelled = true;
+            outputChannel.appendLine('❌ Conversion cancelled by user');
+            disposeConverterDaemon();
+        });
+
+        // All requests are queued at once; the daemon converts them in order in one process
+        let finished = 0;
+        return Promise.allSettled(filePaths.map(filePath => {
             outputChannel.appendLine(`🚀 Starting conversion of: ${path.basename(filePath)}`);
-            outputChannel.appendLine(`🐍 Python version: ${pythonInfo.version}`);
-            outputChannel.appendLine(`📄 Using script: ${scriptPath}`);
-            outputChannel.appendLine(`📁 File type: ${ext.substring(1).toUpperCase()}`);
-
-            // Determine output path
-            const workspaceFolder = vscode.workspace.workspaceFolders?.[0]?.uri.fsPath || path.dirname(filePath);
-            const outputPath = path.join(workspaceFolder, outputDir);
-
-            // Show progress
-            await vscode.window.withProgress({
-                location: vscode.ProgressLocation.Notification,
-                title: `Converting ${path.basename(filePath)} to Markdown...`,
-                cancellable: true
-            }, async (progress, token) => {
-                return new Promise<void>((resolve, reject) => {
-                    // Execute Python script with arguments
-                    const args = [scriptPath, filePath, '--output', outputPath];
-
-                    outputChannel.appendLine(`💻 Executing: ${pythonPath} ${args.join(' ')}`);
-
-                    const pythonProcess = execFile(pythonPath, args, {
-                        cwd: workspaceFolder,
-                        timeout: 120000, // 2 minute timeout
-                        maxBuffer: 1024 * 1024 * 10 // 10MB buffer
-                    }, (error, stdout, stderr) => {
-                        if (token.isCancellationRequested) {
-                            outputChannel.appendLine('❌ Conversion cancelled by user');
-                            reject(new Error('Cancelled'));
-                            return;
-                        }
+            return daemon.convert(filePath, outputPathFor(filePath), {}, message => {
+                outputChannel.appendLine(`   ${message}`);
+                progress.report({ message: filePaths.length === 1 ? message : `${path.basename(filePath)}: ${message}` });
+            }).then(summary => {
+                finished++;
+                if (filePaths.length > 1) {
+                    progress.report({ increment: 100 / filePaths.length, message: `${finished}/${filePaths.length} converted` });
+                }
+                return summary;
+            });
+        }));
+    });
 
-                        // Check for actual execution errors (non-zero exit codes)
-                        if (error) {
-                            outputChannel.appendLine(`⚠️ Process completed with issues: ${error.message}`);
-
-                            let isHandledIssue = false;
-                            let handledMessage = 'Conversion completed with handled issues';
-
-                            // Check for handled issues rather than treating as errors
-                            if (error.code === 'ENOENT') {
-                                handledMessage = 'Python executable not found. Please check your Python installation and PATH configuration.';
-                            } else if (error.code === 'ETIMEDOUT') {
-                                handledMessage = 'Conversion took longer than expected but may have completed. Check the output folder.';
-                            } else if (error.message.includes('Permission denied')) {
-                                handledMessage = 'Some content was protected, but available content was converted successfully.';
-                                isHandledIssue = true;
-                            } else if (error.message.includes('access') || error.message.includes('restricted')) {
-                                handledMessage = 'Document contains restricted content. Converted all accessible content.';
-                                isHandledIssue = true;
-                            } else if (error.code === 1) {
-                                // Check if output was created despite exit code 1
-                                const docName = path.basename(filePath, path.extname(filePath));
-                                const docOutputPath = path.join(outputPath, docName);
-                                const markdownFile = path.join(docOutputPath, `${docName}.md`);
-
-                                if (fs.existsSync(markdownFile) && fs.statSync(markdownFile).size > 0) {
-                                    handledMessage = 'Document converted successfully with some issues handled gracefully.';
-                                    isHandledIssue = true;
-                                }
-                            }
+    if (cancelled) {
+        return;
+    }
 
-                            // Check if output was actually created despite "error"
-                            const docName = path.basename(filePath, path.extname(filePath));
-                            const docOutputPath = path.join(outputPath, docName);
-                            const markdownFile = path.join(docOutputPath, `${docName}.md`);
-
-                            if (fs.existsSync(markdownFile) && fs.statSync(markdownFile).size > 0) {
-                                // File was created successfully, treat as handled issue
-                                outputChannel.appendLine('✅ Conversion completed successfully despite warnings!');
-                                vscode.window.showInformationMessage(
-                                    `✅ Document converted successfully! ${handledMessage}`,
-                                    'Open Result', 'View Details'
-                                ).then(selection => {
-                                    if (selection === 'Open Result') {
-                                        vscode.commands.executeCommand('vscode.open', vscode.Uri.file(markdownFile));
-                                    } else if (selection === 'View Details') {
-                                        outputChannel.show();
-                                    }
-                                });
-                                handleConversionSuccess(filePath, outputPath, showReport, autoOpenResult, true);
-                                resolve();
-                                return;
-                            }
+    const converted: ConversionSummary[] = [];
+    results.forEach((result, index) => {
+        const name = path.basename(filePaths[index]);
+        if (result.status === 'fulfilled') {
+            const summary = result.value;
+            converted.push(summary);
+            for (const issue of summary.handled_issues || []) {
+                outputChannel.appendLine(issue);
+            }
+            outputChannel.appendLine(`✅ ${name}: ${summary.status === 'cached' ? 'unchanged, reused cached output' : 'converted'}`);
+            outputChannel.appendLine(`📄 Output file: ${summary.markdown_file}`);
+        } else {
+            outputChannel.appendLine(`❌ ${name}: ${result.reason instanceof Error ? result.reason.message : result.reason}`);
+        }
+    });
 
-                            if (!isHandledIssue) {
-                                vscode.window.showErrorMessage(handledMessage);
-                                reject(error);
-                            }
-                            return;
-                        }
+    if (filePaths.length === 1) {
+        if (converted.length === 1) {
+            handleConversionSuccess(filePaths[0], outputPathFor(filePaths[0]), showReport, autoOpenResult, (converted[0].issues || 0) > 0);
+        } else {
+            vscode.window.showErrorMessage('Conversion failed. Check the output panel for details.');
+        }
+        return;
+    }
 
-                        // Log stderr content and look for handled issues
-                        let hasActualError = false;
-                        let handledIssues = [];
-
-                        if (stderr) {
-                            const stderrContent = stderr.trim();
-                            outputChannel.appendLine(`ℹ️ Processing notes: ${stderrContent}`);
-
-                            // Check for handled issues
-                            if (stderrContent.includes('HANDLED:')) {
-                                const handledMatches = stderrContent.match(/HANDLED: [^\n]+/g);
-                                if (handledMatches) {
-                                    handledIssues = handledMatches;
-                                    outputChannel.appendLine(`✅ Issues handled gracefully: ${handledIssues.length}`);
-                                }
-                            }
+    const failedCount = filePaths.length - converted.length;
+    const message = failedCount === 0
+        ? `✅ Converted ${converted.length} documents to Markdown.`
+        : `⚠️ Converted ${converted.length} of ${filePaths.length} documents. Check the output panel for the failures.`;
+    const selection = await vscode.window.showInformationMessage(message, 'Open Output Folder', 'View Details');
+    if (selection === 'Open Output Folder') {
+        vscode.commands.executeCommand('revealFileInOS', vscode.Uri.file(outputPathFor(filePaths[0])));
+    } else if (selection === 'View Details') {
+        outputChannel.show();
+    }
+}
 
-                            // Check for actual error indicators in stderr
-                            const errorIndicators = [
-                                'Error:', 'Exception:', 'Traceback', 'TypeError:', 'ValueError:',
-                                'FileNotFoundError:', 'PermissionError:', 'ModuleNotFoundError:',
-                                'SyntaxError:', 'ImportError:', 'AttributeError:'
-                            ];
-
-                            hasActualError = errorIndicators.some(indicator =>
-                                stderrContent.includes(indicator) && !stderrContent.includes('HANDLED:')
-                            );
-
-                            if (hasActualError) {
-                                outputChannel.appendLine('❌ Critical error detected in script output');
-                                vscode.window.showErrorMessage('Conversion failed due to script error. Check the output panel for details.');
-                                reject(new Error('Script error: ' + stderrContent));
-                                return;
-                            }
-                        }
+async function convertWithProcess(
+    filePath: string,
+    pythonPath: string,
+    scriptPath: string,
+    outputPath: string,
+    showReport: boolean,
+    autoOpenResult: boolean
+): Promise<void> {
+    // Check Python version compatibility
+    const pythonInfo = await getPythonInfo(pythonPath);
+    if (!pythonInfo.isCompatible) {
+        const message = pythonInfo.version
+            ? `Python ${pythonInfo.version} found, but Python 3.6+ is required.`
+            : 'Python not found or not accessible. Please install Python 3.6+ and ensure it\'s in your PATH.';
+
+        vscode.window.showErrorMessage(message + ' Configure the Python path in settings if needed.');
+        return;
+    }
 
-                        if (stdout) {
-                            outputChannel.appendLine(`📝 Output: ${stdout}`);
-                        }
+    const ext = path.extname(filePath).toLowerCase();
+    const workspaceFolder = vscode.workspace.workspaceFolders?.[0]?.uri.fsPath || path.dirname(filePath);
+    outputChannel.appendLine(`🚀 Starting conversion of: ${path.basename(filePath)}`);
+    outputChannel.appendLine(`🐍 Python version: ${pythonInfo.version}`);
+    outputChannel.appendLine(`📄 Using script: ${scriptPath}`);
+    outputChannel.appendLine(`📁 File type: ${ext.substring(1).toUpperCase()}`);
+
+    // Show progress
+    await vscode.window.withProgress({
+        location: vscode.ProgressLocation.Notification,
+        title: `Converting ${path.basename(filePath)} to Markdown...`,
+        cancellable: true
+    }, async (progress, token) => {
+        return new Promise<void>((resolve, reject) => {
+            // Execute Python script with arguments
+            const args = [scriptPath, filePath, '--output', outputPath];
+
+            outputChannel.appendLine(`💻 Executing: ${pythonPath} ${args.join(' ')}`);
+
+            const pythonProcess = execFile(pythonPath, args, {
+                cwd: workspaceFolder,
+                timeout: 120000, // 2 minute timeout
+                maxBuffer: 1024 * 1024 * 10 // 10MB buffer
+            }, (error, stdout, stderr) => {
+                if (token.isCancellationRequested) {
+                    outputChannel.appendLine('❌ Conversion cancelled by user');
+                    reject(new Error('Cancelled'));
+                    return;
+                }
 
-                        // Verify that conversion actually produced output
+                // Check for actual execution errors (non-zero exit codes)
+                if (error) {
+                    outputChannel.appendLine(`⚠️ Process completed with issues: ${error.message}`);
+
+                    let isHandledIssue = false;
+                    let handledMessage = 'Conversion completed with handled issues';
+
+                    // Check for handled issues rather than treating as errors
+                    if (error.code === 'ENOENT') {
+                        handledMessage = 'Python executable not found. Please check your Python installation and PATH configuration.';
+                    } else if (error.code === 'ETIMEDOUT') {
+                        handledMessage = 'Conversion took longer than expected but may have completed. Check the output folder.';
+                    } else if (error.message.includes('Permission denied')) {
+                        handledMessage = 'Some content was protected, but available content was converted successfully.';
+                        isHandledIssue = true;
+                    } else if (error.message.includes('access') || error.message.includes('restricted')) {
+                        handledMessage = 'Document contains restricted content. Converted all accessible content.';
+                        isHandledIssue = true;
+                    } else if (error.code === 1) {
+                        // Check if output was created despite exit code 1
                         const docName = path.basename(filePath, path.extname(filePath));
                         const docOutputPath = path.join(outputPath, docName);
                         const markdownFile = path.join(docOutputPath, `${docName}.md`);
 
-                        if (!fs.existsSync(markdownFile)) {
-                            outputChannel.appendLine(`❌ Expected output file not found: ${markdownFile}`);
-                            vscode.window.showErrorMessage('Conversion completed but no output file was created. Check the output panel for details.');
-                            reject(new Error('No output file created'));
-                            return;
+                        if (fs.existsSync(markdownFile) && fs.statSync(markdownFile).size > 0) {
+                            handledMessage = 'Document converted successfully with some issues handled gracefully.';
+                            isHandledIssue = true;
                         }
+                    }
 
-                        outputChannel.appendLine('✅ Conversion completed successfully!');
-                        outputChannel.appendLine(`📄 Output file: ${markdownFile}`);
-
-                        // Show success message with options
-                        handleConversionSuccess(filePath, outputPath, showReport, autoOpenResult);
+                    // Check if output was actually created despite "error"
+                    const docName = path.basename(filePath, path.extname(filePath));
+                    const docOutputPath = path.join(outputPath, docName);
+                    const markdownFile = path.join(docOutputPath, `${docName}.md`);
+
+                    if (fs.existsSync(markdownFile) && fs.statSync(markdownFile).size > 0) {
+                        // File was created successfully, treat as handled issue
+                        outputChannel.appendLine('✅ Conversion completed successfully despite warnings!');
+                        vscode.window.showInformationMessage(
+                            `✅ Document converted successfully! ${handledMessage}`,
+                            'Open Result', 'View Details'
+                        ).then(selection => {
+                            if (selection === 'Open Result') {
+                                vscode.commands.executeCommand('vscode.open', vscode.Uri.file(markdownFile));
+                            } else if (selection === 'View Details') {
+                                outputChannel.show();
+                            }
+                        });
+                        handleConversionSuccess(filePath, outputPath, showReport, autoOpenResult, true);
                         resolve();
-                    });
+                        return;
+                    }
 
-                    // Handle cancellation
-                    token.onCancellationRequested(() => {
-                        pythonProcess.kill();
-                    });
+                    if (!isHandledIssue) {
+                        vscode.window.showErrorMessage(handledMessage);
+                        reject(error);
+                    }
+                    return;
+                }
+
+                // Log stderr content and look for handled issues
+                let hasActualError = false;
+                let handledIssues = [];
 
-                    // Handle process output in real-time
-                    pythonProcess.stdout?.on('data', (data) => {
-                        const output = data.toString();
-                        outputChannel.append(output);
-
-                        // Update progress based on output
-                        if (output.includes('Extracting images')) {
-                            progress.report({ message: 'Extracting images...' });
-                        } else if (output.includes('Converting text')) {
-                            progress.report({ message: 'Converting text...' });
-                        } else if (output.includes('Processing tables')) {
-                            progress.report({ message: 'Processing tables...' });
+                if (stderr) {
+                    const stderrContent = stderr.trim();
+                    outputChannel.appendLine(`ℹ️ Processing notes: ${stderrContent}`);
+
+                    // Check for handled issues
+                    if (stderrContent.includes('HANDLED:')) {
+                        const handledMatches = stderrContent.match(/HANDLED: [^\n]+/g);
+                        if (handledMatches) {
+                            handledIssues = handledMatches;
+                            outputChannel.appendLine(`✅ Issues handled gracefully: ${handledIssues.length}`);
                         }
-                    });
+                    }
 
-                    pythonProcess.stderr?.on('data', (data) => {
-                        outputChannel.append(`stderr: ${data.toString()}`);
-                    });
-                });
+                    // Check for actual error indicators in stderr
+                    const errorIndicators = [
+                        'Error:', 'Exception:', 'Traceback', 'TypeError:', 'ValueError:',
+                        'FileNotFoundError:', 'PermissionError:', 'ModuleNotFoundError:',
+                        'SyntaxError:', 'ImportError:', 'AttributeError:'
+                    ];
+
+                    hasActualError = errorIndicators.some(indicator =>
+                        stderrContent.includes(indicator) && !stderrContent.includes('HANDLED:')
+                    );
+
+                    if (hasActualError) {
+                        outputChannel.appendLine('❌ Critical error detected in script output');
+                        vscode.window.showErrorMessage('Conversion failed due to script error. Check the output panel for details.');
+                        reject(new Error('Script error: ' + stderrContent));
+                        return;
+                    }
+                }
+
+                if (stdout) {
+                    outputChannel.appendLine(`📝 Output: ${stdout}`);
+                }
+
+                // Verify that conversion actually produced output
+                const docName = path.basename(filePath, path.extname(filePath));
+                const docOutputPath = path.join(outputPath, docName);
+                const markdownFile = path.join(docOutputPath, `${docName}.md`);
+
+                if (!fs.existsSync(markdownFile)) {
+                    outputChannel.appendLine(`❌ Expected output file not found: ${markdownFile}`);
+                    vscode.window.showErrorMessage('Conversion completed but no output file was created. Check the output panel for details.');
+                    reject(new Error('No output file created'));
+                    return;
+                }
+
+                outputChannel.appendLine('✅ Conversion completed successfully!');
+                outputChannel.appendLine(`📄 Output file: ${markdownFile}`);
+
+                // Show success message with options
+                handleConversionSuccess(filePath, outputPath, showReport, autoOpenResult);
+                resolve();
             });
 
-        } catch (error) {
-            outputChannel.appendLine(`💥 Unexpected error: ${error}`);
-            vscode.window.showErrorMessage(`Conversion failed: ${error}`);
-        }
-    });
+            // Handle cancellation
+            token.onCancellationRequested(() => {
+                pythonProcess.kill();
+            });
 
-    context.subscriptions.push(convertDisposable);
-    context.subscriptions.push(outputChannel);
+            // Handle process output in real-time
+            pythonProcess.stdout?.on('data', (data) => {
+                const output = data.toString();
+                outputChannel.append(output);
+
+                // Update progress based on output
+                if (output.includes('Extracting images')) {
+                    progress.report({ message: 'Extracting images...' });
+                } else if (output.includes('Converting text')) {
+                    progress.report({ message: 'Converting text...' });
+                } else if (output.includes('Processing tables')) {
+                    progress.report({ message: 'Processing tables...' });
+                }
+            });
+
+            pythonProcess.stderr?.on('data', (data) => {
+                outputChannel.append(`stderr: ${data.toString()}`);
+            });
+        });
+    });
 }
 
 async function findPythonScript(extensionPath: string): Promise<string | null> {
@@ -337,6 +633,18 @@ interface PythonInfo {
     executable?: string;
 }
 
+async function getPythonInfo(pythonPath: string): Promise<PythonInfo> {
+    // The probe costs up to three interpreter launches, so remember it until the setting changes
+    let info = pythonInfoCache.get(pythonPath);
+    if (!info) {
+        info = await checkPythonCompatibility(pythonPath);
+        if (info.isCompatible) {
+            pythonInfoCache.set(pythonPath, info);
+        }
+    }
+    return info;
+}
+
 async function checkPythonCompatibility(pythonPath: string): Promise<PythonInfo> {
     // Try different Python executables
     const pythonCommands = [pythonPath, 'python3', 'python'];
@@ -569,6 +877,11 @@ Your encouragement motivates us to keep improving! ✨`;
 }
 
 export function deactivate() {
+    disposeConverterDaemon();
+    for (const folderPath of [...folderWatchers.keys()]) {
+        stopFolderWatcher(folderPath);
+    }
+    watchStatusItem?.dispose();
     if (outputChannel) {
         outputChannel.dispose();
     }
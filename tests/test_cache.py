@@ -0,0 +1,97 @@
+"""
+Conversion cache tests
+
+A cache entry is reused only for the same content, converter version and
+output-affecting options, the least recently used entries go first once
+the cache is over its size, and outputs changed since they were restored
+are noticed and written again.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import docx_to_markdown_converter
+from benchmarks.corpus import build_docx
+from docx_to_markdown_converter import ConversionCache, convert_document
+
+class ConversionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.folder = Path(tempfile.mkdtemp(prefix='docx2md-tests-'))
+        self.cache = ConversionCache(str(self.folder / 'cache'))
+        self.docx = build_docx(self.folder / 'report.docx', paragraphs=60, tables=1, images=2)['path']
+        self.output = str(self.folder / 'output')
+
+    def tearDown(self):
+        shutil.rmtree(str(self.folder), ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    def convert(self, docx=None, **options):
+        return convert_document(docx or self.docx, self.output, cache=self.cache, **options)
+
+    def test_unchanged_document_is_cached(self):
+        self.assertEqual(self.convert()['status'], 'converted')
+        summary = self.convert()
+        self.assertEqual(summary['status'], 'cached')
+        self.assertTrue(summary['up_to_date'])
+        # Options that only change how a conversion runs share the entry
+        self.assertEqual(self.convert(image_workers=2, streaming=False)['status'], 'cached')
+
+    def test_option_or_version_change_misses(self):
+        self.convert()
+        self.assertEqual(self.convert(image_mode='lazy')['status'], 'converted')
+        self.assertEqual(self.convert(split_level=1)['status'], 'converted')
+        with mock.patch.object(docx_to_markdown_converter, '__version__', '0.0.0-test'):
+            self.assertEqual(self.convert()['status'], 'converted')
+            self.assertEqual(self.convert()['status'], 'cached')
+        self.assertEqual(self.convert()['status'], 'cached')
+
+    def test_eviction_drops_least_recently_used(self):
+        documents = [build_docx(self.folder / f'doc{index}.docx', paragraphs=60, tables=1, images=2,
+                                seed=index)['path'] for index in range(3)]
+        keys = [self.cache.key_for(docx) for docx in documents]
+        for docx in documents:
+            self.convert(docx)
+        sizes = [self.cache.lookup(key)['size'] for key in keys]
+        for index, key in enumerate(keys):
+            # Used a minute apart, oldest first
+            stamp = 1000000000 + index * 60
+            os.utime(str(self.cache._entry_path(key) / ConversionCache.MANIFEST), (stamp, stamp))
+        # A lookup makes the oldest entry the most recently used
+        self.assertIsNotNone(self.cache.lookup(keys[0]))
+
+        ConversionCache(str(self.folder / 'cache'), max_bytes=sizes[0] + sizes[2]).evict()
+        self.assertIsNotNone(self.cache.lookup(keys[0]))
+        self.assertIsNone(self.cache.lookup(keys[1]))
+        self.assertIsNotNone(self.cache.lookup(keys[2]))
+        self.assertFalse(self.cache._entry_path(keys[1]).exists())
+
+    def test_tampered_output_is_restored(self):
+        markdown_file = Path(self.convert()['markdown_file'])
+        original = markdown_file.read_bytes()
+        image = next((markdown_file.parent / 'images').iterdir())
+        image_bytes = image.read_bytes()
+
+        # Same size, different content: only the digest tells them apart
+        markdown_file.write_bytes(original.replace(b'#', b'%', 1))
+        image.write_bytes(bytes(len(image_bytes)))
+        summary = self.convert()
+        self.assertEqual(summary['status'], 'cached')
+        self.assertFalse(summary['up_to_date'])
+        self.assertEqual(markdown_file.read_bytes(), original)
+        self.assertEqual(image.read_bytes(), image_bytes)
+        self.assertTrue(self.convert()['up_to_date'])
+
+        # A file left over in the document's folder is also dropped
+        (markdown_file.parent / 'stale.md').write_text('old', encoding='utf-8')
+        self.assertFalse(self.convert()['up_to_date'])
+        self.assertFalse((markdown_file.parent / 'stale.md').exists())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+"""
+Word 97-2003 (.doc) tests
+
+The documents are built here with the standard library: a WordDocument
+stream holding a cp1252 piece, a UTF-16 piece and one PAPX formatted disk
+page, a 1Table stream with the piece table, both packed into a Compound
+File Binary container. WordDocument is large enough to live in regular
+FAT sectors and 1Table small enough to live in the miniFAT stream.
+"""
+
+import logging
+import struct
+import unittest
+
+from docx_to_markdown_converter import CompoundFile, WordBinaryDocument, _BufferReader, convert_source
+
+SECTOR = 512
+MINI_SECTOR = 64
+MINI_STREAM_CUTOFF = 4096
+FREE, END_OF_CHAIN, FAT_SECTOR = 0xFFFFFFFF, 0xFFFFFFFE, 0xFFFFFFFD
+
+# Paragraph properties: in table, and table row end
+SPRM_IN_TABLE = struct.pack('<HB', 0x2416, 1)
+SPRM_ROW_END = struct.pack('<HB', 0x2417, 1)
+
+# (text ending in its mark, style index, sprms); the first list is stored as a cp1252 piece
+COMPRESSED_PARAGRAPHS = [
+    ('Überblick\r', 1, b''),
+    ('Body text with a \x13 HYPERLINK "https://example.com" \x14field result\x15 inside.\r', 0, b''),
+    ('Name\x07', 0, SPRM_IN_TABLE),
+    ('Value\x07', 0, SPRM_IN_TABLE),
+    ('\x07', 0, SPRM_IN_TABLE + SPRM_ROW_END),
+    ('Cell A\x07', 0, SPRM_IN_TABLE),
+    ('Cell B\x07', 0, SPRM_IN_TABLE),
+    ('\x07', 0, SPRM_IN_TABLE + SPRM_ROW_END),
+]
+UNICODE_PARAGRAPHS = [
+    ('Ωmega paragraph after the table.\r', 0, b''),
+]
+
+def _pad(data: bytes, size: int) -> bytes:
+    return data + bytes(-len(data) % size)
+
+def build_word_streams(encrypted: bool = False):
+    """Return the WordDocument and 1Table streams of a document with both kinds of piece"""
+    compressed = ''.join(text for text, _, _ in COMPRESSED_PARAGRAPHS).encode('cp1252')
+    unicode_text = ''.join(text for text, _, _ in UNICODE_PARAGRAPHS).encode('utf-16-le')
+    compressed_fc = 1024
+    unicode_fc = compressed_fc + len(_pad(compressed, SECTOR))
+    word = bytearray(_pad(bytes(compressed_fc) + compressed, SECTOR) + _pad(unicode_text, SECTOR))
+    
+    # One FKP page: paragraph end FCs, then a 13-byte BX per paragraph pointing at its PapxInFkp
+    paragraphs = COMPRESSED_PARAGRAPHS + UNICODE_PARAGRAPHS
+    fcs = [compressed_fc]
+    for text, _, _ in COMPRESSED_PARAGRAPHS:
+        fcs.append(fcs[-1] + len(text.encode('cp1252')))
+    fcs[-1] = unicode_fc
+    for text, _, _ in UNICODE_PARAGRAPHS:
+        fcs.append(fcs[-1] + 2 * len(text))
+    page = bytearray(SECTOR)
+    struct.pack_into(f'<{len(fcs)}I', page, 0, *fcs)
+    offset = SECTOR - 1
+    for index, (_, style, sprms) in enumerate(paragraphs):
+        grpprl = _pad(struct.pack('<H', style) + sprms, 2)
+        offset -= 2 + len(grpprl)
+        offset -= offset % 2
+        page[offset:offset + 2] = bytes((0, len(grpprl) // 2))
+        page[offset + 2:offset + 2 + len(grpprl)] = grpprl
+        page[4 * len(fcs) + 13 * index] = offset // 2
+    page[SECTOR - 1] = len(paragraphs)
+    page_number = len(word) // SECTOR
+    word += page
+    # Past the mini stream cutoff, so the stream is read through the FAT
+    word += bytes(max(0, MINI_STREAM_CUTOFF - len(word)))
+    
+    table = bytearray(16)
+    bte_papx = len(table)
+    table += struct.pack('<3I', fcs[0], fcs[-1], page_number)
+    cps = [0, len(compressed), len(compressed) + len(unicode_text) // 2]
+    piece_table = (struct.pack('<3I', *cps)
+                   + struct.pack('<HIH', 0, (compressed_fc * 2) | 0x40000000, 0)
+                   + struct.pack('<HIH', 0, unicode_fc, 0))
+    # A property-modifier entry ahead of the piece table, as Word writes them
+    clx = b'\x01' + struct.pack('<H', 2) + b'\x00\x00' + b'\x02' + struct.pack('<I', len(piece_table)) + piece_table
+    clx_fc = len(table)
+    table += clx
+    
+    fib = bytearray(1024)
+    struct.pack_into('<HH', fib, 0, 0xA5EC, 0xC1)
+    struct.pack_into('<H', fib, 0x0A, 0x0200 | (0x0100 if encrypted else 0))
+    struct.pack_into('<I', fib, 0x4C, cps[-1])
+    struct.pack_into('<II', fib, 0x102, bte_papx, 12)
+    struct.pack_into('<II', fib, 0x1A2, clx_fc, len(clx))
+    word[:len(fib)] = fib
+    return bytes(word), bytes(table)
+
+def build_compound_file(streams) -> bytes:
+    """Pack (name, data) streams under the root storage of a version 3 compound file"""
+    sectors, fat = [], []
+    
+    def allocate(data: bytes) -> int:
+        start = len(sectors)
+        count = max(1, -(-len(data) // SECTOR))
+        for index in range(count):
+            sectors.append(_pad(data[index * SECTOR:(index + 1) * SECTOR], SECTOR))
+            fat.append(start + index + 1 if index < count - 1 else END_OF_CHAIN)
+        return start
+    
+    mini_stream, minifat, entries = bytearray(), [], []
+    for name, data in streams:
+        if len(data) >= MINI_STREAM_CUTOFF:
+            entries.append((name, allocate(data), len(data)))
+            continue
+        start = len(mini_stream) // MINI_SECTOR
+        count = max(1, -(-len(data) // MINI_SECTOR))
+        mini_stream += _pad(data, MINI_SECTOR)
+        minifat += [start + index + 1 if index < count - 1 else END_OF_CHAIN for index in range(count)]
+        entries.append((name, start, len(data)))
+    mini_start = allocate(bytes(mini_stream)) if mini_stream else END_OF_CHAIN
+    minifat_start = allocate(struct.pack(f'<{len(minifat)}I', *minifat)) if minifat else END_OF_CHAIN
+    
+    def directory_entry(name: str, entry_type: int, start: int, size: int, right: int = FREE, child: int = FREE):
+        entry = bytearray(128)
+        encoded = name.encode('utf-16-le') + b'\x00\x00'
+        entry[:len(encoded)] = encoded
+        struct.pack_into('<HBB3I', entry, 64, len(encoded), entry_type, 1, FREE, right, child)
+        struct.pack_into('<IQ', entry, 116, start, size)
+        return bytes(entry)
+    
+    directory = directory_entry('Root Entry', 5, mini_start, len(mini_stream), child=1)
+    for index, (name, start, size) in enumerate(entries, 1):
+        directory += directory_entry(name, 2, start, size, right=index + 1 if index < len(entries) else FREE)
+    directory_start = allocate(directory)
+    
+    fat_start = len(sectors)
+    fat.append(FAT_SECTOR)
+    sectors.append(struct.pack(f'<{SECTOR // 4}I', *(fat + [FREE] * (SECTOR // 4 - len(fat)))))
+    
+    header = bytearray(SECTOR)
+    header[:8] = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+    struct.pack_into('<5H', header, 0x18, 0x3E, 3, 0xFFFE, 9, 6)
+    struct.pack_into('<3I', header, 0x2C, 1, directory_start, 0)
+    struct.pack_into('<5I', header, 0x38, MINI_STREAM_CUTOFF, minifat_start, 1 if minifat else 0, END_OF_CHAIN, 0)
+    struct.pack_into('<109I', header, 0x4C, fat_start, *([FREE] * 108))
+    return bytes(header) + b''.join(sectors)
+
+def build_doc(encrypted: bool = False) -> bytes:
+    word, table = build_word_streams(encrypted)
+    return build_compound_file([('WordDocument', word), ('1Table', table)])
+
+class WordBinaryDocumentTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_container_streams(self):
+        with CompoundFile(_BufferReader(build_doc())) as container:
+            word = container.open_stream('WordDocument')
+            table = container.open_stream('1Table')
+            # One stream in regular sectors, the other in the mini stream
+            self.assertFalse(word._mini)
+            self.assertTrue(table._mini)
+            self.assertEqual(word.read_at(0, 2), struct.pack('<H', 0xA5EC))
+            self.assertFalse(container.has_stream('0Table'))
+
+    def test_paragraph_properties(self):
+        with CompoundFile(_BufferReader(build_doc())) as container:
+            paragraphs = list(WordBinaryDocument(container).paragraphs())
+        texts = [text for text, _, _, _, _ in paragraphs]
+        self.assertEqual(texts[0], 'Überblick')
+        self.assertEqual(texts[-1], 'Ωmega paragraph after the table.')
+        self.assertEqual(paragraphs[0][1:], ('\r', 1, False, False))
+        # Two cells of the second row, then the row end mark
+        self.assertEqual(paragraphs[5:8], [
+            ('Cell A', '\x07', 0, True, False),
+            ('Cell B', '\x07', 0, True, False),
+            ('', '\x07', 0, True, True),
+        ])
+
+    def test_conversion(self):
+        result = convert_source(build_doc(), 'legacy.doc')
+        self.assertEqual(result.file_type, 'doc')
+        self.assertEqual(result.headings, [(1, 'Überblick')])
+        self.assertIn('\n# Überblick\n', result.markdown)
+        # The field code is dropped and its result kept
+        self.assertIn('Body text with a field result inside.', result.markdown)
+        self.assertNotIn('HYPERLINK', result.markdown)
+        # A two-column table: the first row is its header, the others render as label and value
+        self.assertIn('**Cell A**\n\nCell B', result.markdown)
+        self.assertIn('Ωmega paragraph after the table.', result.markdown)
+        self.assertEqual(result.warnings, [])
+
+    def test_encrypted_document(self):
+        result = convert_source(build_doc(encrypted=True), 'locked.doc')
+        self.assertEqual([warning['type'] for warning in result.warnings], ['Encrypted Document'])
+        self.assertIn('Could not extract text from this encrypted .doc file.', result.markdown)
+        self.assertNotIn('Cell A', result.markdown)
+
+    def test_damaged_container_falls_back_to_text_scan(self):
+        # Without its last sector the FAT lies beyond the end of the file
+        result = convert_source(build_doc()[:-SECTOR], 'damaged.doc')
+        self.assertEqual(result.file_type, 'doc')
+        self.assertIn('Body text with a', result.markdown)
+        self.assertNotIn('Could not extract', result.markdown)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Image reference tests
+
+Drawings are resolved to extracted images through their relationship's
+part name. These tests cover packages whose media names are prefixes or
+suffixes of one another, which matching on file names confuses.
+"""
+
+import io
+import logging
+import re
+import unittest
+import zipfile
+
+from benchmarks.corpus import CONTENT_TYPES, DOCUMENT_FOOTER, DOCUMENT_HEADER, IMAGE_REL, PACKAGE_RELS, make_png
+from docx_to_markdown_converter import IMAGE_MODES, convert_source
+
+IMAGE_LINK = re.compile(r'!\[([^\]]+)\]\(images/([^)]+)\)')
+
+def _drawing_paragraph(caption: str, rel_id: str) -> str:
+    return (
+        f'<w:p><w:r><w:t>{caption}</w:t></w:r><w:r><w:drawing><wp:inline>'
+        '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<pic:pic><pic:blipFill><a:blip r:embed="{rel_id}"/></pic:blipFill></pic:pic>'
+        '</a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>'
+    )
+
+def build_prefix_docx(images: dict) -> bytes:
+    """A DOCX with one drawing per (relationship id -> media file, bytes), in order"""
+    relationships = ''.join(
+        f'<Relationship Id="{rel_id}" Type="{IMAGE_REL}" Target="media/{media}"/>'
+        for rel_id, (media, _) in images.items()
+    )
+    body = ''.join(_drawing_paragraph(f'Figure {rel_id}', rel_id) for rel_id in images)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', CONTENT_TYPES)
+        package.writestr('_rels/.rels', PACKAGE_RELS)
+        package.writestr('word/document.xml', DOCUMENT_HEADER + body + DOCUMENT_FOOTER)
+        package.writestr(
+            'word/_rels/document.xml.rels',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + relationships + '</Relationships>'
+        )
+        for media, data in images.values():
+            package.writestr(f'word/media/{media}', data)
+    return buffer.getvalue()
+
+class PrefixImageNamesTest(unittest.TestCase):
+    """image1.png, image11.png and 1.png must each be linked from their own drawing"""
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+        # Referenced out of name order, so neither document order nor name order hides a mix-up
+        cls.images = {
+            'rId11': ('image11.png', make_png(4, 4, 11)),
+            'rId1': ('image1.png', make_png(4, 4, 1)),
+            'rId2': ('1.png', make_png(4, 4, 2)),
+        }
+        cls.docx = build_prefix_docx(cls.images)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_each_embed_links_its_own_image(self):
+        for mode in IMAGE_MODES:
+            with self.subTest(image_mode=mode):
+                result = convert_source(self.docx, 'prefix.docx', image_mode=mode)
+                links = IMAGE_LINK.findall(result.markdown)
+                self.assertEqual(len(links), len(self.images), result.markdown)
+                for (alt, filename), (media, data) in zip(links, self.images.values()):
+                    self.assertEqual(alt, filename)
+                    self.assertTrue(filename.endswith(f'_{media}'), f'{filename} does not hold {media}')
+                    if mode == 'links':
+                        self.assertNotIn(filename, result.images)
+                    else:
+                        self.assertEqual(result.images[filename], data)
+
+if __name__ == '__main__':
+    unittest.main()
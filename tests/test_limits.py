@@ -0,0 +1,85 @@
+"""
+Decompression limit tests
+
+A small package whose parts expand far beyond their compressed size must
+be converted up to the limits, with the cut reported, instead of being
+read whole.
+"""
+
+import io
+import logging
+import unittest
+import zipfile
+from unittest import mock
+
+import docx_to_markdown_converter
+from benchmarks.corpus import CONTENT_TYPES, DOCUMENT_FOOTER, DOCUMENT_HEADER, IMAGE_REL, PACKAGE_RELS
+from docx_to_markdown_converter import convert_source
+
+PARAGRAPH = '<w:p><w:r><w:t>{}</w:t></w:r></w:p>'
+
+def build_bomb_docx(paragraphs: int, image_size: int) -> bytes:
+    """A DOCX of repeated paragraphs ending in a marker, and a drawing of an all-zero image"""
+    body = (PARAGRAPH.format('First paragraph') + PARAGRAPH.format('filler ' * 40) * paragraphs
+            + PARAGRAPH.format('Last paragraph')
+            + '<w:p><w:r><w:drawing><a:graphic><a:graphicData><pic:pic><pic:blipFill>'
+              '<a:blip r:embed="rIdImage1"/></pic:blipFill></pic:pic></a:graphicData></a:graphic></w:drawing></w:r></w:p>')
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', CONTENT_TYPES)
+        package.writestr('_rels/.rels', PACKAGE_RELS)
+        package.writestr('word/document.xml', DOCUMENT_HEADER + body + DOCUMENT_FOOTER)
+        package.writestr(
+            'word/_rels/document.xml.rels',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rIdImage1" Type="{IMAGE_REL}" Target="media/image1.png"/></Relationships>'
+        )
+        package.writestr('word/media/image1.png', bytes(image_size))
+    return buffer.getvalue()
+
+class ZipBombTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+        # About 1.5 MB of XML and 1 MB of image that compress to a few KB
+        cls.docx = build_bomb_docx(paragraphs=5000, image_size=1024 * 1024)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def limit_warnings(self, result):
+        return [warning['message'] for warning in result.warnings if warning['type'] == 'Decompression Limit Reached']
+
+    def test_ratio_limit_cuts_off_body_and_skips_image(self):
+        # The ratio check normally starts at 10 MB; lower it so a small bomb trips it
+        with mock.patch.object(docx_to_markdown_converter, 'MIN_RATIO_CHECK_SIZE', 64 * 1024):
+            result = convert_source(self.docx, 'bomb.docx', max_ratio=20)
+        self.assertIn('First paragraph', result.markdown)
+        self.assertNotIn('Last paragraph', result.markdown)
+        self.assertEqual(result.images, {})
+        messages = self.limit_warnings(result)
+        self.assertTrue(any(message.startswith('word/document.xml') and 'compression ratio limit' in message
+                            for message in messages), messages)
+        self.assertTrue(any(message.startswith('word/media/image1.png') for message in messages), messages)
+
+    def test_part_and_total_limits(self):
+        result = convert_source(self.docx, 'bomb.docx', max_part_size=512 * 1024)
+        self.assertNotIn('Last paragraph', result.markdown)
+        self.assertEqual(result.images, {})
+        self.assertTrue(any('part limit' in message for message in self.limit_warnings(result)))
+
+        result = convert_source(self.docx, 'bomb.docx', max_total_size=256 * 1024)
+        self.assertIn('First paragraph', result.markdown)
+        self.assertNotIn('Last paragraph', result.markdown)
+        self.assertTrue(any('decompression limit' in message for message in self.limit_warnings(result)))
+
+    def test_within_limits_converts_everything(self):
+        result = convert_source(self.docx, 'bomb.docx')
+        self.assertIn('Last paragraph', result.markdown)
+        self.assertEqual(self.limit_warnings(result), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Media store tests
+
+Images added to a content-addressed media store are inflated once per
+conversion, so a media store neither changes what the decompression
+limits allow nor the bytes a profile reports.
+"""
+
+import json
+import logging
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from benchmarks.corpus import build_docx
+from docx_to_markdown_converter import MEDIA_MODES, DocxPackage, convert_document
+
+class MediaStoreLimitsTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.folder = Path(tempfile.mkdtemp(prefix='docx2md-tests-'))
+        self.docx = build_docx(self.folder / 'figures.docx', paragraphs=200, tables=2, images=20)['path']
+        with zipfile.ZipFile(self.docx) as package:
+            # Room for every part once, but not for any image twice
+            self.total = sum(info.file_size for info in package.infolist())
+            self.largest_image = max(info.file_size for info in package.infolist()
+                                     if info.filename.startswith('word/media/'))
+
+    def tearDown(self):
+        shutil.rmtree(str(self.folder), ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    def convert(self, output, **options):
+        summary = convert_document(self.docx, str(self.folder / output), profile=True,
+                                   max_total_size=self.total + self.largest_image - 1, **options)
+        with open(summary['profile_file'], encoding='utf-8') as f:
+            read = sum(phase['zip_bytes_read'] for phase in json.load(f)['phases'])
+        return summary, read
+
+    def test_store_reads_each_image_once(self):
+        plain, plain_read = self.convert('plain')
+        self.assertEqual(plain['issues'], 0)
+        for mode in MEDIA_MODES:
+            for image_mode in ('eager', 'lazy'):
+                with self.subTest(media_mode=mode, image_mode=image_mode):
+                    # A fresh store each time, so every image is new to it
+                    summary, read = self.convert(f'{mode}-{image_mode}', image_mode=image_mode, image_workers=2,
+                                                 media_store=str(self.folder / f'store-{mode}-{image_mode}'),
+                                                 media_mode=mode)
+                    self.assertEqual(summary['issues'], 0, summary['handled_issues'])
+                    self.assertEqual(summary['images'], plain['images'])
+                    self.assertEqual(read, plain_read)
+
+    def test_reading_a_part_again_is_not_charged_twice(self):
+        package = DocxPackage(self.docx, max_total_size=self.total)
+        try:
+            for _ in range(3):
+                for name in package.entries:
+                    with package.open(name) as source:
+                        self.assertEqual(len(source.read()), package.entries[name].file_size)
+            self.assertEqual(package.counters.inflated_total, self.total)
+            self.assertEqual(package.counters.zip_read, 3 * self.total)
+        finally:
+            package.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Atomic output tests
+
+A document's output folder is built in a hidden sibling and swapped in
+complete, single files are written under a temporary name and renamed,
+and a conversion that fails leaves the previous output as it was. No
+hidden staging, retired or temporary files are left behind either way.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.corpus import build_docx
+from docx_to_markdown_converter import AtomicFile, DocxToMarkdownConverter, convert_document, replace_tree
+
+def _tree(folder: Path) -> dict:
+    """Relative path -> bytes of every file under folder"""
+    return {path.relative_to(folder).as_posix(): path.read_bytes()
+            for path in folder.rglob('*') if path.is_file()}
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.folder = Path(tempfile.mkdtemp(prefix='docx2md-tests-'))
+
+    def tearDown(self):
+        shutil.rmtree(str(self.folder), ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    def assertNoHiddenFiles(self, folder: Path):
+        self.assertEqual([path.name for path in folder.rglob('.*')], [])
+
+class ReplaceTreeTest(OutputTestCase):
+
+    def test_replaces_previous_tree(self):
+        target = self.folder / 'doc'
+        for generation in ('old', 'new'):
+            staged = self.folder / f'.doc.{generation}.staging'
+            (staged / 'images').mkdir(parents=True)
+            (staged / 'doc.md').write_text(generation, encoding='utf-8')
+            if generation == 'old':
+                (staged / 'images' / 'image_1.png').write_bytes(b'png')
+            replace_tree(staged, target)
+        # The new tree replaces the old one whole, rather than being merged into it
+        self.assertEqual(_tree(target), {'doc.md': b'new'})
+        self.assertEqual(os.listdir(str(self.folder)), ['doc'])
+
+class AtomicFileTest(OutputTestCase):
+
+    def test_published_on_close(self):
+        path = self.folder / 'doc.md'
+        path.write_text('old', encoding='utf-8')
+        for fsync in (False, True):
+            with self.subTest(fsync=fsync):
+                with AtomicFile(path, text=True, fsync=fsync) as f:
+                    f.write('new')
+                    # Readers see the previous file until the new one is complete
+                    self.assertEqual(path.read_text(encoding='utf-8'), 'old')
+                self.assertEqual(path.read_text(encoding='utf-8'), 'new')
+                path.write_text('old', encoding='utf-8')
+        self.assertNoHiddenFiles(self.folder)
+
+    def test_discarded_on_error(self):
+        path = self.folder / 'doc.md'
+        path.write_bytes(b'old')
+        with self.assertRaises(RuntimeError):
+            with AtomicFile(path) as f:
+                f.write(b'partial')
+                raise RuntimeError('interrupted')
+        self.assertEqual(path.read_bytes(), b'old')
+        self.assertNoHiddenFiles(self.folder)
+
+class ConvertDocumentOutputTest(OutputTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.docx = build_docx(self.folder / 'report.docx', paragraphs=60, tables=1, images=3)['path']
+        self.output = self.folder / 'output'
+
+    def convert_failing(self, output, **options):
+        """Convert with the report failing after the markdown and images were written"""
+        with mock.patch.object(DocxToMarkdownConverter, 'generate_report', side_effect=RuntimeError('disk full')):
+            with self.assertRaises(RuntimeError):
+                convert_document(self.docx, str(output), **options)
+
+    def test_commit_leaves_only_the_document_folder(self):
+        for _ in range(2):
+            summary = convert_document(self.docx, str(self.output))
+            self.assertEqual(os.listdir(str(self.output)), ['report'])
+            self.assertNoHiddenFiles(self.output)
+        self.assertEqual(len(os.listdir(summary['images_path'])), 3)
+
+    def test_failed_conversion_keeps_previous_output(self):
+        summary = convert_document(self.docx, str(self.output))
+        # Differs from what the failing conversion writes before it fails
+        with open(summary['markdown_file'], 'a', encoding='utf-8') as f:
+            f.write('Edited since the last conversion.\n')
+        previous = _tree(self.output)
+        self.convert_failing(self.output)
+        self.assertEqual(_tree(self.output), previous)
+        self.assertNoHiddenFiles(self.output)
+
+    def test_failed_first_conversion_leaves_nothing(self):
+        self.convert_failing(self.output)
+        self.assertEqual(os.listdir(str(self.output)), [])
+
+    def test_unstaged_failure_leaves_whole_files(self):
+        # Without a staging folder each file is replaced on its own, never left half-written
+        for output, staged in ((self.output, False), (self.output / 'notes.md', True)):
+            with self.subTest(output=output.name, staged=staged):
+                complete = Path(convert_document(self.docx, str(output), staged=staged)['markdown_file'])
+                expected = complete.read_bytes()
+                complete.write_bytes(b'old')
+                self.convert_failing(output, staged=staged)
+                self.assertEqual(complete.read_bytes(), expected)
+                self.assertNoHiddenFiles(self.output)
+
+if __name__ == '__main__':
+    unittest.main()
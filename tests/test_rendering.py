@@ -0,0 +1,83 @@
+"""
+Body rendering tests
+
+The document body can be rendered from a streamed parse, a whole-tree
+parse or, for large bodies, in chunks on worker processes. Each path must
+produce the same markdown and images for the same document.
+"""
+
+import logging
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.corpus import PRESETS, build_docx
+import docx_to_markdown_converter
+from docx_to_markdown_converter import DocxToMarkdownConverter, IMAGE_MODES, convert_source
+
+FIXTURES = {}
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+    folder = Path(tempfile.mkdtemp(prefix='docx2md-tests-'))
+    FIXTURES['folder'] = folder
+    FIXTURES['small'] = build_docx(folder / 'small.docx', **PRESETS['small'])['path']
+    # Mostly tables and images, so the layouts and image references are exercised often
+    FIXTURES['dense'] = build_docx(folder / 'dense.docx', paragraphs=120, tables=30, images=20, seed=7)['path']
+
+def tearDownModule():
+    shutil.rmtree(str(FIXTURES.pop('folder')), ignore_errors=True)
+    logging.disable(logging.NOTSET)
+
+class RenderingTestCase(unittest.TestCase):
+
+    def assertSameConversion(self, first, second):
+        self.assertEqual(first.markdown, second.markdown)
+        self.assertEqual(first.images, second.images)
+        self.assertEqual(first.headings, second.headings)
+        self.assertEqual(first.warnings, second.warnings)
+
+class StreamingTest(RenderingTestCase):
+    """Streaming document.xml block by block matches parsing it whole"""
+
+    def test_streaming_matches_tree_parse(self):
+        for fixture in ('small', 'dense'):
+            for mode in ('eager', 'lazy'):
+                with self.subTest(fixture=fixture, image_mode=mode):
+                    streamed = convert_source(FIXTURES[fixture], image_mode=mode, streaming=True)
+                    parsed = convert_source(FIXTURES[fixture], image_mode=mode, streaming=False)
+                    self.assertIn('![image_', streamed.markdown)
+                    self.assertSameConversion(streamed, parsed)
+
+class ParallelBodyTest(RenderingTestCase):
+    """Rendering the body in chunks on worker processes matches rendering it serially"""
+
+    def convert_parallel(self, path, **options):
+        # The fixtures are far below the size that turns workers on, and a chunk
+        # of a few blocks makes the merge order matter
+        rendered = []
+        render_parallel = DocxToMarkdownConverter._render_body_parallel
+
+        def spy(converter, *args):
+            rendered.append(render_parallel(converter, *args))
+            return rendered[-1]
+
+        with mock.patch.object(docx_to_markdown_converter, 'PARALLEL_BODY_MIN_BYTES', 0), \
+                mock.patch.object(docx_to_markdown_converter, 'BODY_CHUNK_BLOCKS', 16), \
+                mock.patch.object(DocxToMarkdownConverter, '_render_body_parallel', spy):
+            result = convert_source(path, body_workers=2, **options)
+        self.assertEqual(rendered, [True])
+        return result
+
+    def test_parallel_matches_serial(self):
+        for fixture in ('small', 'dense'):
+            for mode in IMAGE_MODES:
+                with self.subTest(fixture=fixture, image_mode=mode):
+                    parallel = self.convert_parallel(FIXTURES[fixture], image_mode=mode)
+                    serial = convert_source(FIXTURES[fixture], image_mode=mode)
+                    self.assertSameConversion(parallel, serial)
+
+if __name__ == '__main__':
+    unittest.main()
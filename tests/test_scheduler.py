@@ -0,0 +1,93 @@
+"""
+Batch scheduler tests
+
+A job that hangs past the job timeout, or whose worker dies, is stopped,
+the staging folder its worker left is removed, and the job is retried in
+the single-worker retry lane; a retry that succeeds does not fail the run.
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import docx_to_markdown_converter
+from benchmarks.corpus import build_docx
+from docx_to_markdown_converter import BatchScheduler, DocxToMarkdownConverter
+
+@unittest.skipUnless(multiprocessing.get_start_method() == 'fork',
+                     "the failing job is patched in before the workers are forked")
+class BatchSchedulerRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.folder = Path(tempfile.mkdtemp(prefix='docx2md-tests-'))
+        self.output = str(self.folder / 'output')
+        self.jobs = [(build_docx(self.folder / f'{name}.docx', paragraphs=40, tables=1, images=2)['path'],
+                      self.output, None, {}) for name in ('stuck', 'fine')]
+        # Written by the first attempt at the stuck document: the worker's pid and its staging folder
+        self.marker = self.folder / 'first-attempt'
+
+    def tearDown(self):
+        shutil.rmtree(str(self.folder), ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    def run_jobs(self, first_attempt, **limits):
+        render_body = DocxToMarkdownConverter.render_body
+        marker = self.marker
+
+        def failing_once(converter, content):
+            if Path(converter.source_name).stem == 'stuck' and not marker.exists():
+                marker.write_text(f"{os.getpid()}\n{converter.sink.root}", encoding='utf-8')
+                first_attempt()
+            return render_body(converter, content)
+
+        records = []
+        with mock.patch.object(DocxToMarkdownConverter, 'render_body', failing_once), \
+                mock.patch.object(docx_to_markdown_converter, 'SCHEDULER_POLL_INTERVAL', 0.05):
+            results = BatchScheduler(**limits).run(self.jobs, 2, lambda result, retrying: records.append(
+                (Path(result['input_file']).stem, result['status'], retrying, result.get('error'))))
+        return results, records
+
+    def assertRetriedOnce(self, results, records, error):
+        by_name = {Path(result['input_file']).stem: result for result in results}
+        self.assertEqual(set(by_name), {'stuck', 'fine'})
+        self.assertEqual(by_name['fine']['attempts'], 1)
+        self.assertEqual(by_name['stuck']['status'], 'converted')
+        self.assertEqual(by_name['stuck']['attempts'], 2)
+        stuck = [record for record in records if record[0] == 'stuck']
+        self.assertEqual([record[1:3] for record in stuck], [('failed', True), ('converted', False)])
+        self.assertIn(error, stuck[0][3])
+
+        pid, staging = self.marker.read_text(encoding='utf-8').split('\n')
+        self.assertNotEqual(int(pid), os.getpid())
+        self.assertTrue(Path(staging).name.startswith(f'.stuck.{pid}-'))
+        self.assertFalse(Path(staging).exists())
+        # Both documents are in place and no staging or retired folder is left beside them
+        self.assertEqual(sorted(os.listdir(self.output)), ['fine', 'stuck'])
+        self.assertTrue((Path(self.output) / 'stuck' / 'stuck.md').is_file())
+
+    def test_timed_out_job_is_killed_and_retried(self):
+        started = time.monotonic()
+        results, records = self.run_jobs(lambda: time.sleep(60), job_timeout=2)
+        self.assertLess(time.monotonic() - started, 30)
+        self.assertRetriedOnce(results, records, 'Timed out after 2s')
+
+    def test_crashed_worker_is_replaced_and_job_retried(self):
+        results, records = self.run_jobs(lambda: os._exit(3))
+        self.assertRetriedOnce(results, records, 'Worker process died (exit code 3)')
+
+    def test_no_retries_fails_the_job(self):
+        results, records = self.run_jobs(lambda: os._exit(3), retries=0)
+        stuck = [result for result in results if Path(result['input_file']).stem == 'stuck']
+        self.assertEqual([result['status'] for result in stuck], ['failed'])
+        self.assertEqual([record[2] for record in records], [False, False])
+        self.assertEqual(os.listdir(self.output), ['fine'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+Output sink tests
+
+Every sink receives the same files for the same document: MemorySink
+keeps them in a dict, ArchiveSink streams them into a zip or tar archive
+(also when the target is a stream that cannot seek), and documents held
+in memory are read in place through a _BufferReader.
+"""
+
+import io
+import logging
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from benchmarks.corpus import build_docx
+from docx_to_markdown_converter import (ArchiveSink, MemorySink, OutputSink, _BufferReader, convert_document,
+                                        convert_source)
+
+class _Pipe(io.RawIOBase):
+    """Write-only stream that, like a pipe, can neither seek nor tell"""
+
+    def __init__(self):
+        super().__init__()
+        self.data = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.data += data
+        return len(data)
+
+class SinkTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+        cls.folder = Path(tempfile.mkdtemp(prefix='docx2md-tests-'))
+        cls.documents = [build_docx(cls.folder / f'{name}.docx', paragraphs=60, tables=2, images=3, seed=seed)['path']
+                         for seed, name in enumerate(('alpha', 'beta'), 1)]
+        # What each document converts to, as MemorySink holds it
+        cls.expected = {}
+        for docx in cls.documents:
+            sink = MemorySink()
+            convert_document(docx, sink=sink)
+            cls.expected[Path(docx).stem] = sink.files
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(str(cls.folder), ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+class OutputSinkTest(SinkTestCase):
+
+    def test_abstract_methods(self):
+        with self.assertRaises(TypeError):
+            OutputSink()
+
+        class Incomplete(OutputSink):
+            def open(self, path, text=False):
+                return io.BytesIO()
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_memory_sink(self):
+        for docx in self.documents:
+            files = self.expected[Path(docx).stem]
+            images = {name for name in files if name.startswith('images/')}
+            self.assertEqual(set(files) - images, {f'{Path(docx).stem}.md', 'conversion_report.md'})
+            with zipfile.ZipFile(docx) as package:
+                media = sorted(package.read(info) for info in package.infolist()
+                               if info.filename.startswith('word/media/'))
+            self.assertEqual(sorted(files[name] for name in images), media)
+            result = convert_source(docx)
+            self.assertEqual(result.markdown.encode('utf-8'), files[f'{Path(docx).stem}.md'])
+            self.assertEqual(result.images, {name[len('images/'):]: files[name] for name in images})
+
+class ArchiveSinkTest(SinkTestCase):
+
+    def convert_into(self, sink: ArchiveSink):
+        for docx in self.documents:
+            convert_document(docx, sink=sink)
+        sink.close()
+
+    def assertSameFiles(self, archived: dict):
+        self.assertEqual({path.split('/', 1)[0] for path in archived}, set(self.expected))
+        for stem, files in self.expected.items():
+            self.assertEqual({path for path in archived if path.startswith(stem + '/')},
+                             {f'{stem}/{name}' for name in files})
+            for name, data in files.items():
+                # The report names the output locations, which differ between sinks
+                if name != 'conversion_report.md':
+                    self.assertEqual(archived[f'{stem}/{name}'], data, name)
+
+    def read_zip(self, target) -> dict:
+        with zipfile.ZipFile(target) as archive:
+            self.assertIsNone(archive.testzip())
+            return {name: archive.read(name) for name in archive.namelist()}
+
+    def read_tar(self, target) -> dict:
+        opened = tarfile.open(fileobj=target) if hasattr(target, 'read') else tarfile.open(target)
+        with opened as archive:
+            return {member.name: archive.extractfile(member).read() for member in archive.getmembers()}
+
+    def test_zip_file(self):
+        target = str(self.folder / 'out.zip')
+        self.convert_into(ArchiveSink(target))
+        self.assertSameFiles(self.read_zip(target))
+
+    def test_tar_gz_file(self):
+        target = str(self.folder / 'out.tar.gz')
+        self.convert_into(ArchiveSink(target, 'tar.gz'))
+        self.assertSameFiles(self.read_tar(target))
+
+    def test_unseekable_stream(self):
+        for archive_format in ArchiveSink.FORMATS:
+            with self.subTest(archive_format=archive_format):
+                pipe = _Pipe()
+                self.convert_into(ArchiveSink(pipe, archive_format))
+                read = self.read_zip if archive_format == 'zip' else self.read_tar
+                self.assertSameFiles(read(io.BytesIO(bytes(pipe.data))))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            ArchiveSink(io.BytesIO(), 'rar')
+
+class BufferReaderTest(SinkTestCase):
+
+    def test_reads_and_seeks(self):
+        data = bytes(range(256)) * 4
+        # A view into a larger buffer is read in place
+        reader = _BufferReader(memoryview(b'xx' + data + b'yy')[2:-2])
+        self.assertEqual(reader.read(10), data[:10])
+        self.assertEqual(reader.tell(), 10)
+        buffer = bytearray(6)
+        self.assertEqual(reader.readinto(buffer), 6)
+        self.assertEqual(bytes(buffer), data[10:16])
+        self.assertEqual(reader.seek(-4, io.SEEK_END), len(data) - 4)
+        self.assertEqual(reader.read(), data[-4:])
+        self.assertEqual(reader.read(10), b'')
+        self.assertEqual(reader.seek(3, io.SEEK_SET), 3)
+        self.assertEqual(reader.seek(5, io.SEEK_CUR), 8)
+        self.assertEqual(io.BufferedReader(reader).read(), data[8:])
+        with self.assertRaises(ValueError):
+            reader.seek(-1)
+
+    def test_converts_in_memory_documents(self):
+        docx = self.documents[0]
+        expected = convert_source(docx)
+        data = Path(docx).read_bytes()
+        for source in (data, bytearray(data), memoryview(b'\0' + data)[1:]):
+            with self.subTest(source=type(source).__name__):
+                result = convert_source(source, Path(docx).name)
+                self.assertEqual(result.markdown, expected.markdown)
+                self.assertEqual(result.images, expected.images)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Split output tests
+
+With split_level, the body is cut into one file per heading of that level
+or above, next to an index holding the title, the table of contents and
+anything before the first such heading. Put back together, the pieces are
+the body of an unsplit conversion.
+"""
+
+import logging
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from benchmarks.corpus import CONTENT_TYPES, DOCUMENT_FOOTER, DOCUMENT_HEADER, PACKAGE_RELS
+from docx_to_markdown_converter import convert_document
+
+PREAMBLE = 'Opening remarks before any heading.'
+
+def _paragraph(text: str, style: str = None) -> str:
+    ppr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+    return f'<w:p>{ppr}<w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+def build_guide(path: Path) -> str:
+    """A DOCX with two level 1 sections, a level 2 section and a body line that only looks like a heading"""
+    body = [
+        _paragraph(PREAMBLE),
+        _paragraph('Getting Started', 'Heading1'),
+        _paragraph('First steps.'),
+        _paragraph('Install Steps', 'Heading2'),
+        _paragraph('## x'),
+        _paragraph('Run the installer.'),
+        _paragraph('Usage', 'Heading1'),
+        _paragraph('Day to day use.'),
+    ]
+    with zipfile.ZipFile(str(path), 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', CONTENT_TYPES)
+        package.writestr('_rels/.rels', PACKAGE_RELS)
+        package.writestr('word/document.xml', DOCUMENT_HEADER + ''.join(body) + DOCUMENT_FOOTER)
+    return str(path)
+
+class SplitOutputTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.folder = Path(tempfile.mkdtemp(prefix='docx2md-tests-'))
+        self.docx = build_guide(self.folder / 'guide.docx')
+
+    def tearDown(self):
+        shutil.rmtree(str(self.folder), ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    def convert(self, split_level: int):
+        summary = convert_document(self.docx, str(self.folder / f'level{split_level}'), split_level=split_level)
+        index = Path(summary['markdown_file']).read_text(encoding='utf-8')
+        sections = [Path(section) for section in summary.get('section_files', [])]
+        return index, sections
+
+    def body(self, markdown: str) -> str:
+        return markdown[markdown.index(PREAMBLE):]
+
+    def test_split_by_level(self):
+        unsplit, sections = self.convert(0)
+        self.assertEqual(sections, [])
+        expected = {
+            1: (['guide-01-getting-started.md', 'guide-02-usage.md'],
+                ['- [Getting Started](guide-01-getting-started.md#getting-started)',
+                 '  - [Install Steps](guide-01-getting-started.md#install-steps)',
+                 '- [Usage](guide-02-usage.md#usage)']),
+            2: (['guide-01-getting-started.md', 'guide-02-install-steps.md', 'guide-03-usage.md'],
+                ['- [Getting Started](guide-01-getting-started.md#getting-started)',
+                 '  - [Install Steps](guide-02-install-steps.md#install-steps)',
+                 '- [Usage](guide-03-usage.md#usage)']),
+        }
+        for level, (names, links) in expected.items():
+            with self.subTest(split_level=level):
+                index, sections = self.convert(level)
+                self.assertEqual([section.name for section in sections], names)
+                self.assertTrue(all(section.parent == sections[0].parent for section in sections))
+                self.assertIn('## Table of Contents\n\n' + '\n'.join(links) + '\n\n', index)
+                # Only the text before the first heading stays in the index
+                self.assertEqual(self.body(index), PREAMBLE + '\n\n')
+                joined = self.body(index) + ''.join(section.read_text(encoding='utf-8') for section in sections)
+                self.assertEqual(joined, self.body(unsplit))
+
+    def test_heading_lookalike_does_not_start_a_section(self):
+        _, sections = self.convert(2)
+        install = sections[1].read_text(encoding='utf-8')
+        self.assertTrue(install.startswith('## Install Steps\n'))
+        self.assertIn('\n## x\n', install)
+        self.assertIn('Run the installer.', install)
+
+if __name__ == '__main__':
+    unittest.main()